@@ -0,0 +1,178 @@
+# alt_landmarks.py
+import hashlib
+import os
+import numpy as np
+from graph_csr import as_csr
+from lab7_greedy_shortest_path import DijkstraEngine, INF
+from result_cache import order_hash
+
+# файлы таблиц в каталоге индекса (формат .npy читается через mmap без загрузки целиком)
+_META = "meta.npy"
+_LANDMARKS = "landmarks.npy"
+_FROM = "dist_from.npy"
+_TO = "dist_to.npy"
+
+def _graph_key(csr):
+    # строки таблиц — id вершин, значения зависят от весов: порядок вершин и соседей
+    # (result_cache.order_hash) вместе с весами рёбер
+    h = hashlib.blake2b(order_hash(csr).encode("ascii"), digest_size=20)
+    h.update(np.ascontiguousarray(csr.weights, dtype="<f8").tobytes())
+    return h.hexdigest()
+
+def _meta(csr):
+    return [str(csr.number_of_nodes()), str(csr.num_edges), str(int(csr.directed)), _graph_key(csr)]
+
+def _sssp(engine, source):
+    engine.run(source)
+    return np.array(engine.dist, dtype=np.float64)
+
+def select_landmarks(graph, k=16, seed=0):
+    """
+    Выбор ориентиров «дальний от уже выбранных» (farthest): первый — самая дальняя вершина
+    от случайной, каждый следующий — вершина с наибольшим расстоянием до ближайшего из выбранных
+    (в орграфе — по сумме расстояний туда и обратно). Недостижимые от всех ориентиров вершины
+    имеют расстояние inf и выбираются первыми, так что каждая компонента получает ориентир.
+    Возвращает (landmarks, dist_from, dist_to): id ориентиров и таблицы n x k
+    dist_from[v, i] = d(L_i, v), dist_to[v, i] = d(v, L_i) (в неориентированном графе — тот же массив).
+    """
+    csr = as_csr(graph)
+    n = csr.number_of_nodes()
+    k = min(k, n)
+    fwd = DijkstraEngine(csr)
+    bwd = fwd if not csr.directed else DijkstraEngine(csr.reverse())
+    dist_from = np.empty((n, k), dtype=np.float64)
+    dist_to = dist_from if not csr.directed else np.empty((n, k), dtype=np.float64)
+    landmarks = np.empty(k, dtype=np.int64)
+    if not k:
+        return landmarks, dist_from, dist_to
+    d = _sssp(fwd, int(np.random.default_rng(seed).integers(n)))
+    d[np.isinf(d)] = -1
+    score = np.full(n, INF)
+    nxt = int(np.argmax(d))
+    for i in range(k):
+        landmarks[i] = nxt
+        dist_from[:, i] = _sssp(fwd, nxt)
+        if csr.directed:
+            dist_to[:, i] = _sssp(bwd, nxt)
+            np.minimum(score, dist_from[:, i] + dist_to[:, i], out=score)
+        else:
+            np.minimum(score, dist_from[:, i], out=score)
+        score[landmarks[:i + 1]] = -1
+        nxt = int(np.argmax(score))
+    return landmarks, dist_from, dist_to
+
+class LandmarkIndex:
+    """
+    Предобработка ALT (A*, Landmarks, Triangle inequality) для серии запросов на статичном графе.
+    По неравенству треугольника для ориентира L: d(v, t) >= d(L, t) - d(L, v) и
+    d(v, t) >= d(v, L) - d(t, L); максимум по ориентирам — согласованная нижняя оценка для A*.
+    На запрос берутся active ориентиров с лучшей оценкой d(s, t), оценки соседей считаются
+    одной операцией над строками таблиц.
+    Таблицы хранятся в каталоге как .npy (float64, чтобы оценки оставались допустимыми)
+    и при загрузке отображаются в память (mmap).
+    """
+
+    def __init__(self, graph, landmarks, dist_from, dist_to):
+        self.engine = DijkstraEngine(graph)
+        self.csr = self.engine.csr
+        self.landmarks = landmarks
+        self.dist_from = dist_from
+        self.dist_to = dist_to
+
+    @classmethod
+    def build(cls, graph, k=16, seed=0):
+        csr = as_csr(graph)
+        return cls(csr, *select_landmarks(csr, k, seed))
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        csr = self.csr
+        np.save(os.path.join(path, _META), np.array(_meta(csr)))
+        np.save(os.path.join(path, _LANDMARKS), np.asarray(self.landmarks, dtype=np.int64))
+        np.save(os.path.join(path, _FROM), np.ascontiguousarray(self.dist_from))
+        if csr.directed:
+            np.save(os.path.join(path, _TO), np.ascontiguousarray(self.dist_to))
+
+    @classmethod
+    def load(cls, path, graph, mmap=True):
+        """
+        Загружает таблицы, сохранённые save(); graph — тот же граф, что при построении
+        (сверяются размеры, ориентированность и отпечаток вершин, рёбер и весов).
+        """
+        csr = as_csr(graph)
+        mode = "r" if mmap else None
+        meta = [str(x) for x in np.load(os.path.join(path, _META)).tolist()]
+        if meta != _meta(csr):
+            raise ValueError(f"Индекс ориентиров в {path} построен для другого графа")
+        landmarks = np.load(os.path.join(path, _LANDMARKS))
+        dist_from = np.load(os.path.join(path, _FROM), mmap_mode=mode)
+        dist_to = np.load(os.path.join(path, _TO), mmap_mode=mode) if csr.directed else dist_from
+        return cls(csr, landmarks, dist_from, dist_to)
+
+    @property
+    def settled(self):
+        """Сколько вершин извлёк из кучи последний запрос."""
+        return self.engine.settled
+
+    def potential(self, source, target, active=4):
+        """
+        Функция нижних оценок расстояния до target (id) для массива вершин — по active
+        ориентирам с лучшей оценкой d(source, target) (все, если active=None).
+        """
+        dist_from, dist_to = self.dist_from, self.dist_to
+        tf = np.asarray(dist_from[target], dtype=np.float64)
+        tt = np.asarray(dist_to[target], dtype=np.float64)
+        cols = np.arange(len(self.landmarks))
+        if active is not None and active < len(cols):
+            with np.errstate(invalid="ignore"):
+                per = np.fmax(tf - dist_from[source], dist_to[source] - tt)
+            per[np.isnan(per)] = -INF
+            cols = np.sort(np.argsort(-per, kind="stable")[:active])
+        tf, tt = tf[cols], tt[cols]
+        same = dist_to is dist_from
+
+        def bounds(ids):
+            rows = dist_from[ids[:, None], cols]
+            back = rows if same else dist_to[ids[:, None], cols]
+            # fmax пропускает NaN (inf - inf): такой ориентир не связан ни с вершиной, ни с целью
+            with np.errstate(invalid="ignore"):
+                h = np.fmax(tf - rows, back - tt)
+            return np.fmax(np.fmax.reduce(h, axis=1), 0.0) if len(cols) else np.zeros(len(ids))
+
+        return bounds
+
+    def query_ids(self, source, target, active=4):
+        """ALT-запрос по id: (dist, path) или (inf, None)."""
+        d = self.engine.astar(source, target, self.potential(source, target, active))
+        if d == INF:
+            return INF, None
+        return d, self.engine.path_to(source, target)
+
+    def query(self, source, target, active=4):
+        """ALT-запрос по меткам: (dist, path) или (inf, None)."""
+        csr = self.csr
+        d, path = self.query_ids(csr.index[source], csr.index[target], active)
+        if path is None:
+            return INF, None
+        return d, [csr.labels[v] for v in path]
+
+def astar_path(graph, source, target, pos, scale=1.0, engine=None):
+    """
+    Обычный A* с евклидовой оценкой по координатам: pos — словарь метка -> (x, y, ...)
+    или массив n x dim в порядке id. Оценка scale * |pos(v) - pos(target)| допустима,
+    если вес каждого ребра не меньше scale * его длины.
+    Возвращает (dist, path) по меткам или (inf, None).
+    """
+    if engine is None:
+        engine = DijkstraEngine(graph)
+    csr = engine.csr
+    if isinstance(pos, dict):
+        coords = np.array([pos[v] for v in csr.labels], dtype=np.float64)
+    else:
+        coords = np.asarray(pos, dtype=np.float64)
+    s, t = csr.index[source], csr.index[target]
+    goal = coords[t]
+    d = engine.astar(s, t, lambda ids: scale * np.sqrt(((coords[ids] - goal) ** 2).sum(axis=1)))
+    if d == INF:
+        return INF, None
+    return d, [csr.labels[v] for v in engine.path_to(s, t)]
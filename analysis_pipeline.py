@@ -0,0 +1,266 @@
+# analysis_pipeline.py
+import time
+import networkx as nx
+import numpy as np
+from graph_csr import as_csr
+from graph_coloring import greedy_color
+from lab2_bfs import bfs_levels, bfs_order
+from lab3_dfs import dfs_preorder
+from lab4_metrics import component_metrics, connected_components_ids
+from lab5_euler import eulerian_path
+from lab6_hamiltonian import SEARCH_TIME_LIMIT, hamiltonian
+from result_cache import graph_hash, order_hash, result_key
+from tour_heuristics import nearest_neighbor_walk
+
+class GraphFacts:
+    """
+    Производные факты одного графа, которые нужны нескольким проверкам: CSR (конвертация
+    из networkx — один раз), степени, компоненты, нечётные вершины, двудольность,
+    метрики компонент, эйлеров обход, хеши для кэша результатов. Каждый факт вычисляется при первом запросе
+    и дальше берётся из кэша; computed — в каком порядке они реально считались.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.csr = as_csr(graph)
+        self.computed = []
+        self._cache = {}
+
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+            self.computed.append(key)
+        return self._cache[key]
+
+    def n(self):
+        return self.csr.number_of_nodes()
+
+    def degrees(self):
+        return self.csr.degree_array()
+
+    def components(self):
+        """Компоненты связности (у орграфа — слабые) — массивы id (lab4_metrics.connected_components_ids)."""
+        return self._get("components", lambda: connected_components_ids(self.csr))
+
+    def is_connected(self):
+        return self.n() > 0 and len(self.components()) == 1
+
+    def odd_vertices(self):
+        return self._get("odd_vertices", lambda: np.flatnonzero(self.degrees() % 2))
+
+    def bipartition(self):
+        """
+        Доли двудольного графа: массив 0/1 по id или None, если граф не двудольный
+        (у орграфа — его неориентированной основы).
+        Один многоисточниковый BFS (по вершине на компоненту) — чётность расстояния и есть доля.
+        """
+        def compute():
+            csr = self.csr.simple_undirected() if self.csr.directed else self.csr
+            roots = [int(c.min()) for c in self.components()]
+            _, dist, _ = bfs_levels(csr, roots)
+            side = dist % 2
+            if (side[csr.slot_rows()] == side[csr.targets]).any():
+                return None
+            return side
+        return self._get("bipartition", compute)
+
+    def component_metrics(self, workers=1):
+        """Эксцентриситеты, радиус, диаметр по компонентам (BFS из каждой вершины — один раз)."""
+        return self._get("component_metrics",
+                         lambda: component_metrics(self.csr, workers=workers, components=self.components()))
+
+    def euler(self):
+        # Хирхольцер запускается, только если проверка степеней в _trail_start прошла
+        return self._get("euler", lambda: eulerian_path(self.csr))
+
+    def networkx(self):
+        """Исходный граф networkx (для функций networkx, например clustering) или конвертация CSR."""
+        if hasattr(self.graph, "adj") and not hasattr(self.graph, "offsets"):
+            return self.graph
+        return self._get("networkx", self.csr.to_networkx)
+
+    def graph_hash(self):
+        """Канонический хеш (result_cache.graph_hash): не зависит от порядка ввода."""
+        return self._get("graph_hash", lambda: graph_hash(self.csr))
+
+    def order_hash(self):
+        return self._get("order_hash", lambda: order_hash(self.csr))
+
+    def hamiltonian_obstacle(self, cycle=True):
+        """
+        Дешёвые причины, по которым гамильтонова цикла (пути) заведомо нет, по уже известным
+        фактам — без перебора. None — причин не найдено. Для орграфа проверяется только
+        слабая связность.
+        """
+        n = self.n()
+        if n > 1 and not self.is_connected():
+            return "граф несвязен"
+        if self.csr.directed:
+            # проверки степеней и долей ниже — для неориентированного графа
+            return None
+        deg = self.degrees()
+        if cycle and n >= 3 and deg.min() < 2:
+            return "есть вершина степени меньше 2"
+        if not cycle and int((deg == 1).sum()) > 2:
+            return "больше двух вершин степени 1"
+        side = self.bipartition()
+        if side is not None and n >= 2:
+            part = int((side == 0).sum())
+            if (cycle and n >= 3 and part != n - part) or (not cycle and abs(2 * part - n) > 1):
+                return f"двудольный граф с долями {part} и {n - part}"
+        return None
+
+# ------------- Этапы -------------
+# этап — функция (facts, options) -> результат; порядок в словаре — порядок запуска
+STAGES = {}
+# для кэша: какие options влияют на результат этапа, зависит ли он от порядка вершин во вводе
+# и какие результаты можно сохранять (cacheable(result) ложно — только вернуть)
+STAGE_OPTIONS = {}
+ORDER_SENSITIVE = set()
+STAGE_CACHEABLE = {}
+
+def stage(name, options=(), order_sensitive=False, cacheable=None):
+    def register(func):
+        STAGES[name] = func
+        STAGE_OPTIONS[name] = tuple(options)
+        if order_sensitive:
+            ORDER_SENSITIVE.add(name)
+        if cacheable is not None:
+            STAGE_CACHEABLE[name] = cacheable
+        return func
+    return register
+
+def stage_key(facts, name, options):
+    """
+    Ключ результата этапа в result_cache. Этапы, чей ответ — свойство самого графа (метрики,
+    гамильтонов цикл, раскраска), кэшируются по каноническому хешу: тот же граф, введённый
+    в другом порядке, получает сохранённый — тоже верный — ответ. Порядки обходов зависят
+    от порядка ввода, для них берётся order_hash.
+    """
+    key = facts.order_hash() if name in ORDER_SENSITIVE else facts.graph_hash()
+    return result_key(key, name, {k: options.get(k) for k in STAGE_OPTIONS[name]})
+
+def _start(facts, options):
+    start = options.get("start")
+    if start is None or start not in facts.csr.index:
+        start = facts.csr.labels[0] if facts.n() else None
+    return start
+
+@stage("traversals", options=("start",), order_sensitive=True)
+def traversals_stage(facts, options):
+    # итеративный и «рекурсивный» DFS в test дают один и тот же порядок — считаем его один раз
+    start = _start(facts, options)
+    if start is None:
+        return {"start": None, "bfs": [], "dfs": []}
+    # порядок BFS — как у test.bfs по умолчанию (очередь FIFO)
+    return {"start": start, "bfs": bfs_order(facts.csr, start),
+            "dfs": dfs_preorder(facts.csr, start, sort_neighbors=False)}
+
+@stage("metrics")
+def metrics_stage(facts, options):
+    csr = facts.csr
+    labels = csr.labels
+    per_comp = facts.component_metrics(options.get("workers", 1))
+    G = facts.networkx()
+    if G.is_multigraph():
+        # кластеризация в networkx — только для простых графов: кратные рёбра схлопываются
+        G = nx.DiGraph(G) if G.is_directed() else nx.Graph(G)
+    metrics = {
+        "num_nodes": facts.n(),
+        "num_edges": csr.number_of_edges(),
+        "degrees": dict(zip(labels, facts.degrees().tolist())),
+        "num_components": len(per_comp),
+        "components": [set(m["nodes"]) for m in per_comp],
+        "eccentricity_by_component": {i: m["eccentricity"] for i, m in enumerate(per_comp, 1)},
+        "diameter_by_component": {i: m["diameter"] for i, m in enumerate(per_comp, 1)},
+        "radius_by_component": {i: m["radius"] for i, m in enumerate(per_comp, 1)},
+        "avg_shortest_path_by_component": {i: m["avg_shortest_path"] for i, m in enumerate(per_comp, 1)},
+        "clustering": nx.clustering(G),
+        "average_clustering": nx.average_clustering(G) if facts.n() > 0 else 0.0,
+    }
+    return metrics
+
+@stage("euler")
+def euler_stage(facts, options):
+    kind, edges = facts.euler()
+    return {"kind": kind, "edges": edges, "eulerian": kind == "circuit",
+            "odd_vertices": [facts.csr.labels[v] for v in facts.odd_vertices().tolist()]}
+
+def _hamiltonian(facts, cycle, time_limit):
+    # (статус, результат, причина): found / none / unknown
+    reason = facts.hamiltonian_obstacle(cycle)
+    if reason is not None:
+        return "none", None, reason
+    csr = facts.csr
+    info = {}
+    status, found = hamiltonian(csr, cycle=cycle, start=csr.labels[0] if cycle else None,
+                                time_limit=time_limit, stats=info)
+    return status, found, info.get("reason") if info.get("method") == "search" else None
+
+def _settled(result):
+    # "unknown" — бюджет перебора исчерпан, а не ответ о графе: такой результат не кэшируется
+    return "unknown" not in (result.get("cycle_status"), result.get("path_status"))
+
+@stage("hamiltonian", options=("time_limit",), cacheable=_settled)
+def hamiltonian_stage(facts, options):
+    """Цикл; путь ищется, только если цикла нет (цикл без последнего ребра — уже путь)."""
+    result = {"cycle": None, "path": None}
+    if not facts.n():
+        result.update(cycle_status="none", cycle_reason="пустой граф",
+                      path_status="none", path_reason="пустой граф")
+        return result
+    limit = options.get("time_limit", SEARCH_TIME_LIMIT)
+    status, cycle, reason = _hamiltonian(facts, True, limit)
+    result.update(cycle_status=status, cycle=cycle, cycle_reason=reason)
+    if cycle is None:
+        status, path, reason = _hamiltonian(facts, False, limit)
+        result.update(path_status=status, path=path, path_reason=reason)
+    return result
+
+@stage("coloring", options=("strategy", "coloring_time_limit"))
+def coloring_stage(facts, options):
+    coloring = greedy_color(facts.csr, strategy=options.get("strategy", "largest_first"),
+                            time_limit=options.get("coloring_time_limit"))
+    return {"coloring": coloring, "colors": len(set(coloring.values()))}
+
+@stage("nearest_neighbor", options=("start",), order_sensitive=True)
+def nearest_neighbor_stage(facts, options):
+    return {"path": nearest_neighbor_walk(facts.csr, _start(facts, options))}
+
+def run_pipeline(graph, stages=None, facts=None, stats=None, cache=None, **options):
+    """
+    Запускает выбранные этапы (имена из STAGES, по умолчанию — все, в порядке STAGES)
+    над одним набором фактов GraphFacts, так что степени, компоненты и т.п. считаются
+    один раз на граф. options передаются этапам: start, workers, time_limit (гамильтонов
+    перебор), strategy и coloring_time_limit (раскраска).
+    cache — result_cache.ResultCache: готовые результаты этапов берутся из него по stage_key,
+    новые туда сохраняются (кроме тех, что этап пометил как несохраняемые — cacheable).
+    Возвращает словарь имя этапа -> результат. В stats пишутся timings (секунды по этапам),
+    computed (какие факты понадобились) и cached (этапы, взятые из кэша).
+    """
+    names = list(STAGES) if stages is None else list(stages)
+    unknown = [s for s in names if s not in STAGES]
+    if unknown:
+        raise ValueError(f"Неизвестные этапы: {', '.join(unknown)}; есть: {', '.join(STAGES)}")
+    if facts is None:
+        facts = GraphFacts(graph)
+    results = {}
+    timings = {}
+    cached = []
+    for name in STAGES:
+        if name in names:
+            t = time.perf_counter()
+            if cache is None:
+                results[name] = STAGES[name](facts, options)
+            else:
+                results[name], hit = cache.get_or_compute(stage_key(facts, name, options),
+                                                          lambda: STAGES[name](facts, options),
+                                                          keep=STAGE_CACHEABLE.get(name))
+                if hit:
+                    cached.append(name)
+            timings[name] = time.perf_counter() - t
+    if stats is not None:
+        stats["timings"] = timings
+        stats["computed"] = list(facts.computed)
+        stats["cached"] = cached
+    return results
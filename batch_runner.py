@@ -0,0 +1,198 @@
+# batch_runner.py
+import argparse
+import io
+import json
+import math
+import os
+import signal
+import sys
+import time
+from multiprocessing import Pool
+import numpy as np
+from analysis_pipeline import STAGES, GraphFacts, run_pipeline
+from graph_stream import read_csr
+from lab1_graph_io import load_graph
+from result_cache import ResultCache
+from shared_graph import default_workers
+
+# стадии по умолчанию для пакетного режима: всё, кроме дорогих метрик по всем парам вершин
+DEFAULT_STAGES = ("traversals", "euler", "hamiltonian", "coloring")
+
+class GraphTimeout(Exception):
+    """Время на граф истекло (сигнал SIGALRM в рабочем процессе)."""
+
+def _on_alarm(signum, frame):
+    raise GraphTimeout()
+
+# ------------- Источники задач -------------
+def iter_tasks(source):
+    """
+    Задачи (id, вид, данные): каталог — по файлу на граф (id — имя файла, данные — путь;
+    формат определяет lab1_graph_io.load_graph, скрытые файлы пропускаются),
+    иначе поток или файл с графами в записи {{...},{...}} по одному на строку
+    (id — номер строки; пустые строки и строки с # пропускаются). "-" — stdin.
+    """
+    if source != "-" and os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and not name.startswith("."):
+                yield name, "file", path
+        return
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield f"line {line_no}", "text", line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+# ------------- Перевод результатов в JSON -------------
+def to_json(obj):
+    """Результаты этапов -> значения JSON: множества и кортежи — списки, ключи — строки, NumPy — числа."""
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(k): to_json(v) for k, v in obj.items()}
+    if isinstance(obj, (set, frozenset)):
+        return [to_json(v) for v in sorted(obj, key=str)]
+    if isinstance(obj, (list, tuple)):
+        return [to_json(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return to_json(obj.tolist())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+# ------------- Рабочий процесс -------------
+def _load(kind, data, directed):
+    if kind == "file":
+        return load_graph(data, directed=directed)
+    return read_csr(io.BytesIO(data.encode("utf-8")), directed=directed)
+
+def analyze_task(task, stages=DEFAULT_STAGES, timeout=None, directed=False, options=None, cache=None):
+    """
+    Один граф: загрузка и этапы по очереди над общими GraphFacts.
+    timeout (с) — общий лимит на граф через SIGALRM (только Unix, основной поток процесса);
+    при срабатывании в записи остаются уже готовые этапы и status="timeout".
+    cache — ResultCache: одинаковые графы в пакете (в том же рабочем процессе или через
+    общий каталог кэша) не пересчитываются; такие этапы перечислены в поле cached.
+    Возвращает запись для строки JSON-lines (status: ok / timeout / error); ошибки разбора
+    и этапов попадают в запись и не прерывают пакет.
+    """
+    task_id, kind, data = task
+    record = {"id": task_id, "status": "ok"}
+    results = {}
+    timings = {}
+    alarm = timeout and hasattr(signal, "setitimer")
+    if alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    current = "load"
+    start = time.perf_counter()
+    try:
+        csr = _load(kind, data, directed)
+        timings["load"] = time.perf_counter() - start
+        record["nodes"] = csr.number_of_nodes()
+        record["edges"] = csr.number_of_edges()
+        facts = GraphFacts(csr)
+        for name in stages:
+            current = name
+            stats = {}
+            results[name] = run_pipeline(csr, stages=[name], facts=facts, stats=stats,
+                                         cache=cache, **(options or {}))[name]
+            timings.update(stats["timings"])
+            if stats["cached"]:
+                record.setdefault("cached", []).append(name)
+    except GraphTimeout:
+        record["status"] = "timeout"
+        record["error"] = f"превышен лимит {timeout} с на этапе {current}"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        record["stage"] = current
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    record["results"] = to_json(results)
+    record["timings"] = timings
+    return record
+
+# настройки пакета в рабочем процессе — передаются один раз через initializer
+_settings = {}
+
+def _init_worker(settings, cache_dir=None):
+    _settings.update(settings)
+    _settings["cache"] = ResultCache(directory=cache_dir)
+
+def _run(task):
+    # сериализация — в рабочем процессе, главный только пишет строки
+    record = analyze_task(task, **_settings)
+    return record["status"], json.dumps(record, ensure_ascii=False)
+
+def run_batch(tasks, out, stages=DEFAULT_STAGES, workers=None, timeout=None, directed=False,
+              options=None, chunk_size=16, cache_dir=None):
+    """
+    Анализ потока задач на пуле процессов; строки JSON пишутся в out в порядке задач,
+    по мере готовности. workers=1 — без пула (в текущем процессе).
+    У каждого процесса — свой ResultCache в памяти; cache_dir — общий кэш на диске.
+    Возвращает счётчики статусов.
+    """
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise ValueError(f"Неизвестные этапы: {', '.join(unknown)}")
+    settings = {"stages": tuple(stages), "timeout": timeout, "directed": directed,
+                "options": options or {}}
+    workers = workers or default_workers()
+    counts = {"ok": 0, "timeout": 0, "error": 0}
+
+    def consume(lines):
+        for status, line in lines:
+            out.write(line + "\n")
+            counts[status] += 1
+
+    if workers == 1:
+        _init_worker(settings, cache_dir)
+        consume(map(_run, tasks))
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=(settings, cache_dir)) as pool:
+            consume(pool.imap(_run, tasks, chunksize=chunk_size))
+    out.flush()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетный анализ графов (JSON-lines)")
+    parser.add_argument("source", help="каталог с файлами графов или файл/поток с графом на строку ('-' — stdin)")
+    parser.add_argument("-o", "--output", help="файл результатов (по умолчанию — stdout)")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES),
+                        help="этапы через запятую: " + ", ".join(STAGES))
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument("--timeout", type=float, default=None, help="лимит времени на граф, с")
+    parser.add_argument("--directed", action="store_true", help="текстовые и CSV графы — ориентированные")
+    parser.add_argument("--hamiltonian-time-limit", type=float, default=None,
+                        help="бюджет перебора гамильтонова цикла/пути на граф, с")
+    parser.add_argument("--cache-dir", metavar="DIR", help="общий кэш результатов на диске")
+    args = parser.parse_args()
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"неизвестные этапы: {', '.join(unknown)}")
+    options = {}
+    if args.hamiltonian_time_limit is not None:
+        options["time_limit"] = args.hamiltonian_time_limit
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        counts = run_batch(iter_tasks(args.source), out, stages, args.workers, args.timeout,
+                           args.directed, options, cache_dir=args.cache_dir)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    total = sum(counts.values())
+    print(f"Графов: {total} ({counts['ok']} ok, {counts['timeout']} timeout, {counts['error']} error) "
+          f"за {time.perf_counter() - start:.2f} с", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# benchmark.py
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import networkx as nx
+import numpy as np
+import test as labs
+from graph_coloring import greedy_color
+from graph_generators import GENERATORS, generate
+from lab3_dfs import dfs
+from lab5_euler import eulerian_path
+from lab6_hamiltonian import hamiltonian
+from lab7_greedy_shortest_path import dijkstra
+from tour_heuristics import nearest_neighbor_walk
+
+DEFAULT_SIZES = (20, 1000, 10000, 100000)
+# бюджет перебора гамильтонова цикла в бенчмарке, секунды
+HAMILTONIAN_TIME_LIMIT = 2.0
+# разница меньше этого порога (секунды) при сравнении считается шумом
+NOISE_FLOOR = 0.001
+
+def _hamiltonian(G, start):
+    return hamiltonian(G, cycle=True, start=start, time_limit=HAMILTONIAN_TIME_LIMIT)
+
+# алгоритм -> (функция (граф, старт), наибольший размер n + m, нужны ли веса);
+# размер ограничен там, где время растёт быстрее O(V + E): метрики — BFS из каждой вершины
+# и кластеризация, nearest-neighbor — поиск ближайшей непосещённой вершины на каждом шаге
+ALGORITHMS = {
+    "bfs": (labs.bfs, None, False),
+    "dfs": (dfs, None, False),
+    "dfs_iterative": (labs.dfs_iterative, None, False),
+    "dfs_recursive": (labs.dfs_recursive, None, False),
+    "graph_metrics": (lambda G, s: labs.graph_metrics(G), 5000, False),
+    "dijkstra": (dijkstra, None, True),
+    "euler": (lambda G, s: eulerian_path(G, s), None, False),
+    "hamiltonian": (_hamiltonian, 5000, False),
+    "coloring": (lambda G, s: greedy_color(G), None, False),
+    "nearest_neighbor": (nearest_neighbor_walk, 5000, False),
+}
+# генератор -> наибольшее n (у полного графа n^2 / 2 рёбер)
+GENERATOR_LIMITS = {"clique": 2000}
+# (алгоритм, генератор) -> свой предел n + m вместо предела алгоритма: у цепочки диаметр n - 1,
+# так что BFS из каждой вершины в метриках — самый долгий случай набора по умолчанию
+PAIR_LIMITS = {("graph_metrics", "chain"): 1000}
+
+def _measure(func, G, start, repeat):
+    """Время (все повторы, секунды) и пиковая память (байты, tracemalloc — отдельным прогоном)."""
+    times = []
+    # CSR графа networkx кэшируется в G.__networkx_cache__ — каждый замер начинается без него
+    cache = getattr(G, "__networkx_cache__", None)
+    for _ in range(repeat):
+        if cache:
+            cache.clear()
+        t = time.perf_counter()
+        func(G, start)
+        times.append(time.perf_counter() - t)
+        if times[-1] > 5.0:
+            break
+    if cache:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        func(G, start)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+def run_benchmarks(algorithms=None, generators=None, sizes=DEFAULT_SIZES, repeat=3, seed=0,
+                   as_networkx=True, log=None):
+    """
+    Прогон алгоритмов на графах всех генераторов и размеров. Граф строится один раз
+    на (генератор, n); as_networkx=True (по умолчанию) — алгоритмы получают nx.Graph, как
+    в лабораторных (конвертация в CSR, если она нужна, входит во время), иначе CSRGraph.
+    Возвращает список записей: algorithm, generator, n, m, seconds_min, seconds_median,
+    peak_bytes, runs; пропущенные по ограничению размера n + m — status="skipped".
+    """
+    algorithms = list(ALGORITHMS) if algorithms is None else list(algorithms)
+    generators = list(GENERATORS) if generators is None else list(generators)
+    unknown = [a for a in algorithms if a not in ALGORITHMS] + [g for g in generators if g not in GENERATORS]
+    if unknown:
+        raise ValueError(f"Неизвестные алгоритмы/генераторы: {', '.join(unknown)}")
+    records = []
+    for kind in generators:
+        for n in sizes:
+            if n > GENERATOR_LIMITS.get(kind, n):
+                continue
+            graphs = {}
+            for name in algorithms:
+                func, limit, weighted = ALGORITHMS[name]
+                limit = PAIR_LIMITS.get((name, kind), limit)
+                if weighted not in graphs:
+                    g = generate(kind, n, seed=seed, weighted=weighted)
+                    graphs[weighted] = g.to_networkx() if as_networkx else g
+                G = graphs[weighted]
+                record = {"algorithm": name, "generator": kind, "n": n, "m": G.number_of_edges()}
+                if limit is not None and n + record["m"] > limit:
+                    record["status"] = "skipped"
+                    records.append(record)
+                    continue
+                start = next(iter(G.nodes()), None) if as_networkx else (G.labels[0] if n else None)
+                times, peak = _measure(func, G, start, repeat)
+                record.update(status="ok", seconds_min=min(times),
+                              seconds_median=statistics.median(times), peak_bytes=peak, runs=len(times))
+                records.append(record)
+                if log:
+                    log(f"{name:>16} {kind:>12} n={n:<7} {record['seconds_min']:.4f} с "
+                        f"{peak / 2**20:8.1f} МиБ")
+    return records
+
+def _meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "networkx": nx.__version__,
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "input": "csr" if args.csr else "networkx",
+    }
+
+def compare(baseline, records, threshold=0.2):
+    """
+    Сравнение с прошлым прогоном (записи сопоставляются по algorithm, generator, n)
+    по минимальному времени. Возвращает список (запись, было, стало, отношение) для тех,
+    что замедлились больше чем на threshold (доля) и больше NOISE_FLOOR секунд.
+    """
+    old = {(r["algorithm"], r["generator"], r["n"]): r for r in baseline
+           if r.get("status") == "ok"}
+    regressions = []
+    for r in records:
+        prev = old.get((r["algorithm"], r["generator"], r["n"]))
+        if r.get("status") != "ok" or prev is None:
+            continue
+        before, after = prev["seconds_min"], r["seconds_min"]
+        if after - before > NOISE_FLOOR and after > before * (1 + threshold):
+            regressions.append((r, before, after, after / before if before else float('inf')))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк алгоритмов лабораторных на синтетических графах")
+    parser.add_argument("--algorithms", help="через запятую: " + ", ".join(ALGORITHMS) + " (по умолчанию — все)")
+    parser.add_argument("--generators", help="через запятую: " + ", ".join(GENERATORS) + " (по умолчанию — все)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="числа вершин через запятую")
+    parser.add_argument("--repeat", type=int, default=3, help="повторов на замер (берётся минимум)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csr", action="store_true", help="передавать алгоритмам CSRGraph, а не nx.Graph")
+    parser.add_argument("-o", "--output", help="JSON с результатами")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON прошлого прогона: сообщить о замедлениях")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое замедление, доля (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    def names(text, known):
+        if not text:
+            return None
+        chosen = [x.strip() for x in text.split(",") if x.strip()]
+        unknown = [x for x in chosen if x not in known]
+        if unknown:
+            parser.error(f"неизвестные: {', '.join(unknown)}")
+        return chosen
+
+    algorithms = names(args.algorithms, ALGORITHMS)
+    generators = names(args.generators, GENERATORS)
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    records = run_benchmarks(algorithms, generators, sizes, repeat=args.repeat, seed=args.seed,
+                             as_networkx=not args.csr, log=lambda s: print(s, file=sys.stderr))
+    report = {"meta": _meta(args), "results": records}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        old_meta = baseline.get("meta", {})
+        for key in ("input", "seed"):
+            if old_meta.get(key) != report["meta"][key]:
+                print(f"Внимание: {key} прошлого прогона — {old_meta.get(key)}, сейчас — {report['meta'][key]}",
+                      file=sys.stderr)
+        regressions = compare(baseline["results"], records, args.threshold)
+        for r, before, after, ratio in regressions:
+            print(f"Замедление: {r['algorithm']} на {r['generator']} n={r['n']}: "
+                  f"{before:.4f} -> {after:.4f} с (x{ratio:.2f})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("Замедлений нет", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
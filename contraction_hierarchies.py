@@ -0,0 +1,411 @@
+# contraction_hierarchies.py
+import hashlib
+import heapq
+import os
+import numpy as np
+from graph_csr import as_csr
+from indexed_heap import IndexedDaryHeap
+from result_cache import order_hash
+
+INF = float('inf')
+
+# файлы индекса в каталоге (.npy, при загрузке отображаются в память)
+_META = "meta.npy"
+_RANK = "rank.npy"
+_UP = ("offsets", "targets", "weights", "middle")
+
+def _graph_key(csr):
+    # ранги и ярлыки индекса привязаны к id вершин и весам рёбер графа
+    h = hashlib.blake2b(order_hash(csr).encode("ascii"), digest_size=20)
+    h.update(np.ascontiguousarray(csr.weights, dtype="<f8").tobytes())
+    return h.hexdigest()
+
+def _witness(out_adj, source, skip, max_dist, goals, limit):
+    """
+    Поиск свидетелей: Дейкстра от source по ещё не сжатым вершинам в обход skip,
+    не дальше max_dist и не больше limit извлечённых вершин (или пока не найдены все goals).
+    Возвращает словарь найденных расстояний.
+    """
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    left = len(goals)
+    settled = 0
+    while heap and left and settled < limit:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        settled += 1
+        if u in goals:
+            left -= 1
+        for v, w in out_adj[u].items():
+            nd = d + w
+            # пути длиннее max_dist свидетелями быть не могут — их не кладём в кучу
+            if nd <= max_dist and v != skip and nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+def _shortcuts(in_adj, out_adj, v, limit):
+    # ярлыки u -> w через v, нужные, если нет пути-свидетеля не длиннее u -> v -> w
+    result = []
+    outs = out_adj[v]
+    for u, wu in in_adj[v].items():
+        pairs = [(w, wu + ww) for w, ww in outs.items() if w != u]
+        if not pairs:
+            continue
+        max_dist = max(d for _, d in pairs)
+        dist = _witness(out_adj, u, v, max_dist, {w for w, _ in pairs}, limit)
+        for w, d in pairs:
+            if dist.get(w, INF) > d:
+                result.append((u, w, d))
+    return result
+
+def _priority(in_adj, out_adj, deleted, v, limit):
+    # разность рёбер (ярлыки минус удаляемые рёбра) + число уже сжатых соседей
+    return (len(_shortcuts(in_adj, out_adj, v, limit))
+            - len(in_adj[v]) - len(out_adj[v]) + deleted[v])
+
+def _upward_csr(rows, n):
+    # списки (сосед, вес, середина) по вершинам -> CSR с соседями по возрастанию id
+    counts = np.array([len(r) for r in rows], dtype=np.int64)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    flat = [arc for r in rows for arc in sorted(r)]
+    targets = np.array([a[0] for a in flat], dtype=np.int64)
+    weights = np.array([a[1] for a in flat], dtype=np.float64)
+    middle = np.array([a[2] for a in flat], dtype=np.int64)
+    return offsets, targets, weights, middle
+
+class ContractionHierarchy:
+    """
+    Иерархия сжатий (contraction hierarchies) для статичного взвешенного графа.
+    Построение: вершины сжимаются по одной в порядке приоритета (разность рёбер + число
+    сжатых соседей; после сжатия вершины приоритеты её соседей пересчитываются); при сжатии v для пар соседей u -> v -> w
+    добавляется ярлык u -> w с серединой v, если локальный поиск свидетелей не нашёл
+    путь не длиннее. Рёбра и ярлыки к вершинам с большим рангом образуют «восходящие» графы:
+    up — по направлению рёбер, down — против (в неориентированном графе это один граф).
+    Запрос — двунаправленный Дейкстра только вверх по рангам (со stall-on-demand); путь восстанавливается
+    раскрытием ярлыков через middle. Массивы хранятся в каталоге .npy и загружаются через mmap.
+    """
+
+    def __init__(self, rank, up, down, directed, num_edges, labels=None, index=None, key=None):
+        n = len(rank)
+        self.rank = rank
+        self.up = up
+        self.down = down
+        self.directed = directed
+        self.num_edges = num_edges
+        self.labels = labels if labels is not None else range(n)
+        self.index = index
+        self.key = key
+        self._off = (up[0].tolist(), down[0].tolist())
+        self._dist = ([INF] * n, [INF] * n)
+        self._prev = ([-1] * n, [-1] * n)
+        self._heaps = (IndexedDaryHeap(n), IndexedDaryHeap(n))
+        self._touched = ([], [])
+        self.settled = 0
+
+    # ------------- Построение -------------
+    @classmethod
+    def build(cls, graph, witness_limit=100, order_limit=10):
+        """
+        Строит иерархию для графа с неотрицательными весами (кратные рёбра — по минимальному
+        весу, петли отбрасываются). witness_limit — сколько вершин может извлечь один поиск
+        свидетелей при сжатии: меньше — быстрее построение, но больше лишних ярлыков.
+        order_limit — то же для оценки приоритетов (она пересчитывается для всех соседей
+        каждой сжатой вершины, поэтому поиск здесь короче).
+        """
+        csr = as_csr(graph)
+        n = csr.number_of_nodes()
+        out_adj = [dict() for _ in range(n)]
+        in_adj = [dict() for _ in range(n)] if csr.directed else out_adj
+        for u, v, w in csr.edge_list():
+            if u == v:
+                continue
+            pairs = ((u, v), (v, u)) if not csr.directed else ((u, v),)
+            for a, b in pairs:
+                if w < out_adj[a].get(b, INF):
+                    out_adj[a][b] = w
+                    in_adj[b][a] = w
+        middle = {}
+        deleted = [0] * n
+        prio = [_priority(in_adj, out_adj, deleted, v, order_limit) for v in range(n)]
+        heap = [(p, v) for v, p in enumerate(prio)]
+        heapq.heapify(heap)
+        contracted = bytearray(n)
+        rank = np.empty(n, dtype=np.int64)
+        up_rows = [None] * n
+        down_rows = [None] * n
+        level = 0
+        while heap:
+            p, v = heapq.heappop(heap)
+            # устаревшая запись: приоритет уже пересчитан после сжатия соседа
+            if contracted[v] or p != prio[v]:
+                continue
+            for u, w, d in _shortcuts(in_adj, out_adj, v, witness_limit):
+                if d < out_adj[u].get(w, INF):
+                    out_adj[u][w] = d
+                    in_adj[w][u] = d
+                    middle[(u, w)] = v
+                    if not csr.directed:
+                        # поиск свидетелей от u и от w может дать разный ответ — храним обе ориентации
+                        middle[(w, u)] = v
+            # оставшиеся рёбра v ведут к вершинам с большим рангом
+            up_rows[v] = [(w, d, middle.get((v, w), -1)) for w, d in out_adj[v].items()]
+            down_rows[v] = [(u, d, middle.get((u, v), -1)) for u, d in in_adj[v].items()]
+            contracted[v] = 1
+            rank[v] = level
+            level += 1
+            neighbors = set(in_adj[v]) | set(out_adj[v])
+            for u in in_adj[v]:
+                del out_adj[u][v]
+            if csr.directed:
+                for w in out_adj[v]:
+                    del in_adj[w][v]
+            out_adj[v] = {}
+            in_adj[v] = {}
+            for u in neighbors:
+                deleted[u] += 1
+                prio[u] = _priority(in_adj, out_adj, deleted, u, order_limit)
+                heapq.heappush(heap, (prio[u], u))
+        up = _upward_csr(up_rows, n)
+        down = _upward_csr(down_rows, n) if csr.directed else up
+        return cls(rank, up, down, csr.directed, csr.num_edges, csr.labels, csr.index, _graph_key(csr))
+
+    def number_of_shortcuts(self):
+        count = int((self.up[3] >= 0).sum())
+        if self.directed:
+            count += int((self.down[3] >= 0).sum())
+        return count
+
+    # ------------- Хранение -------------
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        n = len(self.rank)
+        meta = [str(n), str(self.num_edges), str(int(self.directed)), self.key or ""]
+        np.save(os.path.join(path, _META), np.array(meta))
+        np.save(os.path.join(path, _RANK), np.asarray(self.rank))
+        graphs = (("up", self.up), ("down", self.down)) if self.directed else (("up", self.up),)
+        for prefix, arrays in graphs:
+            for field, arr in zip(_UP, arrays):
+                np.save(os.path.join(path, f"{prefix}_{field}.npy"), np.asarray(arr))
+
+    @classmethod
+    def load(cls, path, graph=None, mmap=True):
+        """
+        Загружает индекс, сохранённый save(). Без graph вершины — id 0..n-1;
+        с graph — проверяется, что это тот же граф (размеры, ориентированность и отпечаток
+        вершин, рёбер и весов), и запросы принимают метки.
+        """
+        mode = "r" if mmap else None
+        meta = [str(x) for x in np.load(os.path.join(path, _META)).tolist()]
+        n, num_edges, directed = (int(x) for x in meta[:3])
+        key = meta[3] if len(meta) > 3 and meta[3] else None
+        labels = index = None
+        if graph is not None:
+            csr = as_csr(graph)
+            expected = [str(csr.number_of_nodes()), str(csr.num_edges), str(int(csr.directed)), _graph_key(csr)]
+            if meta != expected:
+                raise ValueError(f"Иерархия в {path} построена для другого графа")
+            labels, index = csr.labels, csr.index
+        rank = np.load(os.path.join(path, _RANK), mmap_mode=mode)
+        up = tuple(np.load(os.path.join(path, f"up_{field}.npy"), mmap_mode=mode) for field in _UP)
+        down = (tuple(np.load(os.path.join(path, f"down_{field}.npy"), mmap_mode=mode) for field in _UP)
+                if directed else up)
+        return cls(rank, up, down, bool(directed), num_edges, labels, index, key)
+
+    # ------------- Запросы -------------
+    def _reset(self):
+        for side in (0, 1):
+            dist, prev = self._dist[side], self._prev[side]
+            for v in self._touched[side]:
+                dist[v] = INF
+                prev[v] = -1
+            self._touched[side].clear()
+            self._heaps[side].clear()
+        self.settled = 0
+
+    def _start(self, side, v):
+        self._dist[side][v] = 0.0
+        self._touched[side].append(v)
+        self._heaps[side].push(v, 0.0)
+
+    def _stalled(self, side, u, d):
+        # stall-on-demand: если до u короче дойти сверху (через вершину большего ранга),
+        # её расстояние в этом поиске не кратчайшее и дальше её не раскрываем
+        _, targets, weights, _ = (self.up, self.down)[1 - side]
+        off = self._off[1 - side]
+        lo, hi = off[u], off[u + 1]
+        if lo == hi:
+            return False
+        dist = self._dist[side]
+        return any(dist[v] + w < d for v, w in zip(targets[lo:hi].tolist(), weights[lo:hi].tolist()))
+
+    def _relax(self, side, u, d):
+        _, targets, weights, _ = (self.up, self.down)[side]
+        off = self._off[side]
+        dist, prev, heap, touched = self._dist[side], self._prev[side], self._heaps[side], self._touched[side]
+        lo, hi = off[u], off[u + 1]
+        for v, w in zip(targets[lo:hi].tolist(), weights[lo:hi].tolist()):
+            nd = d + w
+            if nd < dist[v]:
+                if dist[v] == INF:
+                    touched.append(v)
+                dist[v] = nd
+                prev[v] = u
+                heap.push(v, nd)
+
+    def _upward_space(self, side, start):
+        """
+        Полный поиск вверх от start (side 0 — по up, 1 — по down): вершины, достигнутые
+        с точным расстоянием (без остановленных stall-on-demand), и расстояния до них.
+        """
+        self._reset()
+        self._start(side, start)
+        heap = self._heaps[side]
+        space = []
+        dists = []
+        while heap:
+            u, d = heap.pop()
+            self.settled += 1
+            if not self._stalled(side, u, d):
+                space.append(u)
+                dists.append(d)
+                self._relax(side, u, d)
+        return space, dists
+
+    def _search(self, source, target):
+        """
+        Двунаправленный поиск вверх по рангам. Направление прекращается, когда минимум его
+        кучи не меньше лучшего найденного расстояния mu. Возвращает (mu, вершина встречи).
+        """
+        self._reset()
+        self._start(0, source)
+        self._start(1, target)
+        mu = INF
+        meet = -1
+        settled = 0
+        side = 1
+        while True:
+            h0, h1 = self._heaps
+            live0 = bool(h0) and h0.peek_key() < mu
+            live1 = bool(h1) and h1.peek_key() < mu
+            if not (live0 or live1):
+                break
+            # чередуем направления, пока оба живы
+            side = (1 - side) if (live0 and live1) else (0 if live0 else 1)
+            other = self._dist[1 - side]
+            u, d = self._heaps[side].pop()
+            settled += 1
+            if other[u] != INF and d + other[u] < mu:
+                mu = d + other[u]
+                meet = u
+            if not self._stalled(side, u, d):
+                self._relax(side, u, d)
+        self.settled = settled
+        return mu, meet
+
+    def _middle(self, a, b):
+        # дуга a -> b хранится у вершины меньшего ранга: в up, если это a, иначе в down у b
+        if self.rank[a] < self.rank[b]:
+            offsets, targets, _, middle = self.up
+            row, key = a, b
+        else:
+            offsets, targets, _, middle = self.down
+            row, key = b, a
+        lo, hi = int(offsets[row]), int(offsets[row + 1])
+        return int(middle[lo + int(np.searchsorted(targets[lo:hi], key))])
+
+    def _unpack(self, arcs):
+        # раскрытие ярлыков явным стеком: ярлык a -> b через m заменяется на a -> m, m -> b
+        path = [arcs[0][0]] if arcs else []
+        stack = list(reversed(arcs))
+        while stack:
+            a, b = stack.pop()
+            m = self._middle(a, b)
+            if m < 0:
+                path.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+        return path
+
+    def distance_ids(self, source, target):
+        """Расстояние между вершинами (id) или inf."""
+        if source == target:
+            return 0.0
+        return self._search(source, target)[0]
+
+    def query_ids(self, source, target):
+        """(dist, path) по id; path — исходные рёбра после раскрытия ярлыков, или (inf, None)."""
+        if source == target:
+            return 0.0, [source]
+        mu, meet = self._search(source, target)
+        if meet < 0:
+            return INF, None
+        fwd = [meet]
+        while fwd[-1] != source:
+            fwd.append(self._prev[0][fwd[-1]])
+        fwd.reverse()
+        bwd = [meet]
+        while bwd[-1] != target:
+            bwd.append(self._prev[1][bwd[-1]])
+        nodes = fwd + bwd[1:]
+        return mu, self._unpack(list(zip(nodes, nodes[1:])))
+
+    def query(self, source, target):
+        """
+        (dist, path) по меткам; path — тот же список вершин от source до target,
+        что даёт reconstruct_path, или (inf, None), если пути нет.
+        """
+        if self.index is None:
+            raise ValueError("Иерархия загружена без графа: используйте query_ids")
+        d, path = self.query_ids(self.index[source], self.index[target])
+        if path is None:
+            return INF, None
+        return d, [self.labels[v] for v in path]
+
+    def many_to_many_ids(self, sources, targets):
+        """
+        Матрица расстояний len(sources) x len(targets) (id, inf — нет пути) бакетным алгоритмом:
+        по одному поиску вверх на каждую цель (против рёбер) — записи (цель, расстояние)
+        раскладываются по «бакетам» достигнутых вершин; затем по одному поиску вверх на
+        каждый источник — его строка матрицы получается минимумом d(s, v) + d(v, t) по бакетам
+        всех достигнутых v. Всего |S| + |T| поисков вместо |S| * |T| запросов.
+        """
+        n = len(self.rank)
+        result = np.full((len(sources), len(targets)), INF)
+        if not len(sources) or not len(targets):
+            return result
+        verts, cols, dists = [], [], []
+        for j, t in enumerate(targets):
+            space, d = self._upward_space(1, t)
+            verts.extend(space)
+            cols.extend([j] * len(space))
+            dists.extend(d)
+        verts = np.array(verts, dtype=np.int64)
+        order = np.argsort(verts, kind="stable")
+        bucket_cols = np.array(cols, dtype=np.int64)[order]
+        bucket_dist = np.array(dists, dtype=np.float64)[order]
+        bucket_off = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(verts, minlength=n), out=bucket_off[1:])
+        for i, s in enumerate(sources):
+            space, d = self._upward_space(0, s)
+            space = np.array(space, dtype=np.int64)
+            starts = bucket_off[space]
+            counts = bucket_off[space + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                continue
+            # все записи бакетов достигнутых вершин подряд, как слоты фронтира в bfs_levels
+            slots = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            np.minimum.at(result[i], bucket_cols[slots],
+                          np.repeat(np.array(d), counts) + bucket_dist[slots])
+        return result
+
+    def many_to_many(self, sources, targets):
+        """Матрица расстояний между списками меток (строки — sources, столбцы — targets)."""
+        if self.index is None:
+            raise ValueError("Иерархия загружена без графа: используйте many_to_many_ids")
+        return self.many_to_many_ids([self.index[s] for s in sources],
+                                     [self.index[t] for t in targets])
@@ -0,0 +1,69 @@
+# distance_matrix.py
+import numpy as np
+from graph_csr import as_csr
+from lab2_bfs import bfs_levels
+from lab7_greedy_shortest_path import DijkstraEngine, INF
+from contraction_hierarchies import ContractionHierarchy
+
+def _bfs_row(csr, source, target_ids):
+    _, dist, parent = bfs_levels(csr, [source])
+    row = dist[target_ids].astype(np.float64)
+    row[row < 0] = INF
+    return row, parent
+
+def one_to_many(graph, source, targets, weighted=True, engine=None, parents=False):
+    """
+    Расстояния от source до каждой вершины targets (метки) одним поиском: массив float
+    в порядке targets, inf — нет пути.
+    weighted=True — Дейкстра, остановленный, как только извлечены все цели;
+    weighted=False — число рёбер (один поуровневый BFS).
+    engine — DijkstraEngine для серии вызовов по одному графу.
+    parents=True — ещё и массив родителей по id (-1 — нет), по которому восстанавливаются
+    пути до целей: (dist, parent).
+    """
+    if engine is None:
+        engine = DijkstraEngine(graph) if weighted else None
+    csr = engine.csr if engine is not None else as_csr(graph)
+    s = csr.index[source]
+    target_ids = np.array([csr.index[t] for t in targets], dtype=np.int64)
+    if not weighted:
+        row, parent = _bfs_row(csr, s, target_ids)
+        return (row, parent) if parents else row
+    engine.run_many(s, target_ids.tolist())
+    dist = engine.dist
+    row = np.array([dist[t] for t in target_ids.tolist()], dtype=np.float64)
+    if parents:
+        return row, np.array(engine.prev, dtype=np.int64)
+    return row
+
+def many_to_many(graph, sources, targets, method="auto", weighted=True, hierarchy=None):
+    """
+    Матрица расстояний len(sources) x len(targets) (NumPy, inf — нет пути) между списками меток.
+    method:
+      "dijkstra" — по одному Дейкстре с остановкой по целям на каждый источник;
+      "ch"       — бакетный алгоритм на иерархии сжатий (hierarchy или построенной здесь):
+                   |S| + |T| поисков вверх вместо |S| поисков по всему графу;
+      "auto"     — "ch", если передана hierarchy, иначе "dijkstra".
+    weighted=False — расстояния в рёбрах (BFS из каждого источника); с ним допустим только
+    method="auto" без hierarchy, явный "dijkstra"/"ch" или hierarchy — ValueError.
+    """
+    if method not in ("auto", "dijkstra", "ch"):
+        raise ValueError(f"Неизвестный метод: {method}")
+    if not weighted and (method != "auto" or hierarchy is not None):
+        raise ValueError(f"weighted=False считается BFS: method={method!r} и hierarchy с ним не применимы")
+    if not weighted:
+        csr = as_csr(graph)
+        target_ids = np.array([csr.index[t] for t in targets], dtype=np.int64)
+        result = np.full((len(sources), len(targets)), INF)
+        for i, s in enumerate(sources):
+            result[i], _ = _bfs_row(csr, csr.index[s], target_ids)
+        return result
+    if method == "ch" or (method == "auto" and hierarchy is not None):
+        if hierarchy is None:
+            hierarchy = ContractionHierarchy.build(graph)
+        return hierarchy.many_to_many(sources, targets)
+    engine = DijkstraEngine(graph)
+    result = np.full((len(sources), len(targets)), INF)
+    for i, s in enumerate(sources):
+        result[i] = one_to_many(graph, s, targets, engine=engine)
+    return result
@@ -0,0 +1,365 @@
+# dynamic_graph.py
+import heapq
+from graph_csr import CSRGraph, as_csr
+from lab4_metrics import connected_components_ids
+
+INF = float('inf')
+
+class DynamicGraph:
+    """
+    Неориентированный простой граф, который меняется по ребру, с поддержкой без пересчёта с нуля:
+      * компоненты связности — система непересекающихся множеств (меньшее множество
+        вливается в большее); при удалении ребра — встречный BFS из его концов, который
+        останавливается при встрече или когда одна сторона исчерпана (она и отделилась);
+      * степени, нечётные вершины и эйлеров статус (как kind у lab5_euler.eulerian_path);
+      * деревья кратчайших путей (Дейкстра, веса неотрицательные) из зарегистрированных
+        источников: вставка ребра или уменьшение веса — распространение улучшений из концов
+        ребра, удаление ребра дерева — пересчёт только отрезанного поддерева.
+    Вершины внутри — целые id в порядке появления; labels: id -> метка, index: метка -> id.
+    """
+
+    def __init__(self):
+        self.labels = []
+        self.index = {}
+        self.adj = []
+        self.weighted = False
+        self._deg = []
+        self._odd = set()
+        self._comp = []
+        self._members = {}
+        self._comp_edges = {}
+        self._with_edges = 0
+        self._next_comp = 0
+        self._trees = {}
+        self.num_edges = 0
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Начальное состояние из CSRGraph или networkx: компоненты — один проход BFS, а не слияния."""
+        csr = as_csr(graph)
+        if csr.directed or csr.multigraph:
+            raise ValueError("DynamicGraph поддерживает только неориентированные графы без кратных рёбер")
+        g = cls()
+        for v in csr.labels:
+            g.add_node(v)
+        g.weighted = csr.weighted
+        adj = g.adj
+        for u, v, w in csr.edge_list():
+            if w < 0:
+                raise ValueError(f"Отрицательный вес ребра ({csr.labels[u]}, {csr.labels[v]})")
+            adj[u][v] = w
+            adj[v][u] = w
+        g.num_edges = csr.num_edges
+        g._deg = csr.degree_array().tolist()
+        g._odd = {v for v, d in enumerate(g._deg) if d % 2}
+        g._members = {}
+        g._comp_edges = {}
+        for c, comp in enumerate(connected_components_ids(csr)):
+            ids = comp.tolist()
+            for v in ids:
+                g._comp[v] = c
+            g._members[c] = set(ids)
+            g._comp_edges[c] = sum(g._deg[v] for v in ids) // 2
+        g._next_comp = len(g._members)
+        g._with_edges = sum(1 for e in g._comp_edges.values() if e)
+        return g
+
+    # ------------- Изменения -------------
+    def add_node(self, label):
+        """Добавляет изолированную вершину (если её ещё нет); возвращает её id."""
+        i = self.index.get(label)
+        if i is not None:
+            return i
+        i = len(self.labels)
+        self.labels.append(label)
+        self.index[label] = i
+        self.adj.append({})
+        self._deg.append(0)
+        c = self._next_comp
+        self._next_comp += 1
+        self._comp.append(c)
+        self._members[c] = {i}
+        self._comp_edges[c] = 0
+        for dist, prev in self._trees.values():
+            dist.append(INF)
+            prev.append(-1)
+        return i
+
+    def add_edge(self, u, v, weight=None):
+        """
+        Вставляет ребро (отсутствующие вершины создаются) или меняет вес существующего,
+        как add_edge в networkx. weight=None — вес 1.
+        """
+        if weight is None:
+            weight = 1.0
+        else:
+            self.weighted = True
+        if weight < 0:
+            raise ValueError(f"Отрицательный вес ребра ({u}, {v})")
+        a = self.add_node(u)
+        b = self.add_node(v)
+        old = self.adj[a].get(b)
+        self.adj[a][b] = weight
+        self.adj[b][a] = weight
+        if old is None:
+            self.num_edges += 1
+            self._bump_degree(a, b, 1)
+            self._union(a, b)
+            for dist, prev in self._trees.values():
+                self._relax_edge(dist, prev, a, b, weight)
+        elif weight < old:
+            for dist, prev in self._trees.values():
+                self._relax_edge(dist, prev, a, b, weight)
+        elif weight > old:
+            for dist, prev in self._trees.values():
+                self._repair(dist, prev, a, b)
+
+    def remove_edge(self, u, v):
+        """Удаляет ребро; нет такого ребра — ValueError."""
+        a = self.index.get(u)
+        b = self.index.get(v)
+        if a is None or b is None or b not in self.adj[a]:
+            raise ValueError(f"Ребра ({u}, {v}) нет в графе")
+        del self.adj[a][b]
+        if a != b:
+            del self.adj[b][a]
+        self.num_edges -= 1
+        self._bump_degree(a, b, -1)
+        self._split(a, b)
+        for dist, prev in self._trees.values():
+            self._repair(dist, prev, a, b)
+
+    def apply(self, edits):
+        """
+        Пакет правок по порядку: ("add", u, v), ("add", u, v, вес) или ("remove", u, v).
+        Каждая правка обновляет поддерживаемые структуры сразу, так что пакет стоит
+        столько же, сколько отдельные вызовы.
+        """
+        for edit in edits:
+            op = edit[0]
+            if op == "add":
+                self.add_edge(*edit[1:])
+            elif op == "remove":
+                self.remove_edge(*edit[1:])
+            else:
+                raise ValueError(f"Неизвестная правка: {op}")
+
+    # ------------- Степени и эйлеров статус -------------
+    def _bump_degree(self, a, b, sign):
+        # петля даёт степени 2 (как в networkx) — чётность не меняется
+        for x in ((a, b) if a != b else (a, a)):
+            self._deg[x] += sign
+            self._odd ^= {x}
+        c = self._comp[a]
+        before = self._comp_edges[c]
+        self._comp_edges[c] = before + sign
+        self._with_edges += bool(before + sign) - bool(before)
+
+    def degree(self, label):
+        return self._deg[self.index[label]]
+
+    def odd_vertices(self):
+        return [self.labels[v] for v in sorted(self._odd)]
+
+    def euler_status(self):
+        """
+        "circuit", "trail" или None — то же, что kind у eulerian_path для текущего графа:
+        все рёбра в одной компоненте и 0 (цикл) или 2 (путь) нечётные вершины.
+        Стоит O(1): число нечётных вершин и компонент с рёбрами поддерживаются при правках.
+        """
+        if not self.labels:
+            return None
+        if self.num_edges == 0:
+            return "circuit"
+        if self._with_edges > 1:
+            return None
+        return {0: "circuit", 2: "trail"}.get(len(self._odd))
+
+    # ------------- Компоненты -------------
+    def _union(self, a, b):
+        ca, cb = self._comp[a], self._comp[b]
+        if ca == cb:
+            return
+        if len(self._members[ca]) < len(self._members[cb]):
+            ca, cb = cb, ca
+        small = self._members.pop(cb)
+        for x in small:
+            self._comp[x] = ca
+        self._members[ca] |= small
+        edges = self._comp_edges.pop(cb)
+        if edges and self._comp_edges[ca]:
+            self._with_edges -= 1
+        self._comp_edges[ca] += edges
+
+    def _split(self, a, b):
+        """
+        Связаны ли a и b после удаления ребра: поиск в ширину из обоих концов по очереди,
+        расширяется сторона с меньшим числом посещённых вершин. Встреча — компонента цела;
+        исчерпанная сторона — новая компонента (работа пропорциональна меньшей части).
+        """
+        if a == b:
+            return
+        adj = self.adj
+        seen = ({a}, {b})
+        frontier = ([a], [b])
+        while True:
+            side = 0 if len(seen[0]) <= len(seen[1]) else 1
+            mine, other = seen[side], seen[1 - side]
+            nxt = []
+            for x in frontier[side]:
+                for y in adj[x]:
+                    if y in other:
+                        return
+                    if y not in mine:
+                        mine.add(y)
+                        nxt.append(y)
+            if not nxt:
+                break
+            frontier = (nxt, frontier[1]) if side == 0 else (frontier[0], nxt)
+        part = seen[side]
+        old = self._comp[a]
+        c = self._next_comp
+        self._next_comp += 1
+        for x in part:
+            self._comp[x] = c
+        self._members[old] -= part
+        self._members[c] = part
+        edges = sum(self._deg[x] for x in part) // 2
+        before = self._comp_edges[old]
+        self._comp_edges[old] = before - edges
+        self._comp_edges[c] = edges
+        self._with_edges += bool(edges) + bool(before - edges) - bool(before)
+
+    def connected(self, u, v):
+        return self._comp[self.index[u]] == self._comp[self.index[v]]
+
+    def number_of_components(self):
+        return len(self._members)
+
+    def component(self, label):
+        """Метки компоненты вершины (по возрастанию id)."""
+        return [self.labels[x] for x in sorted(self._members[self._comp[self.index[label]]])]
+
+    def components(self):
+        """Компоненты — множества меток, упорядоченные по наименьшему id (как connected_components_ids)."""
+        comps = sorted(self._members.values(), key=min)
+        return [{self.labels[x] for x in comp} for comp in comps]
+
+    # ------------- Расстояния от зарегистрированных источников -------------
+    def add_source(self, label):
+        """Регистрирует источник: дерево кратчайших путей строится один раз и дальше поддерживается."""
+        s = self.index[label]
+        if s not in self._trees:
+            n = len(self.labels)
+            dist = [INF] * n
+            prev = [-1] * n
+            dist[s] = 0.0
+            self._propagate(dist, prev, [(0.0, s)])
+            self._trees[s] = (dist, prev)
+
+    def remove_source(self, label):
+        self._trees.pop(self.index[label], None)
+
+    def _propagate(self, dist, prev, heap):
+        # Дейкстра от уже уменьшенных вершин: идёт только туда, где расстояния улучшаются
+        adj = self.adj
+        heapq.heapify(heap)
+        while heap:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            for y, w in adj[x].items():
+                nd = d + w
+                if nd < dist[y]:
+                    dist[y] = nd
+                    prev[y] = x
+                    heapq.heappush(heap, (nd, y))
+
+    def _relax_edge(self, dist, prev, a, b, w):
+        heap = []
+        for x, y in ((a, b), (b, a)):
+            nd = dist[x] + w
+            if nd < dist[y]:
+                dist[y] = nd
+                prev[y] = x
+                heap.append((nd, y))
+        if heap:
+            self._propagate(dist, prev, heap)
+
+    def _repair(self, dist, prev, a, b):
+        """
+        Ребро (a, b) удалено или стало тяжелее. Если оно в дереве, расстояния теряет только
+        поддерево под ним: его вершины находятся обходом по рёбрам дерева (prev[y] == x),
+        получают лучшую оценку через соседей вне поддерева и досчитываются Дейкстрой.
+        """
+        if prev[b] == a:
+            root = b
+        elif prev[a] == b:
+            root = a
+        else:
+            return
+        adj = self.adj
+        cut = {root}
+        stack = [root]
+        while stack:
+            x = stack.pop()
+            for y in adj[x]:
+                if prev[y] == x and y not in cut:
+                    cut.add(y)
+                    stack.append(y)
+        for x in cut:
+            dist[x] = INF
+            prev[x] = -1
+        heap = []
+        for x in cut:
+            best, via = INF, -1
+            for y, w in adj[x].items():
+                if y not in cut and dist[y] + w < best:
+                    best, via = dist[y] + w, y
+            if via >= 0:
+                dist[x] = best
+                prev[x] = via
+                heap.append((best, x))
+        self._propagate(dist, prev, heap)
+
+    def distance(self, source, target):
+        """Расстояние от зарегистрированного источника (inf — недостижима)."""
+        dist, _ = self._trees[self.index[source]]
+        return dist[self.index[target]]
+
+    def distances(self, source):
+        """Словарь метка -> расстояние для достижимых вершин."""
+        dist, _ = self._trees[self.index[source]]
+        return {self.labels[v]: d for v, d in enumerate(dist) if d < INF}
+
+    def path(self, source, target):
+        """Кратчайший путь (метки) по дереву источника или None."""
+        s = self.index[source]
+        dist, prev = self._trees[s]
+        t = self.index[target]
+        if dist[t] == INF:
+            return None
+        path = [t]
+        while path[-1] != s:
+            path.append(prev[path[-1]])
+        path.reverse()
+        return [self.labels[v] for v in path]
+
+    # ------------- Снимок -------------
+    def to_csr(self):
+        """Текущий граф как CSRGraph — для полных анализов (analysis_pipeline и т.п.)."""
+        src, dst, wts = [], [], []
+        for a, nbrs in enumerate(self.adj):
+            for b, w in nbrs.items():
+                if a <= b:
+                    src.append(a)
+                    dst.append(b)
+                    wts.append(w)
+        return CSRGraph.from_arrays(self.labels, src, dst, wts if self.weighted else None,
+                                    index=dict(self.index))
+
+    def number_of_nodes(self):
+        return len(self.labels)
+
+    def number_of_edges(self):
+        return self.num_edges
@@ -0,0 +1,235 @@
+# graph_coloring.py
+import heapq
+import random
+import time
+import numpy as np
+from graph_csr import as_csr
+
+STRATEGIES = ("largest_first", "smallest_last", "dsatur")
+
+def _conflict_graph(graph):
+    # раскраска не зависит от направления и кратности рёбер: нужен простой неориентированный
+    # граф (кратное ребро в списках соседей уменьшало бы степень в smallest_last дважды)
+    return as_csr(graph).simple_undirected()
+
+def _adjacency(csr):
+    # списки соседей без петель (петля не мешает раскраске)
+    off = csr.offsets.tolist()
+    tgt = csr.targets.tolist()
+    if not (csr.slot_rows() == csr.targets).any():
+        return [tgt[off[v]:off[v + 1]] for v in range(len(off) - 1)]
+    return [[u for u in tgt[off[v]:off[v + 1]] if u != v] for v in range(len(off) - 1)]
+
+def _lowest_free(mask):
+    # номер младшего нулевого бита — наименьший цвет, которого нет у соседей
+    return (~mask & (mask + 1)).bit_length() - 1
+
+def _greedy(adj, order, n):
+    """Жадная раскраска в заданном порядке; запрещённые цвета соседей — битовая маска int."""
+    colors = [-1] * n
+    for v in order:
+        mask = 0
+        for u in adj[v]:
+            c = colors[u]
+            if c >= 0:
+                mask |= 1 << c
+        colors[v] = _lowest_free(mask)
+    return colors
+
+def smallest_last_order(adj):
+    """
+    Порядок smallest-last за O(V + E): вершина минимальной текущей степени удаляется по одной,
+    раскрашиваются в обратном порядке удаления. Корзины по степеням — стеки с ленивым удалением
+    устаревших записей; степени соседей уменьшаются точно (как в nx.coloring.strategy_smallest_last),
+    а не только до текущего ядра, как в разложении на k-ядра Батагеля — Заверсника.
+    """
+    n = len(adj)
+    deg = [len(a) for a in adj]
+    buckets = [[] for _ in range(max(deg, default=0) + 1)]
+    # в обратном порядке: при равных степенях первой снимается меньшая вершина
+    for v in range(n - 1, -1, -1):
+        buckets[deg[v]].append(v)
+    removed = bytearray(n)
+    order = []
+    d = 0
+    while len(order) < n:
+        bucket = buckets[d]
+        if not bucket:
+            d += 1
+            continue
+        v = bucket.pop()
+        if removed[v] or deg[v] != d:
+            continue
+        removed[v] = 1
+        order.append(v)
+        for u in adj[v]:
+            if not removed[u]:
+                deg[u] -= 1
+                buckets[deg[u]].append(u)
+        # степень соседей упала не больше чем на 1 — минимум не меньше d - 1
+        d = max(d - 1, 0)
+    order.reverse()
+    return order
+
+def dsatur(adj):
+    """
+    DSATUR (Brélaz): следующей красится вершина с наибольшим числом различных цветов у соседей
+    (насыщенностью), при равенстве — с наибольшей степенью. Цвета соседей каждой вершины —
+    битовая маска int, очередь — куча с ленивым удалением устаревших записей: O((V + E) log V).
+    """
+    n = len(adj)
+    colors = [-1] * n
+    masks = [0] * n
+    sat = [0] * n
+    deg = [len(a) for a in adj]
+    # ключ кучи — одно целое (насыщенность, степень, меньший id вперёд): сравнение
+    # int заметно быстрее сравнения кортежей
+    base = max(deg, default=0) + 1
+    heap = [-(deg[v] * n + n - 1 - v) for v in range(n)]
+    heapq.heapify(heap)
+    while heap:
+        key = -heapq.heappop(heap)
+        v = n - 1 - key % n
+        if colors[v] >= 0 or key // n != sat[v] * base + deg[v]:
+            continue
+        c = _lowest_free(masks[v])
+        colors[v] = c
+        bit = 1 << c
+        for u in adj[v]:
+            if colors[u] < 0 and not masks[u] & bit:
+                masks[u] |= bit
+                sat[u] += 1
+                heapq.heappush(heap, -((sat[u] * base + deg[u]) * n + n - 1 - u))
+    return colors
+
+def color_ids(graph, strategy="dsatur"):
+    """Раскраска по id вершин (список цветов 0, 1, ...) одной из стратегий STRATEGIES."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Неизвестная стратегия раскраски: {strategy}")
+    csr = _conflict_graph(graph)
+    adj = _adjacency(csr)
+    n = len(adj)
+    if strategy == "dsatur":
+        return dsatur(adj)
+    if strategy == "smallest_last":
+        return _greedy(adj, smallest_last_order(adj), n)
+    # как nx largest_first: устойчивая сортировка по убыванию степени (петля считается дважды)
+    order = np.argsort(-csr.degree_array(), kind="stable").tolist()
+    return _greedy(adj, order, n)
+
+def _iterated_greedy(adj, colors, rng):
+    # перекраска по цветовым классам (Culberson): жадный алгоритм, идущий класс за классом,
+    # никогда не увеличивает число цветов; порядок классов меняется от раунда к раунду
+    classes = {}
+    for v, c in enumerate(colors):
+        classes.setdefault(c, []).append(v)
+    groups = list(classes.values())
+    mode = rng.randrange(3)
+    if mode == 0:
+        groups.reverse()
+    elif mode == 1:
+        groups.sort(key=len, reverse=True)
+    else:
+        rng.shuffle(groups)
+    return _greedy(adj, [v for g in groups for v in g], len(adj))
+
+def _tabu_reduce(csr, colors, k, deadline, rng):
+    """
+    TabuCol: попытка раскрасить в k цветов. Вершины старших цветов получают случайный цвет
+    из 0..k-1, затем число конфликтных рёбер уменьшается перекрашиванием одной конфликтной вершины
+    за ход; gamma[v, c] — число соседей v цвета c, запрет обратного хода на
+    tenure = 10 + 0.6 * конфликтов ходов (кроме ходов, улучшающих рекорд).
+    Возвращает раскраску без конфликтов или None, если время вышло.
+    """
+    n = len(colors)
+    col = np.array(colors, dtype=np.int64)
+    high = col >= k
+    col[high] = np.array([rng.randrange(k) for _ in range(int(high.sum()))], dtype=np.int64)
+    rows = csr.slot_rows().astype(np.int64)
+    tgt = csr.targets.astype(np.int64)
+    keep = rows != tgt
+    rows, tgt = rows[keep], tgt[keep]
+    off = csr.offsets
+    gamma = np.zeros((n, k), dtype=np.int64)
+    np.add.at(gamma, (rows, col[tgt]), 1)
+    idx = np.arange(n)
+    conflicts = int(gamma[idx, col].sum()) // 2
+    best = conflicts
+    tabu = np.zeros((n, k), dtype=np.int64)
+    it = 0
+    while conflicts:
+        it += 1
+        if not it & 15 and time.perf_counter() > deadline:
+            return None
+        conf = np.flatnonzero(gamma[idx, col] > 0)
+        own = gamma[conf, col[conf]]
+        delta = gamma[conf] - own[:, None]
+        delta[np.arange(len(conf)), col[conf]] = np.iinfo(np.int64).max // 2
+        allowed = (tabu[conf] <= it) | (conflicts + delta < best)
+        delta = np.where(allowed, delta, np.iinfo(np.int64).max // 2)
+        m = delta.min()
+        if m >= np.iinfo(np.int64).max // 2:
+            continue
+        cand = np.flatnonzero(delta.ravel() == m)
+        pick = int(cand[rng.randrange(len(cand))])
+        r, c = divmod(pick, k)
+        v = int(conf[r])
+        old = int(col[v])
+        nbrs = csr.targets[off[v]:off[v + 1]].astype(np.int64)
+        nbrs = nbrs[nbrs != v]
+        np.subtract.at(gamma[:, old], nbrs, 1)
+        np.add.at(gamma[:, c], nbrs, 1)
+        col[v] = c
+        conflicts += int(m)
+        best = min(best, conflicts)
+        tabu[v, old] = it + 10 + int(0.6 * len(conf)) + rng.randrange(10)
+    return col.tolist()
+
+def improve_coloring(graph, colors, time_limit=1.0, tabu=True, seed=0, stats=None):
+    """
+    Уменьшение числа цветов за time_limit секунд: сначала раунды iterated greedy,
+    пока они дают выигрыш, затем (tabu=True) TabuCol — раскраска в k - 1 цветов, k - 2 ...
+    colors — список цветов по id. В stats пишутся rounds и history (число цветов по шагам).
+    """
+    csr = _conflict_graph(graph)
+    adj = _adjacency(csr)
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_limit
+    colors = list(colors)
+    k = max(colors, default=-1) + 1
+    history = [k]
+    rounds = 0
+    stale = 0
+    while time.perf_counter() < deadline and stale < 10 and k > 1:
+        new = _iterated_greedy(adj, colors, rng)
+        rounds += 1
+        new_k = max(new) + 1
+        stale = stale + 1 if new_k >= k else 0
+        if new_k < k:
+            history.append(new_k)
+        colors, k = new, new_k
+    while tabu and k > 1 and time.perf_counter() < deadline:
+        new = _tabu_reduce(csr, colors, k - 1, deadline, rng)
+        if new is None:
+            break
+        colors, k = new, k - 1
+        history.append(k)
+    if stats is not None:
+        stats["rounds"] = rounds
+        stats["history"] = history
+    return colors
+
+def greedy_color(graph, strategy="largest_first", time_limit=None, seed=0, stats=None):
+    """
+    Раскраска вершин: словарь метка -> цвет (как nx.coloring.greedy_color).
+    strategy — "largest_first" (совпадает с networkx), "smallest_last" или "dsatur";
+    time_limit — время (с) на улучшение improve_coloring, None — без улучшения.
+    """
+    csr = as_csr(graph)
+    colors = color_ids(csr, strategy)
+    if time_limit:
+        colors = improve_coloring(csr, colors, time_limit, seed=seed, stats=stats)
+    return dict(zip(csr.labels, colors))
+
+def number_of_colors(coloring):
+    return len(set(coloring.values())) if isinstance(coloring, dict) else len(set(coloring))
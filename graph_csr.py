@@ -0,0 +1,455 @@
+# graph_csr.py
+from itertools import chain
+import numpy as np
+
+
+def _index_dtype(size):
+    # int32 вдвое экономнее по памяти, int64 — только когда не хватает диапазона
+    return np.int32 if size < 2**31 - 1 else np.int64
+
+
+class CSRGraph:
+    """
+    Граф в формате compressed sparse row (CSR).
+    Вершины внутри — целые id 0..n-1; labels: id -> метка, index: метка -> id.
+    Соседи вершины i: targets[offsets[i]:offsets[i+1]], веса рёбер — weights в тех же слотах,
+    edge_ids — номер исходного ребра для слота (неориентированное ребро занимает два слота,
+    петля — один).
+    Порядок соседей совпадает с порядком добавления рёбер (как в networkx).
+    Для совместимости с лабораторными поддерживается подмножество API networkx
+    (nodes(), neighbors(), G[u], G[u][v], has_edge, degree ...), так что алгоритмы
+    принимают CSRGraph вместо nx.Graph.
+    """
+
+    def __init__(self, labels, offsets, targets, weights, edge_ids, num_edges,
+                 directed=False, multigraph=False, weighted=False, index=None):
+        self.labels = labels
+        self.index = index if index is not None else {v: i for i, v in enumerate(labels)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_ids = edge_ids
+        self.num_edges = num_edges
+        self.directed = directed
+        self.multigraph = multigraph
+        self.weighted = weighted
+        self._degrees = None
+        self._sorted = None
+        self._reverse = None
+        self._simple = None
+
+    # ------------- Построение -------------
+    @classmethod
+    def from_arrays(cls, labels, src, dst, weights=None, directed=False, multigraph=False, index=None):
+        """
+        Строит граф из массивов id концов рёбер (src[k], dst[k]) и (необязательно) весов.
+        Повторные рёбра для простого графа схлопываются: позиция — первого вхождения,
+        вес — последнего (как при повторном add_edge в networkx).
+        """
+        n = len(labels)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        weighted = weights is not None
+        if weighted:
+            w = np.asarray(weights, dtype=np.float64)
+        else:
+            w = np.ones(len(src), dtype=np.float64)
+
+        if not multigraph and len(src):
+            if directed:
+                key = src * n + dst
+            else:
+                key = np.minimum(src, dst) * n + np.maximum(src, dst)
+            # одна стабильная сортировка: в каждой группе одинаковых рёбер
+            # первый элемент — первое вхождение, последний — последнее
+            order = np.argsort(key, kind="stable")
+            sk = key[order]
+            bounds = np.flatnonzero(sk[1:] != sk[:-1]) + 1
+            first = order[np.concatenate(([0], bounds))]
+            last = order[np.concatenate((bounds - 1, [len(sk) - 1]))]
+            by_pos = np.argsort(first)
+            keep, w_keep = first[by_pos], w[last[by_pos]]
+            src, dst, w = src[keep], dst[keep], w_keep
+        m = len(src)
+        eid = np.arange(m, dtype=np.int64)
+
+        if directed:
+            slot_src, slot_dst, slot_w, slot_eid = src, dst, w, eid
+        else:
+            # чередуем (u, v), (v, u) — после стабильной сортировки по началу
+            # соседи каждой вершины идут в порядке добавления рёбер
+            slot_src = np.empty(2 * m, dtype=np.int64)
+            slot_dst = np.empty(2 * m, dtype=np.int64)
+            slot_src[0::2], slot_src[1::2] = src, dst
+            slot_dst[0::2], slot_dst[1::2] = dst, src
+            slot_w = np.repeat(w, 2)
+            slot_eid = np.repeat(eid, 2)
+            keep = np.ones(2 * m, dtype=bool)
+            keep[1::2] = src != dst  # петля хранится одним слотом
+            slot_src, slot_dst = slot_src[keep], slot_dst[keep]
+            slot_w, slot_eid = slot_w[keep], slot_eid[keep]
+
+        order = np.argsort(slot_src, kind="stable")
+        counts = np.bincount(slot_src, minlength=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        itype = _index_dtype(max(n, len(slot_src)))
+        return cls(list(labels), offsets,
+                   slot_dst[order].astype(itype), slot_w[order],
+                   slot_eid[order].astype(itype), m,
+                   directed=directed, multigraph=multigraph, weighted=weighted, index=index)
+
+    @classmethod
+    def from_edges(cls, nodes, edges, directed=False, multigraph=False):
+        """
+        Строит граф из списков, которые возвращают parse_input / input_data_graph:
+        nodes — метки вершин, edges — пары (u, v), тройки (u, v, w) или (u, v, {'weight': w}).
+        Вершины из рёбер, отсутствующие в nodes, добавляются в порядке появления.
+        """
+        labels = []
+        index = {}
+        for v in nodes:
+            if v not in index:
+                index[v] = len(labels)
+                labels.append(v)
+
+        src = []
+        dst = []
+        wts = []
+        weighted = False
+        for e in edges:
+            u, v = e[0], e[1]
+            iu = index.get(u)
+            if iu is None:
+                iu = index[u] = len(labels)
+                labels.append(u)
+            iv = index.get(v)
+            if iv is None:
+                iv = index[v] = len(labels)
+                labels.append(v)
+            src.append(iu)
+            dst.append(iv)
+            w = 1.0
+            if len(e) > 2:
+                data = e[2]
+                if isinstance(data, dict):
+                    if "weight" in data:
+                        w = data["weight"]
+                        weighted = True
+                else:
+                    w = data
+                    weighted = True
+            wts.append(w)
+        return cls.from_arrays(labels, src, dst, wts if weighted else None,
+                               directed=directed, multigraph=multigraph, index=index)
+
+    @classmethod
+    def from_networkx(cls, G):
+        """Строит граф из nx.Graph / DiGraph / MultiGraph с сохранением порядка соседей."""
+        directed = G.is_directed()
+        multigraph = G.is_multigraph()
+        labels = list(G.nodes())
+        index = {v: i for i, v in enumerate(labels)}
+        n = len(labels)
+        if not multigraph:
+            return cls._from_simple_networkx(G, labels, index, directed)
+        counts = [0] * n
+        slot_dst = []
+        slot_w = []
+        slot_eid = []
+        # у неориентированного ребра два слота с общим id; петлю networkx хранит
+        # один раз — и у нас она занимает один слот
+        edge_of = {}
+        num_edges = 0
+        weighted = False
+        for u, nbrs in G.adj.items():
+            iu = index[u]
+            for v, data in nbrs.items():
+                iv = index[v]
+                items = data.items() if multigraph else ((None, data),)
+                for key, attrs in items:
+                    if directed:
+                        eid = num_edges
+                        num_edges += 1
+                    else:
+                        ekey = (min(iu, iv), max(iu, iv), key)
+                        eid = edge_of.get(ekey)
+                        if eid is None:
+                            eid = edge_of[ekey] = num_edges
+                            num_edges += 1
+                    if "weight" in attrs:
+                        weighted = True
+                    slot_dst.append(iv)
+                    slot_w.append(attrs.get("weight", 1.0))
+                    slot_eid.append(eid)
+                    counts[iu] += 1
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        itype = _index_dtype(max(n, len(slot_dst)))
+        return cls(labels, offsets,
+                   np.asarray(slot_dst, dtype=itype), np.asarray(slot_w, dtype=np.float64),
+                   np.asarray(slot_eid, dtype=itype), num_edges,
+                   directed=directed, multigraph=multigraph, weighted=weighted, index=index)
+
+    @classmethod
+    def _from_simple_networkx(cls, G, labels, index, directed):
+        # простой граф: списки соседей собираются генераторами (цикл в C), номера рёбер —
+        # одним np.unique по парам (min, max) в порядке первого появления слота
+        n = len(labels)
+        adj_map = raw_adjacency(G)
+        adj = [adj_map[v] for v in labels]
+        counts = np.fromiter(map(len, adj), dtype=np.int64, count=n)
+        slot_dst = np.fromiter(map(index.__getitem__, chain.from_iterable(adj)), dtype=np.int64,
+                               count=int(counts.sum()))
+        datas = [d for nbrs in adj for d in nbrs.values()]
+        weighted = any("weight" in d for d in datas)
+        if weighted:
+            slot_w = np.array([d.get("weight", 1.0) for d in datas], dtype=np.float64)
+        else:
+            slot_w = np.ones(len(slot_dst), dtype=np.float64)
+        if directed:
+            num_edges = len(slot_dst)
+            slot_eid = np.arange(num_edges, dtype=np.int64)
+        else:
+            rows = np.repeat(np.arange(n, dtype=np.int64), counts)
+            key = np.minimum(rows, slot_dst) * n + np.maximum(rows, slot_dst)
+            _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+            rank = np.empty(len(first), dtype=np.int64)
+            rank[np.argsort(first)] = np.arange(len(first))
+            slot_eid = rank[inverse.ravel()]
+            num_edges = len(first)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        itype = _index_dtype(max(n, len(slot_dst)))
+        return cls(labels, offsets, slot_dst.astype(itype), slot_w, slot_eid.astype(itype), num_edges,
+                   directed=directed, multigraph=False, weighted=weighted, index=index)
+
+    def to_networkx(self):
+        """Обратное преобразование (для отрисовки и функций networkx)."""
+        import networkx as nx
+        if self.multigraph:
+            G = nx.MultiDiGraph() if self.directed else nx.MultiGraph()
+        else:
+            G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(self.labels)
+        labels = self.labels
+        for u, v, w in self.edge_list():
+            if self.weighted:
+                G.add_edge(labels[u], labels[v], weight=w)
+            else:
+                G.add_edge(labels[u], labels[v])
+        return G
+
+    # ------------- Доступ по id -------------
+    def number_of_nodes(self):
+        return len(self.labels)
+
+    def number_of_edges(self):
+        return self.num_edges
+
+    def is_directed(self):
+        return self.directed
+
+    def is_multigraph(self):
+        return self.multigraph
+
+    def id_of(self, label):
+        return self.index[label]
+
+    def neighbor_ids(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def slot_rows(self):
+        """Номер вершины-начала для каждого слота."""
+        return np.repeat(np.arange(len(self.labels), dtype=self.targets.dtype),
+                         np.diff(self.offsets))
+
+    def degree_array(self):
+        """Степени вершин по правилам networkx (петля даёт 2, в орграфе — вход + выход)."""
+        if self._degrees is None:
+            n = len(self.labels)
+            deg = np.diff(self.offsets)
+            if self.directed:
+                deg = deg + np.bincount(self.targets, minlength=n)
+            else:
+                rows = self.slot_rows()
+                loops = rows[self.targets == rows]
+                deg = deg + np.bincount(loops, minlength=n)
+            self._degrees = deg
+        return self._degrees
+
+    def sorted_by_label(self):
+        """
+        Копия графа, где соседи каждой вершины упорядочены по меткам
+        (как sorted(graph[node]) в лабораторных). Результат кэшируется.
+        """
+        if self._sorted is None:
+            n = len(self.labels)
+            by_label = sorted(range(n), key=self.labels.__getitem__)
+            rank = np.empty(n, dtype=np.int64)
+            rank[by_label] = np.arange(n)
+            order = np.lexsort((rank[self.targets], self.slot_rows()))
+            g = CSRGraph(self.labels, self.offsets, self.targets[order], self.weights[order],
+                         self.edge_ids[order], self.num_edges, directed=self.directed,
+                         multigraph=self.multigraph, weighted=self.weighted, index=self.index)
+            g._sorted = g
+            self._sorted = g
+        return self._sorted
+
+    def reverse(self):
+        """Граф с обращёнными рёбрами (входящие соседи); для неориентированного — он сам."""
+        if not self.directed:
+            return self
+        if self._reverse is None:
+            rows = self.slot_rows()
+            order = np.argsort(self.targets, kind="stable")
+            counts = np.bincount(self.targets, minlength=len(self.labels))
+            offsets = np.zeros(len(self.labels) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            g = CSRGraph(self.labels, offsets, rows[order], self.weights[order],
+                         self.edge_ids[order], self.num_edges, directed=True,
+                         multigraph=self.multigraph, weighted=self.weighted, index=self.index)
+            g._reverse = self
+            self._reverse = g
+        return self._reverse
+
+    def simple_undirected(self):
+        """
+        Неориентированный граф без кратных рёбер на тех же вершинах: направление забывается,
+        повторные рёбра схлопываются (слабая связность, раскраска). Простой неориентированный
+        граф — он сам.
+        """
+        if not self.directed and not self.multigraph:
+            return self
+        if self._simple is None:
+            self._simple = CSRGraph.from_arrays(self.labels, self.slot_rows(), self.targets,
+                                                directed=False, index=self.index)
+        return self._simple
+
+    def edge_list(self):
+        """Рёбра (u_id, v_id, вес), каждое ровно один раз, в порядке слотов."""
+        if self.directed:
+            slots = np.arange(len(self.targets))
+        else:
+            _, slots = np.unique(self.edge_ids, return_index=True)
+            slots.sort()
+        rows = self.slot_rows()
+        return list(zip(rows[slots].tolist(), self.targets[slots].tolist(),
+                        self.weights[slots].tolist()))
+
+    # ------------- Совместимость с API networkx -------------
+    def nodes(self):
+        # возвращается сам список меток — его нельзя изменять
+        return self.labels
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, label):
+        try:
+            return label in self.index
+        except TypeError:
+            return False
+
+    def __getitem__(self, label):
+        return _AdjView(self, self.index[label])
+
+    def neighbors(self, label):
+        return iter(self[label])
+
+    def has_edge(self, u, v):
+        iu = self.index.get(u)
+        iv = self.index.get(v)
+        if iu is None or iv is None:
+            return False
+        return bool((self.neighbor_ids(iu) == iv).any())
+
+    def degree(self, label=None):
+        deg = self.degree_array()
+        if label is not None:
+            return int(deg[self.index[label]])
+        return list(zip(self.labels, deg.tolist()))
+
+    def edges(self, data=False):
+        labels = self.labels
+        if data:
+            return [(labels[u], labels[v], {"weight": w}) for u, v, w in self.edge_list()]
+        return [(labels[u], labels[v]) for u, v, _ in self.edge_list()]
+
+
+class _AdjView:
+    """Соседи вершины в стиле G[u] из networkx: итерация по меткам, G[u][v] -> {'weight': w}."""
+
+    __slots__ = ("_g", "_lo", "_hi")
+
+    def __init__(self, g, i):
+        self._g = g
+        self._lo = int(g.offsets[i])
+        self._hi = int(g.offsets[i + 1])
+
+    def __iter__(self):
+        labels = self._g.labels
+        for t in self._g.targets[self._lo:self._hi].tolist():
+            yield labels[t]
+
+    def __len__(self):
+        return self._hi - self._lo
+
+    def __contains__(self, label):
+        j = self._g.index.get(label)
+        if j is None:
+            return False
+        return bool((self._g.targets[self._lo:self._hi] == j).any())
+
+    def __getitem__(self, label):
+        j = self._g.index[label]
+        hits = np.flatnonzero(self._g.targets[self._lo:self._hi] == j)
+        if len(hits) == 0:
+            raise KeyError(label)
+        return {"weight": float(self._g.weights[self._lo + hits[0]])}
+
+    def items(self):
+        g = self._g
+        labels = g.labels
+        ts = g.targets[self._lo:self._hi].tolist()
+        ws = g.weights[self._lo:self._hi].tolist()
+        for t, w in zip(ts, ws):
+            yield labels[t], {"weight": w}
+
+
+def as_csr(G):
+    """
+    Возвращает CSRGraph: сам G, если он уже в CSR, иначе — конвертация из networkx.
+    Конвертация кэшируется в G.__networkx_cache__ (как преобразования бэкендов networkx,
+    при nx.config.cache_converted_graphs): add_edge, remove_node и другие методы networkx,
+    меняющие структуру, этот кэш очищают, так что повторные вызовы алгоритмов на том же
+    графе не строят CSR заново. Правка атрибутов рёбер на месте (G[u][v]["weight"] = w)
+    кэш не сбрасывает — после неё нужен G.__networkx_cache__.clear().
+    """
+    if isinstance(G, CSRGraph):
+        return G
+    cache = getattr(G, "__networkx_cache__", None)
+    if cache is None or not _cache_enabled():
+        return CSRGraph.from_networkx(G)
+    csr = cache.get("csr_graph")
+    if csr is None:
+        csr = cache["csr_graph"] = CSRGraph.from_networkx(G)
+    return csr
+
+def raw_adjacency(G):
+    """
+    Словари соседей графа networkx напрямую (G._adj: вершина -> {сосед: атрибуты}),
+    без обёрток-представлений — для однократных обходов, которым конвертация в CSR
+    обошлась бы дороже самого обхода. Для CSRGraph — None.
+    """
+    if isinstance(G, CSRGraph):
+        return None
+    return getattr(G, "_adj", None) or G.adj
+
+def _cache_enabled():
+    import networkx as nx
+    config = getattr(nx, "config", None)
+    return getattr(config, "cache_converted_graphs", True)
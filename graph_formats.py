@@ -0,0 +1,391 @@
+# graph_formats.py
+import csv
+import os
+import re
+from operator import methodcaller
+import numpy as np
+from graph_csr import CSRGraph, as_csr
+
+# сколько байт текста разбирается за раз (целыми строками)
+CHUNK_BYTES = 1 << 22
+
+class _Labels:
+    """
+    Таблица меток при потоковом чтении: метка -> id в порядке первого появления
+    (как у networkx при add_edges_from). Кусок меток переводится в id одним map по словарю
+    (цикл в C); по одной обрабатываются только новые метки.
+    """
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self.index = {}
+        self.ids(list(labels))
+
+    def ids(self, raw):
+        ids = list(map(self.index.get, raw))
+        if None in ids:
+            for k, i in enumerate(ids):
+                if i is None:
+                    i = self.index.get(raw[k])
+                    if i is None:
+                        i = self.index[raw[k]] = len(self.labels)
+                        self.labels.append(raw[k])
+                    ids[k] = i
+        return np.array(ids, dtype=np.int64)
+
+def _open(source, mode):
+    # путь или уже открытый текстовый поток -> (файл, нужно ли закрыть); newline="" — концы
+    # строк как есть, чтобы \r и \r\n внутри полей в кавычках не менялись при чтении
+    if isinstance(source, (str, bytes, os.PathLike)):
+        return open(source, mode, newline="", encoding="utf-8"), True
+    return source, False
+
+def _read_lines(f, chunk_bytes):
+    # кусок около chunk_bytes, дочитанный до конца строки, разрезанный на строки (в C)
+    block = f.read(chunk_bytes)
+    if block and not block.endswith("\n"):
+        block += f.readline()
+    return block.splitlines()
+
+def _read_records(f, chunk_bytes):
+    # кусок около chunk_bytes, дочитанный до конца записи CSV: до перевода строки вне кавычек
+    # (кавычки внутри поля удваиваются, так что вне поля их число чётно)
+    block = f.read(chunk_bytes)
+    quotes = block.count('"')
+    while block and (quotes % 2 or not block.endswith("\n")):
+        line = f.readline()
+        if not line:
+            break
+        block += line
+        quotes += line.count('"')
+        if not quotes % 2 and line.endswith("\r"):
+            break
+    return block
+
+def _write_rows(f, columns, delimiter, chunk):
+    # columns — функции (lo, hi) -> список строк столбца; строки файла собираются кусками
+    n = len(columns[0][1])
+    for lo in range(0, n, chunk):
+        hi = lo + chunk
+        parts = [fmt(col[lo:hi]) for fmt, col in columns]
+        f.write("".join(map("{}\n".format, map(delimiter.join, zip(*parts)))))
+
+def _build(table, src, dst, wts, weighted, directed, multigraph):
+    empty = np.zeros(0, dtype=np.int64)
+    src = np.concatenate(src) if src else empty
+    dst = np.concatenate(dst) if dst else empty
+    w = np.concatenate(wts) if weighted and wts else None
+    return CSRGraph.from_arrays(table.labels, src, dst, w, directed=directed,
+                                multigraph=multigraph, index=table.index)
+
+# ------------- CSV (список рёбер) -------------
+def _quoted_records(block, delimiter):
+    """
+    Записи куска CSV с кавычками по правилам csv -> (номера строк записей в куске, записи,
+    число строк в куске). Поле в кавычках берётся как есть (разделитель, "" и переводы строк
+    внутри), поле без кавычек обрезается по пробелам; пустые строки пропускаются.
+    """
+    d = re.escape(delimiter)
+    field = re.compile(rf'[ \t]*"((?:[^"]|"")*)"[ \t]*(?={d}|[\r\n]|$)|([^\r\n{d}]*)')
+    end = re.compile(r"\r\n|\n|\r|$")
+    starts, records = [], []
+    pos, line, size = 0, 0, len(block)
+    while pos < size:
+        start, fields = line, []
+        while True:
+            m = field.match(block, pos)
+            quoted, plain = m.groups()
+            if quoted is None:
+                fields.append(plain.strip())
+            else:
+                fields.append(quoted.replace('""', '"'))
+                line += quoted.count("\n")
+            pos = m.end()
+            if not block.startswith(delimiter, pos):
+                break
+            pos += len(delimiter)
+        pos = end.match(block, pos).end()
+        line += 1
+        if fields != [""] or quoted is not None:
+            starts.append(start)
+            records.append(fields)
+    return starts, records, line
+
+def _split_chunk(block, delimiter, ncols, line_no):
+    """
+    Поля записей куска CSV подряд (по ncols на запись) -> (поля, ncols, число строк в куске).
+    ncols=None — по первой записи; line_no — номер первой строки куска для сообщений об ошибках.
+    Без кавычек — одно split по всему куску (в C); с кавычками — _quoted_records.
+    Записи делятся только по \n, \r\n и \r (как в модуле csv), а не по всем разрывам строк
+    str.splitlines, иначе метка с \x1c или \u2028 распадалась бы на две строки.
+    """
+    quoted = '"' in block
+    if quoted:
+        starts, rows, count = _quoted_records(block, delimiter)
+    else:
+        if "\r" in block:
+            block = block.replace("\r\n", "\n").replace("\r", "\n")
+        rows = block.split("\n")
+        if not rows[-1]:
+            rows.pop()
+        count = len(rows)
+        starts = range(count)
+        if not all(map(str.strip, rows)):
+            starts = [k for k, row in enumerate(rows) if row.strip()]
+            rows = [rows[k] for k in starts]
+    if not rows:
+        return [], ncols, count
+    if ncols is None:
+        ncols = len(rows[0]) if quoted else rows[0].count(delimiter) + 1
+        if ncols not in (2, 3):
+            raise ValueError(f"Строка {line_no + starts[0]}: нужны 2 или 3 столбца, найдено {ncols}")
+    if quoted:
+        bad = next((k for k, r in enumerate(rows) if len(r) != ncols), None)
+        fields = [f for r in rows for f in r]
+    else:
+        counts = list(map(methodcaller("count", delimiter), rows))
+        bad = next((k for k, c in enumerate(counts) if c != ncols - 1), None)
+        fields = list(map(str.strip, delimiter.join(rows).split(delimiter)))
+    if bad is not None:
+        raise ValueError(f"Строка {line_no + starts[bad]}: ожидалось полей: {ncols}")
+    return fields, ncols, count
+
+def read_edge_csv(source, delimiter=",", header=True, directed=False, multigraph=False,
+                  nodes=(), chunk_bytes=CHUNK_BYTES):
+    """
+    Граф из CSV со списком рёбер: столбцы «начало, конец[, вес]» (число столбцов — по первой строке
+    данных), пустые строки пропускаются. header=True — первая строка — заголовок.
+    nodes — метки, которые должны идти первыми (в том числе изолированные вершины). Метки — строки.
+    Файл читается кусками по chunk_bytes; каждый кусок превращается в массивы id и весов
+    целиком (split в C, map по словарю меток, NumPy для чисел) и передаётся прямо в
+    CSRGraph.from_arrays — без add_edge на каждое ребро.
+    """
+    f, own = _open(source, "r")
+    try:
+        table = _Labels(nodes)
+        src, dst, wts = [], [], []
+        ncols = None
+        line_no = 1
+        if header:
+            f.readline()
+            line_no = 2
+        while True:
+            block = _read_records(f, chunk_bytes)
+            if not block:
+                break
+            fields, ncols, count = _split_chunk(block, delimiter, ncols, line_no)
+            if fields:
+                # концы рёбер по порядку (u0, v0, u1, v1, ...), чтобы id шли в порядке появления
+                ends = fields[:]
+                if ncols == 3:
+                    del ends[2::3]
+                ids = table.ids(ends)
+                src.append(ids[0::2])
+                dst.append(ids[1::2])
+                if ncols == 3:
+                    try:
+                        wts.append(np.array(fields[2::3], dtype=np.float64))
+                    except ValueError as e:
+                        raise ValueError(f"Вес ребра не число: {e}") from None
+            line_no += count
+        return _build(table, src, dst, wts, ncols == 3, directed, multigraph)
+    finally:
+        if own:
+            f.close()
+
+def write_edge_csv(graph, target, delimiter=",", header=True, weights=None, chunk=1 << 16):
+    """
+    Запись рёбер в CSV (каждое ребро — один раз). weights=None — столбец веса, только если
+    граф взвешенный. Строки собираются кусками по chunk рёбер; метки с разделителем,
+    кавычками, переводами строк или пробелами по краям берутся в кавычки и читаются
+    read_edge_csv обратно без изменений.
+    """
+    csr = as_csr(graph)
+    if weights is None:
+        weights = csr.weighted
+    f, own = _open(target, "w")
+    try:
+        if header:
+            csv.writer(f, delimiter=delimiter, lineterminator="\n").writerow(
+                ["source", "target"] + (["weight"] if weights else []))
+        labels = np.array([_quote_field(str(v), delimiter) for v in csr.labels], dtype=object)
+        rows, cols, w = _edge_arrays(csr)
+        columns = [(_take(labels), rows), (_take(labels), cols)]
+        if weights:
+            columns.append((_floats, w))
+        _write_rows(f, columns, delimiter, chunk)
+    finally:
+        if own:
+            f.close()
+
+def _quote_field(text, delimiter):
+    # поле без кавычек read_edge_csv обрезает по пробелам и делит по разделителю и \r, \n
+    if delimiter in text or '"' in text or "\n" in text or "\r" in text or text != text.strip():
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+def _take(labels):
+    return lambda ids: labels[ids].tolist()
+
+def _ints(a):
+    return list(map(str, a.tolist()))
+
+def _floats(a):
+    # repr — кратчайшая запись, которая читается обратно в то же число
+    return list(map(repr, a.tolist()))
+
+def _edge_arrays(csr):
+    """Рёбра массивами (начала, концы, веса), каждое ровно один раз, в порядке слотов."""
+    rows = csr.slot_rows()
+    if csr.directed:
+        return rows, csr.targets, csr.weights
+    _, slots = np.unique(csr.edge_ids, return_index=True)
+    slots.sort()
+    return rows[slots], csr.targets[slots], csr.weights[slots]
+
+# ------------- Matrix Market -------------
+def _mm_header(f):
+    banner = f.readline().split()
+    if len(banner) != 5 or banner[0] != "%%MatrixMarket" or banner[1].lower() != "matrix":
+        raise ValueError("Нет заголовка %%MatrixMarket matrix ...")
+    layout, field, symmetry = (s.lower() for s in banner[2:])
+    if layout != "coordinate":
+        raise ValueError(f"Поддерживается только формат coordinate, а не {layout}")
+    if field not in ("real", "integer", "pattern"):
+        raise ValueError(f"Неподдерживаемый тип значений: {field}")
+    if symmetry not in ("general", "symmetric"):
+        raise ValueError(f"Неподдерживаемая симметрия: {symmetry}")
+    line = f.readline()
+    while line.startswith("%") or not line.strip():
+        if not line:
+            raise ValueError("Нет строки размеров")
+        line = f.readline()
+    rows, cols, nnz = (int(x) for x in line.split())
+    if rows != cols:
+        raise ValueError(f"Матрица смежности должна быть квадратной, а не {rows} x {cols}")
+    return field, symmetry, rows, nnz
+
+def read_matrix_market(source, labels=None, directed=None, multigraph=False,
+                       chunk_bytes=CHUNK_BYTES):
+    """
+    Граф из файла Matrix Market (coordinate real/integer/pattern, general/symmetric).
+    Вершины — 0..n-1 или метки labels (список длины n). directed=None — по файлу:
+    symmetric — неориентированный, general — ориентированный. pattern — невзвешенный граф.
+    Числа читаются кусками строк одним вызовом np.loadtxt на кусок.
+    """
+    f, own = _open(source, "r")
+    try:
+        field, symmetry, n, nnz = _mm_header(f)
+        if directed is None:
+            directed = symmetry == "general"
+        ncols = 2 if field == "pattern" else 3
+        parts = []
+        while True:
+            lines = _read_lines(f, chunk_bytes)
+            if not lines:
+                break
+            values = np.loadtxt(lines, comments="%", ndmin=2)
+            if len(values) and values.shape[1] != ncols:
+                raise ValueError(f"Ожидалось чисел в строке данных: {ncols}, найдено {values.shape[1]}")
+            parts.append(values.reshape(-1, ncols))
+    finally:
+        if own:
+            f.close()
+    data = np.concatenate(parts) if parts else np.zeros((0, ncols))
+    if len(data) != nnz:
+        raise ValueError(f"В заголовке {nnz} элементов, прочитано {len(data)}")
+    src = data[:, 0].astype(np.int64) - 1
+    dst = data[:, 1].astype(np.int64) - 1
+    if len(data) and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= n):
+        raise ValueError(f"Индекс вне диапазона 1..{n}")
+    if labels is None:
+        labels = list(range(n))
+    elif len(labels) != n:
+        raise ValueError(f"Нужно {n} меток, передано {len(labels)}")
+    w = data[:, 2] if ncols == 3 else None
+    return CSRGraph.from_arrays(labels, src, dst, w, directed=directed, multigraph=multigraph)
+
+def write_matrix_market(graph, target, comment=None):
+    """
+    Запись графа в Matrix Market: неориентированный — symmetric (нижний треугольник),
+    ориентированный — general; взвешенный — real, иначе pattern. Порядок вершин — порядок id,
+    метки не сохраняются (их можно записать в comment).
+    """
+    csr = as_csr(graph)
+    rows, cols, w = _edge_arrays(csr)
+    if not csr.directed:
+        rows, cols = np.maximum(rows, cols), np.minimum(rows, cols)
+    field = "real" if csr.weighted else "pattern"
+    symmetry = "general" if csr.directed else "symmetric"
+    n = csr.number_of_nodes()
+    f, own = _open(target, "w")
+    try:
+        f.write(f"%%MatrixMarket matrix coordinate {field} {symmetry}\n")
+        for line in (comment or "").splitlines():
+            f.write(f"% {line}\n")
+        f.write(f"{n} {n} {len(rows)}\n")
+        columns = [(_ints, rows + 1), (_ints, cols + 1)]
+        if csr.weighted:
+            columns.append((_floats, w))
+        _write_rows(f, columns, " ", 1 << 16)
+    finally:
+        if own:
+            f.close()
+
+# ------------- Матрица смежности -------------
+def from_adjacency(A, labels=None, directed=None):
+    """
+    Граф по матрице смежности: NumPy (n x n) или разреженная матрица SciPy (любой формат
+    с tocoo()). Ненулевой элемент A[i, j] — ребро i -> j с весом A[i, j]; граф взвешенный,
+    если есть веса, отличные от 1. directed=None — ориентированный, если матрица несимметрична;
+    у неориентированного берётся верхний треугольник с диагональю.
+    """
+    if hasattr(A, "tocoo"):
+        coo = A.tocoo()
+        n = coo.shape[0]
+        if coo.shape != (n, n):
+            raise ValueError(f"Матрица смежности должна быть квадратной, а не {coo.shape}")
+        src, dst, w = (np.asarray(coo.row, dtype=np.int64), np.asarray(coo.col, dtype=np.int64),
+                       np.asarray(coo.data, dtype=np.float64))
+        keep = w != 0
+        src, dst, w = src[keep], dst[keep], w[keep]
+        # порядок как у плотной матрицы: по строкам, внутри — по столбцам
+        order = np.lexsort((dst, src))
+        src, dst, w = src[order], dst[order], w[order]
+        if directed is None:
+            directed = (A != A.T).nnz != 0
+    else:
+        A = np.asarray(A)
+        n = A.shape[0]
+        if A.ndim != 2 or A.shape != (n, n):
+            raise ValueError(f"Матрица смежности должна быть квадратной, а не {A.shape}")
+        src, dst = np.nonzero(A)
+        w = A[src, dst].astype(np.float64)
+        if directed is None:
+            directed = not np.array_equal(A, A.T)
+    if not directed:
+        keep = src <= dst
+        src, dst, w = src[keep], dst[keep], w[keep]
+    if labels is None:
+        labels = list(range(n))
+    elif len(labels) != n:
+        raise ValueError(f"Нужно {n} меток, передано {len(labels)}")
+    weighted = bool((w != 1).any())
+    return CSRGraph.from_arrays(labels, src, dst, w if weighted else None, directed=bool(directed))
+
+def to_adjacency(graph, sparse=False, dtype=np.float64):
+    """
+    Матрица смежности в порядке id (веса; кратные рёбра складываются; петля — один раз,
+    как в nx.to_numpy_array). sparse=True — scipy.sparse.csr_array прямо из массивов CSR
+    без копирования структуры (нужен SciPy), иначе плотный NumPy n x n.
+    """
+    csr = as_csr(graph)
+    n = csr.number_of_nodes()
+    if sparse:
+        import scipy.sparse
+        A = scipy.sparse.csr_array((csr.weights.astype(dtype), csr.targets, csr.offsets), shape=(n, n))
+        A.sum_duplicates()
+        return A
+    A = np.zeros((n, n), dtype=dtype)
+    np.add.at(A, (csr.slot_rows(), csr.targets), csr.weights)
+    return A
@@ -0,0 +1,85 @@
+# graph_generators.py
+import math
+import numpy as np
+from graph_csr import CSRGraph
+
+# Синтетические графы для бенчмарков: вершины — целые 0..n-1, генератор NumPy с seed,
+# так что один и тот же (вид, n, seed) всегда даёт один и тот же граф.
+# weighted=True — веса рёбер равномерно из [1, 10) (длины дорог для Дейкстры).
+
+def _graph(n, src, dst, rng, weighted):
+    weights = rng.uniform(1.0, 10.0, len(src)) if weighted else None
+    return CSRGraph.from_arrays(list(range(n)), src, dst, weights)
+
+def erdos_renyi(n, avg_degree=4, seed=0, weighted=False):
+    """Случайный граф G(n, m) с m = n * avg_degree / 2 (петли и повторы отбрасываются)."""
+    rng = np.random.default_rng(seed)
+    m = n * avg_degree // 2 if n > 1 else 0
+    src = rng.integers(0, max(n, 1), m)
+    dst = rng.integers(0, max(n, 1), m)
+    keep = src != dst
+    return _graph(n, src[keep], dst[keep], rng, weighted)
+
+def grid_graph(n, drop=0.1, seed=0, weighted=False):
+    """
+    «Дорожная сеть»: решётка примерно sqrt(n) x sqrt(n) (последняя строка может быть неполной),
+    из которой случайно удалена доля drop рёбер; большой диаметр и степени не больше 4.
+    """
+    rng = np.random.default_rng(seed)
+    rows = max(1, math.isqrt(n))
+    cols = -(-n // rows) if n else 0
+    ids = np.arange(n)
+    right = ids[(ids % cols != cols - 1) & (ids + 1 < n)] if n else ids
+    down = ids[ids + cols < n] if n else ids
+    src = np.concatenate((right, down))
+    dst = np.concatenate((right + 1, down + cols))
+    keep = rng.random(len(src)) >= drop
+    return _graph(n, src[keep], dst[keep], rng, weighted)
+
+def power_law(n, attach=2, seed=0, weighted=False):
+    """
+    Граф Барабаши — Альберт: каждая новая вершина соединяется с attach вершинами,
+    выбранными пропорционально степени (хабы и степени по степенному закону).
+    """
+    rng = np.random.default_rng(seed)
+    if n <= attach:
+        return clique(n, seed=seed, weighted=weighted)
+    # каждый конец каждого ребра — одна запись; выбор из списка = выбор пропорционально степени
+    ends = list(range(attach))
+    src, dst = [], []
+    picks = rng.random((n - attach, attach))
+    for i, v in enumerate(range(attach, n)):
+        size = len(ends)
+        for r in picks[i].tolist():
+            u = ends[int(r * size)]
+            src.append(v)
+            dst.append(u)
+            ends.append(u)
+        ends.extend([v] * attach)
+    return _graph(n, np.array(src), np.array(dst), rng, weighted)
+
+def chain(n, seed=0, weighted=False):
+    """Путь 0 - 1 - ... - n-1: максимальная глубина обходов и диаметр n - 1."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(max(n - 1, 0))
+    return _graph(n, ids, ids + 1, rng, weighted)
+
+def clique(n, seed=0, weighted=False):
+    """Полный граф K_n: n(n-1)/2 рёбер (при нечётном n все степени чётны — граф эйлеров)."""
+    rng = np.random.default_rng(seed)
+    src, dst = np.triu_indices(n, k=1)
+    return _graph(n, src, dst, rng, weighted)
+
+GENERATORS = {
+    "erdos_renyi": erdos_renyi,
+    "grid": grid_graph,
+    "power_law": power_law,
+    "chain": chain,
+    "clique": clique,
+}
+
+def generate(kind, n, seed=0, weighted=False):
+    """Граф вида kind (ключ GENERATORS) с n вершинами."""
+    if kind not in GENERATORS:
+        raise ValueError(f"Неизвестный генератор: {kind}; есть: {', '.join(GENERATORS)}")
+    return GENERATORS[kind](n, seed=seed, weighted=weighted)
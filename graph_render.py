@@ -0,0 +1,287 @@
+# graph_render.py
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+import matplotlib
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from graph_csr import CSRGraph, as_csr
+
+# больше вершин / рёбер — рисуется уровень детализации (вершины наибольшей степени)
+MAX_DRAW_NODES = 2000
+MAX_DRAW_EDGES = 20000
+# подписи вершин и весов — только на маленьких картинках (каждая подпись — отдельный объект)
+LABEL_LIMIT = 60
+# до стольких вершин отталкивание в раскладке считается точно по всем парам, дальше — по сетке
+EXACT_LAYOUT_LIMIT = 1000
+GRID_SIZE = 32
+# бэкенды matplotlib без окна: при них картинку можно только записать в файл
+_NONINTERACTIVE = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+# кэш раскладок в памяти: отпечаток графа -> координаты (n x 2), LRU на LAYOUT_CACHE_SIZE записей
+LAYOUT_CACHE_SIZE = 64
+_positions = OrderedDict()
+
+def fingerprint(csr, ids=None):
+    """Отпечаток структуры графа (и подмножества вершин ids) — ключ кэша раскладок."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array([csr.number_of_nodes(), csr.directed], dtype=np.int64).tobytes())
+    h.update(np.ascontiguousarray(csr.offsets).tobytes())
+    h.update(np.ascontiguousarray(csr.targets).tobytes())
+    if ids is not None:
+        h.update(np.ascontiguousarray(ids, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+# ------------- Раскладка -------------
+def _repulsion_exact(pos, k2, block=512):
+    # сила Фрухтермана — Рейнгольда k^2 / d по всем парам, блоками строк
+    # (координаты раздельно: двумерные временные массивы вместо трёхмерных)
+    x, y = pos[:, 0], pos[:, 1]
+    disp = np.zeros_like(pos)
+    n = len(pos)
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        dx = x[lo:hi, None] - x[None, :]
+        dy = y[lo:hi, None] - y[None, :]
+        f = dx * dx + dy * dy
+        f[np.arange(hi - lo), np.arange(lo, hi)] = np.inf
+        np.maximum(f, 1e-12, out=f)
+        np.divide(k2, f, out=f)
+        disp[lo:hi, 0] = (dx * f).sum(axis=1)
+        disp[lo:hi, 1] = (dy * f).sum(axis=1)
+    return disp
+
+def _repulsion_grid(pos, k2, size=GRID_SIZE, block=1024):
+    """
+    Приближение Барнса — Хата с одним уровнем: вершины раскладываются по клеткам сетки
+    size x size, каждая непустая клетка отталкивает как точка с массой = числу вершин в центре
+    масс. Вклад своей клетки пересчитывается без самой вершины. O(n * клеток) за итерацию.
+    """
+    n = len(pos)
+    lo = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - lo, 1e-12)
+    cell = np.minimum(((pos - lo) / span * size).astype(np.int64), size - 1)
+    cid = cell[:, 0] * size + cell[:, 1]
+    mass = np.bincount(cid, minlength=size * size).astype(np.float64)
+    sx = np.bincount(cid, pos[:, 0], minlength=size * size)
+    sy = np.bincount(cid, pos[:, 1], minlength=size * size)
+    occupied = np.flatnonzero(mass)
+    m = mass[occupied]
+    cx, cy = sx[occupied] / m, sy[occupied] / m
+    slot = np.empty(size * size, dtype=np.int64)
+    slot[occupied] = np.arange(len(occupied))
+
+    def force(px, py, qx, qy, w):
+        dx, dy = px - qx, py - qy
+        f = w * k2 / np.maximum(dx * dx + dy * dy, 1e-12)
+        return dx * f, dy * f
+
+    x, y = pos[:, 0], pos[:, 1]
+    disp = np.zeros_like(pos)
+    for b in range(0, n, block):
+        e = min(n, b + block)
+        fx, fy = force(x[b:e, None], y[b:e, None], cx[None, :], cy[None, :], m[None, :])
+        disp[b:e, 0] = fx.sum(axis=1)
+        disp[b:e, 1] = fy.sum(axis=1)
+    # своя клетка: убираем вклад целой клетки и добавляем её же без самой вершины
+    own = slot[cid]
+    om = m[own]
+    rest = np.maximum(om - 1, 1)
+    fx, fy = force(x, y, cx[own], cy[own], om)
+    gx, gy = force(x, y, (cx[own] * om - x) / rest, (cy[own] * om - y) / rest, om - 1)
+    disp[:, 0] += gx - fx
+    disp[:, 1] += gy - fy
+    return disp
+
+def force_layout(graph, iterations=60, seed=0, init=None):
+    """
+    Силовая раскладка Фрухтермана — Рейнгольда в единичном квадрате на массивах NumPy:
+    притяжение по рёбрам d^2 / k (np.bincount по концам), отталкивание k^2 / d —
+    точно по всем парам до EXACT_LAYOUT_LIMIT вершин, дальше — по сетке (_repulsion_grid).
+    init — начальные координаты (например, прошлая раскладка), иначе случайные с seed.
+    Возвращает массив n x 2 в порядке id.
+    """
+    csr = as_csr(graph)
+    n = csr.number_of_nodes()
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2)) if init is None else np.array(init, dtype=np.float64)
+    if n <= 1:
+        return np.full((n, 2), 0.5)
+    rows = csr.slot_rows().astype(np.int64)
+    cols = csr.targets.astype(np.int64)
+    keep = rows != cols
+    rows, cols = rows[keep], cols[keep]
+    if csr.directed:
+        # у орграфа один слот на ребро: притягиваем оба конца
+        rows, cols = np.concatenate((rows, cols)), np.concatenate((cols, rows))
+    k = np.sqrt(1.0 / n)
+    repulsion = _repulsion_exact if n <= EXACT_LAYOUT_LIMIT else _repulsion_grid
+    t = 0.1
+    cooling = t / (iterations + 1)
+    for _ in range(iterations):
+        disp = repulsion(pos, k * k)
+        delta = pos[rows] - pos[cols]
+        dist = np.sqrt((delta ** 2).sum(axis=1))
+        pull = delta * (dist / k)[:, None]
+        disp[:, 0] -= np.bincount(rows, pull[:, 0], minlength=n)
+        disp[:, 1] -= np.bincount(rows, pull[:, 1], minlength=n)
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-12)
+        pos += disp * (np.minimum(length, t) / length)[:, None]
+        t -= cooling
+    pos -= pos.min(axis=0)
+    pos /= max(pos.max(), 1e-12)
+    return pos
+
+def cached_layout(graph, ids=None, cache_dir=None, iterations=60, seed=0):
+    """
+    Раскладка графа (или подграфа на id ids) из кэша: в памяти по отпечатку (последние
+    LAYOUT_CACHE_SIZE), а при cache_dir — ещё и в файлах <отпечаток>.npy, чтобы повторные
+    запуски не пересчитывали её.
+    """
+    csr = as_csr(graph)
+    key = fingerprint(csr, ids)
+    pos = _positions.get(key)
+    path = os.path.join(cache_dir, f"{key}.npy") if cache_dir else None
+    if pos is None and path and os.path.exists(path):
+        pos = np.load(path)
+    if pos is None:
+        sub = csr if ids is None else _induced(csr, ids)
+        pos = force_layout(sub, iterations=iterations, seed=seed)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(path, pos)
+    _positions[key] = pos
+    _positions.move_to_end(key)
+    while len(_positions) > LAYOUT_CACHE_SIZE:
+        _positions.popitem(last=False)
+    return pos
+
+def _induced(csr, ids):
+    # подграф на вершинах ids (новые id — позиции в ids), только для раскладки
+    local = np.full(csr.number_of_nodes(), -1, dtype=np.int64)
+    local[ids] = np.arange(len(ids))
+    rows = local[csr.slot_rows()]
+    cols = local[csr.targets]
+    keep = (rows >= 0) & (cols >= 0)
+    if not csr.directed:
+        # у неориентированного ребра два слота — берём один
+        keep &= rows <= cols
+    return CSRGraph.from_arrays(range(len(ids)), rows[keep], cols[keep],
+                                directed=csr.directed, multigraph=True, index={})
+
+# ------------- Уровень детализации -------------
+def level_of_detail(graph, max_nodes=MAX_DRAW_NODES, max_edges=MAX_DRAW_EDGES, keep=(), seed=0):
+    """
+    Что рисовать: (ids вершин, начала и концы рёбер по id). Граф больше max_nodes вершин
+    сводится к вершинам keep (выделенные путь/цикл) и вершинам наибольшей степени,
+    рёбра — к индуцированным (каждое один раз), не больше max_edges (равномерная выборка).
+    Вершины keep остаются всегда, даже если их больше max_nodes.
+    """
+    csr = as_csr(graph)
+    n = csr.number_of_nodes()
+    keep = np.unique(np.asarray(list(keep), dtype=np.int64))
+    limit = max(max_nodes, len(keep))
+    if n <= limit:
+        ids = np.arange(n)
+    else:
+        score = csr.degree_array().astype(np.float64)
+        score[keep] = np.inf
+        ids = np.sort(np.argpartition(-score, limit - 1)[:limit])
+    mask = np.zeros(n, dtype=bool)
+    mask[ids] = True
+    rows = csr.slot_rows().astype(np.int64)
+    cols = csr.targets.astype(np.int64)
+    sel = mask[rows] & mask[cols]
+    if not csr.directed:
+        sel &= rows <= cols
+    rows, cols = rows[sel], cols[sel]
+    if len(rows) > max_edges:
+        pick = np.sort(np.random.default_rng(seed).choice(len(rows), max_edges, replace=False))
+        rows, cols = rows[pick], cols[pick]
+    return ids, rows, cols
+
+# ------------- Рисование -------------
+def _pairs(csr, edges):
+    # пары меток -> массивы id; рёбра с неизвестными вершинами пропускаются
+    index = csr.index
+    src, dst = [], []
+    for e in edges or ():
+        u, v = index.get(e[0]), index.get(e[1])
+        if u is not None and v is not None:
+            src.append(u)
+            dst.append(v)
+    return np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
+
+def is_interactive():
+    """Можно ли показать окно (бэкенд matplotlib с GUI)."""
+    return matplotlib.get_backend().lower() not in _NONINTERACTIVE
+
+def draw_graph(graph, highlight_edges=None, title=None, out=None, edge_labels=False,
+               max_nodes=MAX_DRAW_NODES, max_edges=MAX_DRAW_EDGES, figsize=(6, 5),
+               cache_dir=None, show=True):
+    """
+    Рисует граф (networkx или CSRGraph) коллекциями matplotlib: все рёбра — одна LineCollection,
+    вершины — один scatter; highlight_edges (пары меток) — красным поверх.
+    Большой граф сводится к level_of_detail (в заголовке — сколько показано).
+    Раскладка — cached_layout (повторный рисунок того же графа её не пересчитывает).
+    out — файл (PNG, SVG, PDF — по расширению): рисунок пишется без GUI через Agg.
+    Без out окно показывается, только если show=True и бэкенд интерактивный.
+    Возвращает Figure.
+    """
+    csr = as_csr(graph)
+    hl_src, hl_dst = _pairs(csr, highlight_edges)
+    ids, rows, cols = level_of_detail(csr, max_nodes, max_edges,
+                                      keep=np.concatenate((hl_src, hl_dst)))
+    sub_pos = cached_layout(csr, None if len(ids) == csr.number_of_nodes() else ids,
+                            cache_dir=cache_dir)
+    pos = np.zeros((csr.number_of_nodes(), 2))
+    pos[ids] = sub_pos
+
+    interactive = out is None and show and is_interactive()
+    if interactive:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=figsize)
+    else:
+        fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    small = len(ids) <= LABEL_LIMIT
+    ax.add_collection(LineCollection(np.stack((pos[rows], pos[cols]), axis=1),
+                                     colors="0.4", linewidths=1.0 if small else 0.3,
+                                     alpha=1.0 if small else 0.5, zorder=1))
+    if len(hl_src):
+        ax.add_collection(LineCollection(np.stack((pos[hl_src], pos[hl_dst]), axis=1),
+                                         colors="r", linewidths=3, zorder=2))
+    ax.scatter(pos[ids, 0], pos[ids, 1], s=600 if small else max(2.0, 4000.0 / len(ids)),
+               c="#1f78b4", zorder=3)
+    if small:
+        labels = csr.labels
+        for i in ids.tolist():
+            ax.text(pos[i, 0], pos[i, 1], str(labels[i]), ha="center", va="center", zorder=4)
+        if edge_labels and csr.weighted:
+            w = {(u, v): x for u, v, x in csr.edge_list()}
+            for u, v in zip(rows.tolist(), cols.tolist()):
+                x = w.get((u, v), w.get((v, u)))
+                mid = (pos[u] + pos[v]) / 2
+                ax.text(mid[0], mid[1], f"{x:g}", ha="center", va="center", fontsize=8,
+                        bbox={"fc": "white", "ec": "none", "pad": 1}, zorder=4)
+    if len(ids) < csr.number_of_nodes():
+        shown = f"показано {len(ids)} из {csr.number_of_nodes()} вершин, {len(rows)} рёбер"
+        title = f"{title} ({shown})" if title else shown
+    if title:
+        ax.set_title(title)
+    ax.autoscale_view()
+    ax.margins(0.08)
+    ax.set_axis_off()
+    if out:
+        fig.savefig(out)
+    elif interactive:
+        plt.show()
+    return fig
+
+def add_plot_arguments(parser):
+    """Флаги --plot FILE / --no-plot для CLI лабораторных."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--plot", metavar="FILE",
+                       help="записать рисунок графа в файл (PNG/SVG) вместо окна")
+    group.add_argument("--no-plot", action="store_true", help="не рисовать граф")
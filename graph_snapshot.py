@@ -0,0 +1,173 @@
+# graph_snapshot.py
+import os
+import struct
+from collections.abc import Mapping, Sequence
+from mmap import ACCESS_READ, mmap as _map_file
+import numpy as np
+from graph_csr import CSRGraph, as_csr
+
+# Формат снимка (все числа little-endian):
+#   заголовок _HEADER: MAGIC, версия, флаги, n, число слотов, число рёбер, размер id (4/8 байт),
+#   вид меток, затем таблица секций _SECTIONS — (смещение, длина в байтах) каждой;
+#   секции выровнены по ALIGN байт, чтобы их можно было отобразить в массивы без копирования.
+MAGIC = b"CSRGRAPH"
+VERSION = 1
+ALIGN = 64
+_SECTIONS = ("offsets", "targets", "weights", "edge_ids", "label_offsets", "label_data")
+_HEADER = struct.Struct("<8sIIQQQII" + "QQ" * len(_SECTIONS))
+
+_DIRECTED, _MULTIGRAPH, _WEIGHTED = 1, 2, 4
+# вид меток: строки (UTF-8 подряд + смещения) или целые (int64 в label_data)
+_LABELS_STR, _LABELS_INT = 0, 1
+
+def _label_kind(labels):
+    if all(isinstance(v, str) for v in labels):
+        return _LABELS_STR
+    if all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in labels):
+        return _LABELS_INT
+    raise ValueError("В снимке хранятся только метки-строки или целые числа")
+
+def _label_sections(labels, kind):
+    if kind == _LABELS_INT:
+        return np.zeros(0, dtype="<i8"), np.asarray(list(labels), dtype="<i8")
+    encoded = [v.encode("utf-8") for v in labels]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+def save_snapshot(graph, path):
+    """
+    Записывает граф (CSRGraph или networkx; списки из parse_input — через CSRGraph.from_edges)
+    в бинарный снимок. Файл пишется во временный и переименовывается, так что читатели
+    никогда не видят недописанный снимок.
+    """
+    csr = as_csr(graph)
+    kind = _label_kind(csr.labels)
+    itype = np.dtype(csr.targets.dtype).newbyteorder("<")
+    label_offsets, label_data = _label_sections(csr.labels, kind)
+    arrays = [np.asarray(csr.offsets, dtype="<i8"), np.asarray(csr.targets, dtype=itype),
+              np.asarray(csr.weights, dtype="<f8"), np.asarray(csr.edge_ids, dtype=itype),
+              label_offsets, label_data]
+    flags = ((_DIRECTED if csr.directed else 0) | (_MULTIGRAPH if csr.multigraph else 0)
+             | (_WEIGHTED if csr.weighted else 0))
+    table = []
+    pos = _HEADER.size
+    for arr in arrays:
+        pos = -(-pos // ALIGN) * ALIGN
+        table += [pos, arr.nbytes]
+        pos += arr.nbytes
+    header = _HEADER.pack(MAGIC, VERSION, flags, csr.number_of_nodes(), len(csr.targets),
+                          csr.num_edges, itype.itemsize, kind, *table)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        for arr, start in zip(arrays, table[0::2]):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(np.ascontiguousarray(arr).tobytes())
+    os.replace(tmp, path)
+
+def is_snapshot(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+class SnapshotLabels(Sequence):
+    """
+    Метки снимка: строка декодируется из отображённого файла при обращении, а не при загрузке;
+    после первого полного прохода (tolist, итерация) используется готовый список.
+    """
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+        self._list = None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if self._list is not None:
+            return self._list[i]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._data[self._offsets[i]:self._offsets[i + 1]].tobytes().decode("utf-8")
+
+    def tolist(self):
+        # всё подряд одним куском и нарезка по смещениям — быстрее, чем по одной метке
+        if self._list is None:
+            text = self._data.tobytes()
+            bounds = self._offsets.tolist()
+            self._list = [text[a:b].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+        return self._list
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+class _LazyIndex(Mapping):
+    """Словарь метка -> id, который строится при первом поиске по метке."""
+
+    def __init__(self, labels):
+        self._labels = labels
+        self._dict = None
+
+    def _table(self):
+        if self._dict is None:
+            labels = self._labels.tolist() if hasattr(self._labels, "tolist") else self._labels
+            self._dict = {v: i for i, v in enumerate(labels)}
+        return self._dict
+
+    def __getitem__(self, label):
+        return self._table()[label]
+
+    def get(self, label, default=None):
+        return self._table().get(label, default)
+
+    def __contains__(self, label):
+        return label in self._table()
+
+    def __iter__(self):
+        return iter(self._table())
+
+    def __len__(self):
+        return len(self._labels)
+
+def load_snapshot(path, mmap=True):
+    """
+    Открывает снимок как CSRGraph. mmap=True — массивы CSR являются представлениями NumPy
+    поверх отображённого в память файла (только чтение, без копирования; страницы подгружаются
+    ОС по мере обращения), метки декодируются лениво, словарь index — при первом поиске.
+    mmap=False — файл читается в память целиком.
+    Неверная сигнатура, версия или обрезанный файл — ValueError.
+    """
+    with open(path, "rb") as f:
+        if mmap:
+            buf = _map_file(f.fileno(), 0, access=ACCESS_READ)
+        else:
+            buf = f.read()
+    if len(buf) < _HEADER.size or buf[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path}: не снимок графа")
+    magic, version, flags, n, slots, num_edges, isize, kind, *table = _HEADER.unpack_from(buf)
+    if version != VERSION:
+        raise ValueError(f"{path}: версия снимка {version}, поддерживается {VERSION}")
+    itype = np.dtype("<i4" if isize == 4 else "<i8")
+    dtypes = ("<i8", itype, "<f8", itype, "<i8", "<i8" if kind == _LABELS_INT else np.uint8)
+    arrays = {}
+    for name, dtype, start, size in zip(_SECTIONS, dtypes, table[0::2], table[1::2]):
+        if start + size > len(buf):
+            raise ValueError(f"{path}: снимок обрезан (секция {name})")
+        count = size // np.dtype(dtype).itemsize
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=start) if count \
+            else np.zeros(0, dtype=dtype)
+    if len(arrays["offsets"]) != n + 1 or len(arrays["targets"]) != slots:
+        raise ValueError(f"{path}: размеры секций не совпадают с заголовком")
+    if kind == _LABELS_INT:
+        labels = arrays["label_data"].tolist()
+    else:
+        labels = SnapshotLabels(arrays["label_offsets"], arrays["label_data"])
+    return CSRGraph(labels, arrays["offsets"], arrays["targets"], arrays["weights"],
+                    arrays["edge_ids"], num_edges, directed=bool(flags & _DIRECTED),
+                    multigraph=bool(flags & _MULTIGRAPH), weighted=bool(flags & _WEIGHTED),
+                    index=_LazyIndex(labels))
@@ -0,0 +1,256 @@
+# graph_stream.py
+import io
+import os
+import re
+import numpy as np
+from graph_csr import CSRGraph
+
+# метка — любая последовательность символов без пробелов, запятых и скобок
+_LABEL = rb"[^\s,(){}]+"
+_WS = re.compile(rb"\s*")
+# разделитель после элемента: «,», «}» или завершающая запятая перед «}»
+_SEP = rb"\s*(,\s*\}|,|\})"
+_NODE = re.compile(rb"\s*(" + _LABEL + rb")" + _SEP)
+_EDGE = re.compile(rb"\s*\(\s*(" + _LABEL + rb")\s*,\s*(" + _LABEL + rb")\s*\)" + _SEP)
+_CLOSE = ord("}")
+# быстрый путь: сразу много элементов, каждый с запятой после него (проверка — fullmatch,
+# значения — findall; оба прохода в C)
+_NODE_RUN = re.compile(rb"(?:\s*" + _LABEL + rb"\s*,)*")
+_NODE_ALL = re.compile(rb"\s*(" + _LABEL + rb")\s*,")
+_EDGE_RUN = re.compile(rb"(?:\s*\(\s*" + _LABEL + rb"\s*,\s*" + _LABEL + rb"\s*\)\s*,)*")
+_EDGE_ALL = re.compile(rb"\s*\(\s*(" + _LABEL + rb")\s*,\s*(" + _LABEL + rb")\s*\)\s*,")
+
+# сколько байт должно быть в буфере после текущей позиции, чтобы разбор одного элемента
+# не упёрся в границу прочитанного куска (элемент длиннее — синтаксическая ошибка)
+LOOKAHEAD = 1 << 16
+READ_SIZE = 1 << 20
+
+class GraphSyntaxError(ValueError):
+    """Ошибка в записи графа; offset — смещение в байтах от начала входа."""
+
+    def __init__(self, message, offset):
+        super().__init__(f"{message} (байт {offset})")
+        self.offset = offset
+
+def _open_binary(source):
+    # путь, бинарный или текстовый поток (sys.stdin) -> (бинарный поток, нужно ли закрыть)
+    if isinstance(source, (str, bytes, os.PathLike)):
+        return open(source, "rb"), True
+    if isinstance(source, io.TextIOBase) or hasattr(source, "buffer"):
+        return source.buffer, False
+    return source, False
+
+class GraphStreamReader:
+    """
+    Потоковый разбор записи {{v1, v2, ...},{(v1, v2), ...}} (внешние скобки можно опустить).
+    Вход читается кусками по READ_SIZE байт, так что файл любого размера не держится в памяти
+    целиком. Метки сразу заменяются целыми id (labels — таблица id -> метка, index — обратная);
+    вершины, встреченные только в рёбрах, добавляются в таблицу в момент первого появления.
+    Итерация выдаёт куски не длиннее chunk_size элементов:
+      ("nodes", ids) — id вершин в порядке перечисления;
+      ("edges", src, dst) — массивы id концов рёбер.
+    """
+
+    def __init__(self, source, chunk_size=1 << 16):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.labels = []
+        self.index = {}
+        self._stream = None
+        self._buf = b""
+        self._pos = 0
+        self._base = 0
+        self._eof = False
+
+    # ------------- Буфер -------------
+    def _fill(self):
+        # дочитываем, пока после pos меньше LOOKAHEAD байт и вход не кончился
+        while not self._eof and len(self._buf) - self._pos < LOOKAHEAD:
+            data = self._stream.read(READ_SIZE)
+            if not data:
+                self._eof = True
+                break
+            self._base += self._pos
+            self._buf = self._buf[self._pos:] + data
+            self._pos = 0
+
+    def _offset(self):
+        return self._base + self._pos
+
+    def _error(self, message):
+        return GraphSyntaxError(message, self._offset())
+
+    def _skip_ws(self):
+        while True:
+            self._fill()
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or self._eof:
+                return
+
+    def _peek(self):
+        self._skip_ws()
+        return self._buf[self._pos:self._pos + 1]
+
+    def _expect(self, char, what):
+        if self._peek() != char:
+            found = self._buf[self._pos:self._pos + 1].decode("utf-8", "replace") or "конец входа"
+            raise self._error(f"Ожидалось: {what}, найдено «{found}»")
+        self._pos += 1
+
+    def _intern(self, raw):
+        i = self.index.get(raw)
+        if i is None:
+            i = len(self.labels)
+            try:
+                label = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                raise self._error("Метка вершины не в кодировке UTF-8") from None
+            self.index[raw] = i
+            self.labels.append(label)
+        return i
+
+    # ------------- Разбор -------------
+    def _intern_many(self, raws):
+        # поиск меток словарём целиком через map; новые метки — по одной, в порядке появления
+        ids = list(map(self.index.get, raws))
+        if None in ids:
+            for k, i in enumerate(ids):
+                if i is None:
+                    ids[k] = self._intern(raws[k])
+        return ids
+
+    def _run_end(self, buf, pos, width):
+        """
+        Конец участка buf[pos:end] из целых элементов, за каждым из которых стоит запятая,
+        или pos, если такого нет. Метки не содержат скобок, так что список не дальше первой '}'.
+        """
+        limit = buf.find(b"}", pos)
+        if limit < 0:
+            limit = len(buf)
+        if width == 1:
+            return buf.rfind(b",", pos, limit) + 1 or pos
+        # у пары внутри тоже есть запятая: ищем ')' , за которой (после пробелов) идёт ','
+        j = limit
+        while True:
+            j = buf.rfind(b")", pos, j)
+            if j < 0:
+                return pos
+            k = _WS.match(buf, j + 1).end()
+            if k < limit and buf[k] == 44:
+                return k + 1
+
+    def _items(self, pattern, what, width):
+        """
+        Элементы списка до закрывающей '}' (пустой список и запятая перед '}' допускаются) —
+        куски не длиннее chunk_size списков id (width меток на элемент).
+        Основная часть прочитанного буфера разбирается за раз (_run_end, fullmatch + findall);
+        по одному элементу — только хвост буфера и место ошибки, чтобы указать её смещение.
+        """
+        if self._peek() == b"}":
+            self._pos += 1
+            return
+        run, every = (_NODE_RUN, _NODE_ALL) if width == 1 else (_EDGE_RUN, _EDGE_ALL)
+        cols = [[] for _ in range(width)]
+        count = 0
+        after_comma = False
+        while True:
+            self._fill()
+            buf, pos = self._buf, self._pos
+            end = self._run_end(buf, pos, width)
+            if end > pos and run.fullmatch(buf, pos, end):
+                found = every.findall(buf, pos, end)
+                if width == 1:
+                    cols[0].extend(self._intern_many(found))
+                else:
+                    flat = self._intern_many([x for pair in found for x in pair])
+                    cols[0].extend(flat[0::2])
+                    cols[1].extend(flat[1::2])
+                count += len(found)
+                self._pos = end
+                after_comma = True
+                last = False
+            else:
+                m = pattern.match(buf, pos)
+                if m is None:
+                    self._skip_ws()
+                    if after_comma and self._buf[self._pos:self._pos + 1] == b"}":
+                        # запятая перед закрывающей скобкой
+                        self._pos += 1
+                        last = True
+                    else:
+                        raise self._error(f"Ожидалась {what}")
+                else:
+                    for k in range(width):
+                        self._pos = m.start(k + 1)
+                        cols[k].append(self._intern(m.group(k + 1)))
+                    self._pos = m.end()
+                    count += 1
+                    sep = m.group(width + 1)
+                    last = sep[-1] == _CLOSE
+                    after_comma = not last
+            if count >= self.chunk_size or (last and count):
+                # быстрый путь добавляет сразу весь участок буфера — режем его по chunk_size,
+                # остаток меньше куска ждёт следующих элементов
+                size = self.chunk_size
+                full = count if last else count - count % size
+                arrays = [np.array(c, dtype=np.int64) for c in cols]
+                for start in range(0, full, size):
+                    yield [a[start:start + size] for a in arrays]
+                cols = [a[full:].tolist() for a in arrays]
+                count -= full
+            if last:
+                return
+
+    def __iter__(self):
+        self._stream, close = _open_binary(self.source)
+        try:
+            yield from self._parse()
+        finally:
+            if close:
+                self._stream.close()
+
+    def _parse(self):
+        self._expect(b"{", "«{»")
+        outer = self._peek() == b"{"
+        if outer:
+            self._pos += 1
+        for (ids,) in self._items(_NODE, "вершина «v» и «,» или «}»", 1):
+            yield ("nodes", ids)
+        self._expect(b",", "«,» между вершинами и рёбрами")
+        self._expect(b"{", "«{» перед списком рёбер")
+        for src, dst in self._items(_EDGE, "пара «(u, v)» и «,» или «}»", 2):
+            yield ("edges", src, dst)
+        if outer:
+            self._expect(b"}", "закрывающая «}»")
+        if self._peek():
+            raise self._error("Лишние символы после описания графа")
+
+def read_arrays(source, chunk_size=1 << 16):
+    """Весь граф массивами: (labels, node_ids, src, dst)."""
+    reader = GraphStreamReader(source, chunk_size)
+    nodes, src, dst = [], [], []
+    for chunk in reader:
+        if chunk[0] == "nodes":
+            nodes.append(chunk[1])
+        else:
+            src.append(chunk[1])
+            dst.append(chunk[2])
+    empty = np.zeros(0, dtype=np.int64)
+    return (reader.labels,
+            np.concatenate(nodes) if nodes else empty,
+            np.concatenate(src) if src else empty,
+            np.concatenate(dst) if dst else empty)
+
+def read_csr(source, directed=False, multigraph=False):
+    """
+    Граф из файла или потока сразу в CSRGraph, без промежуточных списков меток и networkx.
+    Порядок вершин — порядок первого появления (как у networkx после add_nodes_from + add_edges_from).
+    """
+    labels, _, src, dst = read_arrays(source)
+    return CSRGraph.from_arrays(labels, src, dst, directed=directed, multigraph=multigraph)
+
+def parse_text(raw):
+    """Разбор строки: (list_node, list_connection) с метками-строками, как в test.parse_input."""
+    labels, nodes, src, dst = read_arrays(io.BytesIO(raw.encode("utf-8")))
+    return ([labels[i] for i in nodes.tolist()],
+            [(labels[a], labels[b]) for a, b in zip(src.tolist(), dst.tolist())])
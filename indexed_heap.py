@@ -0,0 +1,95 @@
+# indexed_heap.py
+
+class IndexedDaryHeap:
+    """
+    Индексная d-арная min-куча по вершинам 0..capacity-1 с операцией decrease-key.
+    pos[v] — позиция вершины в куче (-1, если её там нет), key[v] — её ключ;
+    в отличие от heapq с «ленивым» удалением, каждая вершина лежит в куче не более одного раза.
+    Массивы pos/key выделяются один раз, clear() сбрасывает только вершины, оставшиеся в куче.
+    """
+
+    def __init__(self, capacity, arity=4):
+        if arity < 2:
+            raise ValueError("Арность кучи должна быть не меньше 2")
+        self.arity = arity
+        self.heap = []
+        self.pos = [-1] * capacity
+        self.key = [0.0] * capacity
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, v):
+        return self.pos[v] >= 0
+
+    def peek_key(self):
+        return self.key[self.heap[0]]
+
+    def push(self, v, k):
+        """Добавляет v с ключом k или уменьшает его ключ; возвращает True, если ключ изменился."""
+        i = self.pos[v]
+        if i < 0:
+            i = len(self.heap)
+            self.heap.append(v)
+            self.pos[v] = i
+        elif k >= self.key[v]:
+            return False
+        self.key[v] = k
+        self._sift_up(i)
+        return True
+
+    def pop(self):
+        """Извлекает вершину с наименьшим ключом: (v, key)."""
+        heap = self.heap
+        root = heap[0]
+        last = heap.pop()
+        self.pos[root] = -1
+        if heap:
+            heap[0] = last
+            self.pos[last] = 0
+            self._sift_down(0)
+        return root, self.key[root]
+
+    def clear(self):
+        for v in self.heap:
+            self.pos[v] = -1
+        self.heap.clear()
+
+    def _sift_up(self, i):
+        heap, pos, key, d = self.heap, self.pos, self.key, self.arity
+        v = heap[i]
+        k = key[v]
+        while i > 0:
+            parent = (i - 1) // d
+            u = heap[parent]
+            if key[u] <= k:
+                break
+            heap[i] = u
+            pos[u] = i
+            i = parent
+        heap[i] = v
+        pos[v] = i
+
+    def _sift_down(self, i):
+        heap, pos, key, d = self.heap, self.pos, self.key, self.arity
+        size = len(heap)
+        v = heap[i]
+        k = key[v]
+        while True:
+            first = d * i + 1
+            if first >= size:
+                break
+            best = first
+            best_key = key[heap[first]]
+            for c in range(first + 1, min(first + d, size)):
+                ck = key[heap[c]]
+                if ck < best_key:
+                    best, best_key = c, ck
+            if best_key >= k:
+                break
+            u = heap[best]
+            heap[i] = u
+            pos[u] = i
+            i = best
+        heap[i] = v
+        pos[v] = i
@@ -1,8 +1,48 @@
 # lab1_graph_io.py
-import matplotlib.pyplot as plt
+import argparse
+import os
+import time
 import networkx as nx
+from graph_csr import CSRGraph
+from graph_formats import read_edge_csv, read_matrix_market
+from graph_render import add_plot_arguments, draw_graph
+from graph_snapshot import is_snapshot, load_snapshot, save_snapshot
+from graph_stream import read_csr
+
+def load_graph(path, directed=False):
+    """
+    Граф из файла: бинарный снимок (graph_snapshot, открывается через mmap за миллисекунды),
+    список рёбер .csv, Matrix Market .mtx (graph_formats) или текст {{v1, v2},{(v1, v2)}}
+    (потоковый разбор graph_stream). Снимок определяется по сигнатуре, остальное — по расширению;
+    directed относится к тексту и CSV — снимок и .mtx хранят его сами.
+    """
+    if is_snapshot(path):
+        return load_snapshot(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return read_edge_csv(path, directed=directed)
+    if ext == ".mtx":
+        return read_matrix_market(path)
+    return read_csr(path, directed=directed)
 
 def main():
+    parser = argparse.ArgumentParser(description="Lab1 — ввод графа")
+    parser.add_argument("path", nargs="?", help="файл графа: текст, .csv, .mtx или снимок (без него — встроенный пример)")
+    parser.add_argument("--save", metavar="SNAPSHOT", help="записать граф в бинарный снимок")
+    add_plot_arguments(parser)
+    args = parser.parse_args()
+    if args.path:
+        start = time.perf_counter()
+        csr = load_graph(args.path)
+        print(f"Загружен {args.path} за {time.perf_counter() - start:.3f} с: "
+              f"{csr.number_of_nodes()} вершин, {csr.number_of_edges()} рёбер")
+        if args.save:
+            save_snapshot(csr, args.save)
+            print("Снимок записан:", args.save)
+        if not args.no_plot:
+            draw_graph(csr, title=f"Lab1 — {os.path.basename(args.path)}", out=args.plot)
+        return
+
     # Хардкод: простой граф с вершинами v1..v5
     nodes = ["v1", "v2", "v3", "v4", "v5"]
     edges = [("v1", "v2"), ("v1", "v3"), ("v2", "v4"), ("v3", "v5"), ("v4", "v5")]
@@ -15,11 +55,16 @@ def main():
     print("Nodes list:", nodes)
     print("Edges list:", edges)
 
-    plt.figure(figsize=(6, 5))
-    pos = nx.spring_layout(G)
-    nx.draw(G, pos, with_labels=True, node_size=600, node_color='lightblue', font_weight='bold')
-    plt.title("Lab1 — Input Graph (hardcoded)")
-    plt.show()
+    # То же самое в компактном CSR-представлении (массивы вместо словарей networkx)
+    csr = CSRGraph.from_edges(nodes, edges)
+    print("CSR offsets:", csr.offsets.tolist())
+    print("CSR targets:", csr.targets.tolist())
+    if args.save:
+        save_snapshot(csr, args.save)
+        print("Снимок записан:", args.save)
+
+    if not args.no_plot:
+        draw_graph(G, title="Lab1 — Input Graph (hardcoded)", out=args.plot)
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,357 @@
 # lab2_bfs.py
-import networkx as nx
 from collections import deque
+import networkx as nx
+import numpy as np
+from graph_csr import as_csr, raw_adjacency
 
-def bfs(graph, start):
-    visited = []
+# уровни с фронтиром не больше SCALAR_FRONTIER вершин проходятся очередью Python: у шага
+# на массивах постоянные накладные расходы (~50 мкс), которые на длинных цепочках
+# и разреженных графах с малыми уровнями больше самой работы
+SCALAR_FRONTIER = 32
+# серия BFS по компоненте (bfs_profiles) идёт очередью Python, если средний уровень
+# не больше SCALAR_LEVEL вершин, а средняя степень — не больше SCALAR_DEGREE: иначе
+# шаг на массивах окупает свои накладные расходы
+SCALAR_LEVEL = 512
+SCALAR_DEGREE = 32
+
+def _unique_in_order(ids):
+    # уникальные id в порядке первого появления
+    _, first = np.unique(ids, return_index=True)
+    first.sort()
+    return ids[first], first
+
+def _top_down_step(offsets, targets, frontier, visited):
+    # все рёбра фронтира -> ещё не посещённые соседи
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return frontier[:0], frontier[:0], 0
+    # номера слотов всех рёбер фронтира подряд, без цикла по вершинам
+    slots = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    nbrs = targets[slots].astype(np.int64)
+    owners = np.repeat(frontier, counts)
+    fresh = ~visited[nbrs]
+    # первое вхождение соседа — именно тогда его поставила бы в очередь FIFO
+    found, first = _unique_in_order(nbrs[fresh])
+    return found, owners[fresh][first], total
+
+def _scalar_levels(off, tgt, frontier, level, seen, dist, parent, order, examined_log,
+                   m_frontier=0, m_unvisited=0, alpha=None):
+    """
+    Уровни очередью Python, пока фронтир не больше SCALAR_FRONTIER вершин.
+    off, tgt, seen, dist, parent — memoryview массивов (индексация без объектов NumPy);
+    сосед отмечается сразу, поэтому порядок — первого появления, как у _top_down_step.
+    Найденные вершины дописываются в order. alpha (режим auto) — остановиться после уровня,
+    на котором рёбер фронтира m_frontier стало больше m_unvisited / alpha (пора идти снизу вверх).
+    Возвращает (фронтир, номер уровня, m_frontier, m_unvisited).
+    """
+    while frontier and len(frontier) <= SCALAR_FRONTIER:
+        level += 1
+        found = []
+        push = found.append
+        examined = 0
+        m_next = 0
+        for u in frontier:
+            lo = off[u]
+            hi = off[u + 1]
+            examined += hi - lo
+            for v in tgt[lo:hi]:
+                if not seen[v]:
+                    seen[v] = 1
+                    dist[v] = level
+                    parent[v] = u
+                    push(v)
+                    m_next += off[v + 1] - off[v]
+        if found or examined:
+            examined_log.append(examined)
+        order.extend(found)
+        frontier = found
+        m_frontier = m_next
+        m_unvisited -= m_next
+        if alpha is not None and m_frontier > m_unvisited / alpha:
+            break
+    return frontier, level, m_frontier, m_unvisited
+
+def _bottom_up_step(offsets, targets, in_frontier, visited, tail=64):
+    """
+    Шаг снизу вверх: каждая непосещённая вершина просматривает своих (входящих) соседей
+    и останавливается на первом, лежащем во фронтире.
+    Раунд k проверяет k-го соседа у всех ещё не нашедших родителя вершин; когда таких
+    остаётся меньше tail, их списки соседей дочитываются целиком за один проход.
+    """
+    cand = np.flatnonzero(~visited)
+    lo = offsets[cand]
+    hi = offsets[cand + 1]
+    alive = hi > lo
+    cand, lo, hi = cand[alive], lo[alive], hi[alive]
+    found = []
+    parents = []
+    examined = 0
+    k = 0
+    while cand.size >= tail:
+        nb = targets[lo + k].astype(np.int64)
+        examined += cand.size
+        hit = in_frontier[nb]
+        found.append(cand[hit])
+        parents.append(nb[hit])
+        k += 1
+        rest = ~hit & (lo + k < hi)
+        cand, lo, hi = cand[rest], lo[rest], hi[rest]
+    if cand.size:
+        # остаток: все оставшиеся слоты разом, первый попавший во фронтир — родитель
+        counts = hi - lo - k
+        total = int(counts.sum())
+        slots = np.arange(total) + np.repeat(lo + k - (np.cumsum(counts) - counts), counts)
+        owner = np.repeat(np.arange(cand.size), counts)
+        nb = targets[slots].astype(np.int64)
+        hit = np.flatnonzero(in_frontier[nb])
+        owners_hit, first = np.unique(owner[hit], return_index=True)
+        found.append(cand[owners_hit])
+        parents.append(nb[hit[first]])
+        # для нашедших — до первого попадания включительно, для остальных — весь список
+        scanned = counts.copy()
+        scanned[owners_hit] = hit[first] - (np.cumsum(counts) - counts)[owners_hit] + 1
+        examined += int(scanned.sum())
+    found = np.concatenate(found) if found else cand[:0]
+    parents = np.concatenate(parents) if parents else cand[:0]
+    order = np.argsort(found)
+    return found[order], parents[order], examined
+
+def bfs_levels(csr, sources, sort_neighbors=False, direction="top-down",
+               alpha=15.0, beta=18.0, stats=None):
+    """
+    Поуровневый BFS по CSR-графу из нескольких источников (id вершин).
+    Каждый уровень обрабатывается целиком массивами: фронтир -> все его рёбра ->
+    ещё не посещённые соседи (битовая карта visited) -> следующий фронтир.
+    В режиме top-down порядок вершин совпадает с обычным BFS на очереди (FIFO).
+    direction="auto" — direction-optimizing BFS (Beamer): переход к шагам снизу вверх,
+    когда рёбер у фронтира m_f > m_u / alpha (m_u — рёбра непосещённых вершин),
+    и обратно, когда вершин во фронтире n_f < n / beta. Расстояния те же, но внутри
+    уровня, найденного снизу вверх, вершины идут по возрастанию id.
+    Если передан словарь stats, в него пишутся edges_examined (рёбра, просмотренные
+    на каждом уровне) и directions ('top-down' / 'bottom-up' для каждого уровня).
+    Возвращает (order, dist, parent): порядок обхода, расстояния (-1 — недостижима)
+    и родителей в дереве BFS (-1 у источников и недостижимых).
+    """
+    if direction not in ("top-down", "auto"):
+        raise ValueError(f"Неизвестное направление BFS: {direction}")
+    if sort_neighbors:
+        csr = csr.sorted_by_label()
+    n = csr.number_of_nodes()
+    offsets, targets = csr.offsets, csr.targets
+    # снизу вверх нужны входящие рёбра
+    rev = csr.reverse()
+    visited = np.zeros(n, dtype=bool)
+    dist = np.full(n, -1, dtype=np.int64)
+    parent = np.full(n, -1, dtype=np.int64)
+    off_mv = memoryview(np.ascontiguousarray(offsets))
+    tgt_mv = memoryview(np.ascontiguousarray(targets))
+    seen = memoryview(visited.view(np.uint8))
+    dist_mv = memoryview(dist)
+    parent_mv = memoryview(parent)
+    edges_examined = []
+    directions = []
+
+    frontier, _ = _unique_in_order(np.asarray(sources, dtype=np.int64))
+    visited[frontier] = True
+    dist[frontier] = 0
+    # порядок обхода: массивы уровней; подряд идущие «скалярные» уровни копятся в run
+    levels = [frontier]
+    run = []
+    level = 0
+    out_deg = np.diff(offsets)
+    m_unvisited = int(out_deg.sum()) - int(out_deg[frontier].sum()) if direction == "auto" else 0
+    bottom_up = False
+    while len(frontier):
+        small = len(frontier) <= SCALAR_FRONTIER
+        m_frontier = 0
+        if small and not isinstance(frontier, list):
+            frontier = frontier.tolist()
+        if direction == "auto":
+            if small:
+                m_frontier = sum(off_mv[u + 1] - off_mv[u] for u in frontier)
+            else:
+                m_frontier = int(out_deg[frontier].sum())
+            if not bottom_up and m_frontier > m_unvisited / alpha:
+                bottom_up = True
+            elif bottom_up and len(frontier) < n / beta:
+                bottom_up = False
+        if small and not bottom_up:
+            # подряд все малые уровни; в режиме auto — пока не пора переходить снизу вверх
+            logged = len(edges_examined)
+            frontier, level, m_frontier, m_unvisited = _scalar_levels(
+                off_mv, tgt_mv, frontier, level, seen, dist_mv, parent_mv, run, edges_examined,
+                m_frontier, m_unvisited, alpha if direction == "auto" else None)
+            directions.extend(["top-down"] * (len(edges_examined) - logged))
+            continue
+        level += 1
+        frontier = np.asarray(frontier, dtype=np.int64)
+        if bottom_up:
+            in_frontier = np.zeros(n, dtype=bool)
+            in_frontier[frontier] = True
+            found, owners, examined = _bottom_up_step(rev.offsets, rev.targets,
+                                                      in_frontier, visited)
+        else:
+            found, owners, examined = _top_down_step(offsets, targets, frontier, visited)
+        visited[found] = True
+        dist[found] = level
+        parent[found] = owners
+        if direction == "auto":
+            m_unvisited -= int(out_deg[found].sum())
+        if run:
+            levels.append(np.array(run, dtype=np.int64))
+            run = []
+        levels.append(found)
+        if found.size or examined:
+            edges_examined.append(examined)
+            directions.append("bottom-up" if bottom_up else "top-down")
+        frontier = found
+    if run:
+        levels.append(np.array(run, dtype=np.int64))
+    if stats is not None:
+        stats["edges_examined"] = edges_examined
+        stats["directions"] = directions
+    return np.concatenate(levels), dist, parent
+
+def bfs_profile(csr, source, visited=None):
+    """
+    Один BFS от source ради сводных величин: (ecc, dist_sum, order, sizes) — эксцентриситет,
+    сумма расстояний до достижимых вершин, порядок обхода (id) и размеры уровней
+    (вершины order идут уровнями: sizes[0] вершин на расстоянии 0, sizes[1] — на 1 ...).
+    visited — переиспользуемая битовая карта размера n (после вызова она снова вся False),
+    чтобы серия BFS из многих источников не выделяла O(n) памяти на каждый.
+    """
+    if visited is None:
+        visited = np.zeros(csr.number_of_nodes(), dtype=bool)
+    offsets, targets = csr.offsets, csr.targets
+    frontier = np.array([source], dtype=np.int64)
+    visited[source] = True
+    levels = [frontier]
+    ecc = 0
+    dist_sum = 0
+    while True:
+        frontier, _, _ = _top_down_step(offsets, targets, frontier, visited)
+        if not frontier.size:
+            break
+        ecc += 1
+        dist_sum += ecc * frontier.size
+        visited[frontier] = True
+        levels.append(frontier)
+    order = np.concatenate(levels)
+    visited[order] = False
+    return ecc, dist_sum, order, [len(level) for level in levels]
+
+def _component_lists(csr, comp):
+    # списки соседей вершин comp (отсортированных) в номерах позиций comp
+    offsets = csr.offsets
+    starts = offsets[comp]
+    counts = offsets[comp + 1] - starts
+    ends = np.cumsum(counts)
+    slots = np.arange(int(ends[-1])) + np.repeat(starts - (ends - counts), counts)
+    nbrs = np.searchsorted(comp, csr.targets[slots]).tolist()
+    lists = []
+    begin = 0
+    for end in ends.tolist():
+        lists.append(nbrs[begin:end])
+        begin = end
+    return lists
+
+def _scalar_profile(adj, source, mark, stamp):
+    # BFS очередью по спискам: mark[v] == stamp — вершина посещена в этом обходе
+    mark[source] = stamp
+    frontier = [source]
+    ecc = 0
+    dist_sum = 0
+    while True:
+        found = []
+        for u in frontier:
+            for v in adj[u]:
+                if mark[v] != stamp:
+                    mark[v] = stamp
+                    found.append(v)
+        if not found:
+            return ecc, dist_sum
+        ecc += 1
+        dist_sum += ecc * len(found)
+        frontier = found
+
+def bfs_profiles(csr, comp, visited=None):
+    """
+    BFS из каждой вершины компоненты comp (массив id): эксцентриситеты (массив в порядке comp)
+    и сумма расстояний по всем парам. Первый обход — bfs_profile; если уровни в нём малы
+    (длинные цепочки, решётки, разреженные графы) и граф не плотный, остальные идут
+    очередью Python по спискам соседей компоненты — без накладных расходов на уровень.
+    """
+    k = len(comp)
+    ecc = np.zeros(k, dtype=np.int64)
+    if k < 2:
+        return ecc, 0
+    ecc[0], dist_sum, _, sizes = bfs_profile(csr, int(comp[0]), visited)
+    slots = int((csr.offsets[comp + 1] - csr.offsets[comp]).sum())
+    if k > SCALAR_LEVEL * len(sizes) or slots > SCALAR_DEGREE * k:
+        for i, v in enumerate(comp[1:].tolist(), start=1):
+            ecc[i], s, _, _ = bfs_profile(csr, v, visited)
+            dist_sum += s
+        return ecc, dist_sum
+    by_id = np.sort(comp)
+    adj = _component_lists(csr, by_id)
+    mark = [0] * k
+    for i, v in enumerate(np.searchsorted(by_id, comp[1:]).tolist(), start=1):
+        ecc[i], s = _scalar_profile(adj, v, mark, i)
+        dist_sum += s
+    return ecc, dist_sum
+
+def bfs_multi(graph, sources, sort_neighbors=False, direction="top-down", stats=None):
+    """
+    BFS из нескольких стартовых вершин (метки) для nx.Graph или CSRGraph.
+    direction и stats — как в bfs_levels.
+    Возвращает (order, dist, parent): порядок обхода и словари расстояний/родителей
+    только для достижимых вершин (у источников родитель None).
+    """
+    csr = as_csr(graph)
+    ids = [csr.index[s] for s in sources]
+    order, dist, parent = bfs_levels(csr, ids, sort_neighbors=sort_neighbors,
+                                     direction=direction, stats=stats)
+    labels = csr.labels
+    order = order.tolist()
+    order_labels = [labels[i] for i in order]
+    dist_map = dict(zip(order_labels, dist[order].tolist()))
+    parent_map = {labels[i]: (labels[p] if p >= 0 else None)
+                  for i, p in zip(order, parent[order].tolist())}
+    return order_labels, dist_map, parent_map
+
+def bfs_adjacency(adj, start):
+    """Порядок BFS очередью по словарю соседей (вершина -> итерируемое соседей)."""
+    seen = {start}
+    order = []
     queue = deque([start])
     while queue:
-        node = queue.popleft()
-        if node not in visited:
-            visited.append(node)
-            # добавляем соседей в очередь (сортируем для детерминизма)
-            neighbors = sorted(list(graph[node]))
-            for n in neighbors:
-                if n not in visited and n not in queue:
-                    queue.append(n)
-    return visited
+        u = queue.popleft()
+        order.append(u)
+        for v in adj[u]:
+            if v not in seen:
+                seen.add(v)
+                queue.append(v)
+    return order
+
+def bfs_order(graph, start, direction="top-down"):
+    """
+    Порядок BFS (метки) от start, соседи — в порядке графа. Граф networkx в режиме top-down
+    обходится очередью прямо по его словарям соседей: для одного обхода это быстрее,
+    чем строить CSR; CSRGraph и direction="auto" — поуровневый bfs_levels.
+    """
+    adj = raw_adjacency(graph)
+    if adj is not None and direction == "top-down":
+        return bfs_adjacency(adj, start)
+    order, _, _ = bfs_multi(graph, [start], direction=direction)
+    return order
+
+def bfs(graph, start):
+    # соседи перебираются по возрастанию меток (для детерминизма)
+    csr = as_csr(graph)
+    order, _, _ = bfs_levels(csr, [csr.index[start]], sort_neighbors=True)
+    return [csr.labels[i] for i in order.tolist()]
 
 def main():
     # Хардкод графа (целочисленные вершины)
@@ -28,5 +365,14 @@ def main():
     print("Lab2 — BFS order from", start, ":")
     print(" -> ".join(map(str, order)))
 
+    order, dist, _ = bfs_multi(G, [1, 6], sort_neighbors=True)
+    print("Lab2 — BFS from sources 1 and 6:")
+    print(" " + ", ".join(f"{v}: {dist[v]}" for v in order))
+
+    stats = {}
+    bfs_multi(G, [start], direction="auto", stats=stats)
+    print("Lab2 — direction-optimizing BFS, рёбер просмотрено по уровням:")
+    print(" " + ", ".join(f"{d}: {e}" for d, e in zip(stats["directions"], stats["edges_examined"])))
+
 if __name__ == "__main__":
     main()
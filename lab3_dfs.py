@@ -1,17 +1,146 @@
 # lab3_dfs.py
+import gc
 import networkx as nx
-import sys
+from graph_csr import as_csr, raw_adjacency
 
-sys.setrecursionlimit(10000)
+def dfs_events(csr, sources=None, sort_neighbors=True, visited=None):
+    """
+    DFS по CSR-графу без рекурсии: явный стек и курсор по списку соседей каждой вершины,
+    так что на шаг не создаётся ни списков, ни итераторов. Глубина графа не ограничена.
+    Порядок событий тот же, что у рекурсивного обхода.
+    Генерирует события (вид, a, b):
+      ("pre", v, t)   — вершина v открыта в момент t (discovery time);
+      ("post", v, t)  — вершина v закрыта в момент t (finish time);
+      ("tree", u, v), ("back", u, v), ("forward", u, v), ("cross", u, v) — класс ребра u -> v
+      (в неориентированном графе бывают только tree и back, каждое ребро — один раз).
+    sources — id стартовых вершин (по умолчанию все, получается лес DFS);
+    visited — id вершин, которые считаются уже пройденными.
+    """
+    if sort_neighbors:
+        csr = csr.sorted_by_label()
+    n = csr.number_of_nodes()
+    directed = csr.directed
+    off = csr.offsets.tolist()
+    tgt = csr.targets.tolist()
+    eids = csr.edge_ids.tolist()
+    cursor = off[:-1]
+    # 0 — не открыта, 1 — в стеке (серая), 2 — закрыта (чёрная)
+    state = bytearray(n)
+    disc = [-1] * n
+    parent_edge = [-1] * n
+    if visited is not None:
+        for v in visited:
+            state[v] = 2
+    if sources is None:
+        sources = range(n)
+    stack = []
+    time = 0
+    for s in sources:
+        if state[s]:
+            continue
+        state[s] = 1
+        disc[s] = time
+        yield ("pre", s, time)
+        time += 1
+        stack.append(s)
+        while stack:
+            u = stack[-1]
+            c = cursor[u]
+            if c < off[u + 1]:
+                cursor[u] = c + 1
+                v = tgt[c]
+                sv = state[v]
+                if sv == 0:
+                    yield ("tree", u, v)
+                    state[v] = 1
+                    parent_edge[v] = eids[c]
+                    disc[v] = time
+                    yield ("pre", v, time)
+                    time += 1
+                    stack.append(v)
+                elif not directed:
+                    # ребро к родителю — то же дерево; к закрытой вершине — обратная
+                    # сторона уже выданного back-ребра
+                    if sv == 1 and eids[c] != parent_edge[u]:
+                        yield ("back", u, v)
+                elif sv == 1:
+                    yield ("back", u, v)
+                elif disc[u] < disc[v]:
+                    yield ("forward", u, v)
+                else:
+                    yield ("cross", u, v)
+            else:
+                stack.pop()
+                state[u] = 2
+                yield ("post", u, time)
+                time += 1
 
-def dfs(graph, start, visited=None):
-    if visited is None:
-        visited = []
-    visited.append(start)
-    for neighbor in sorted(graph[start]):
-        if neighbor not in visited:
-            dfs(graph, neighbor, visited)
-    return visited
+def dfs_adjacency(adj, start, visited=None):
+    """
+    Порядок открытия вершин при DFS от start по словарю соседей (вершина -> соседи):
+    явный стек с курсором (итератором) по соседям каждой открытой вершины, как в dfs_events,
+    — порядок тот же, что у рекурсивного обхода, глубина не ограничена, а в стеке не больше
+    одной записи на вершину. visited — множество уже пройденных вершин (start открывается
+    в любом случае); открытые вершины в него добавляются.
+    """
+    seen = set() if visited is None else visited
+    seen.add(start)
+    order = [start]
+    stack = [iter(adj[start])]
+    # итераторы-курсоры отслеживаются сборщиком мусора: их тысячи живых запускали бы полные
+    # сборки, каждая из которых обходит все словари большого графа. Циклов курсоры не
+    # создают, поэтому на время обхода сборщик выключается
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while stack:
+            for u in stack[-1]:
+                if u not in seen:
+                    seen.add(u)
+                    order.append(u)
+                    stack.append(iter(adj[u]))
+                    break
+            else:
+                stack.pop()
+    finally:
+        if enabled:
+            gc.enable()
+    return order
+
+def dfs_preorder(graph, start, sort_neighbors=True):
+    """
+    Порядок открытия вершин (метки) при DFS от start. Граф networkx без сортировки соседей
+    обходится прямо по его словарям соседей (dfs_adjacency), без построения CSR.
+    """
+    adj = raw_adjacency(graph)
+    if adj is not None and not sort_neighbors:
+        return dfs_adjacency(adj, start)
+    csr = as_csr(graph)
+    labels = csr.labels
+    return [labels[a] for kind, a, _ in dfs_events(csr, [csr.index[start]], sort_neighbors)
+            if kind == "pre"]
+
+def has_cycle(graph):
+    """Есть ли в графе цикл (DFS нашёл обратное ребро)."""
+    csr = as_csr(graph)
+    return any(kind == "back" for kind, _, _ in dfs_events(csr, sort_neighbors=False))
+
+def topological_sort(graph):
+    """Топологический порядок орграфа — вершины по убыванию времени закрытия."""
+    csr = as_csr(graph)
+    if not csr.directed:
+        raise ValueError("Топологическая сортировка определена только для орграфа")
+    post = []
+    for kind, a, b in dfs_events(csr, sort_neighbors=False):
+        if kind == "back":
+            raise ValueError(f"Граф содержит цикл (ребро {csr.labels[a]} -> {csr.labels[b]})")
+        if kind == "post":
+            post.append(a)
+    return [csr.labels[v] for v in reversed(post)]
+
+def dfs(graph, start):
+    # соседи перебираются по возрастанию меток — как в рекурсивном варианте
+    return dfs_preorder(graph, start, sort_neighbors=True)
 
 def main():
     # Хардкод графа (тот же, что в lab2)
@@ -24,5 +153,12 @@ def main():
     print("Lab3 — DFS order from", start, ":")
     print(" -> ".join(map(str, order)))
 
+    csr = as_csr(G)
+    labels = csr.labels
+    print("Lab3 — классы рёбер:")
+    for kind, u, v in dfs_events(csr, [csr.index[start]]):
+        if kind not in ("pre", "post"):
+            print(f"  {labels[u]}-{labels[v]}: {kind}")
+
 if __name__ == "__main__":
     main()
@@ -1,37 +1,184 @@
 # lab4_metrics.py
 import networkx as nx
+import numpy as np
+from graph_csr import as_csr
+from lab2_bfs import bfs_profile, bfs_profiles
+from shared_graph import parallel_bfs_profiles
 
-def graph_metrics(G):
+def connected_components_ids(csr):
+    """
+    Компоненты связности графа: список массивов id, упорядоченный по наименьшей вершине
+    компоненты (как nx.connected_components). Для орграфа — слабые компоненты
+    (как nx.weakly_connected_components): направление рёбер не учитывается.
+    """
+    if csr.directed:
+        csr = csr.simple_undirected()
+    n = csr.number_of_nodes()
+    seen = np.zeros(n, dtype=bool)
+    visited = np.zeros(n, dtype=bool)
+    isolated = np.diff(csr.offsets) == 0
+    comps = []
+    for v in range(n):
+        if seen[v]:
+            continue
+        if isolated[v]:
+            comp = np.array([v], dtype=np.int64)
+        else:
+            _, _, comp, _ = bfs_profile(csr, v, visited)
+        seen[comp] = True
+        comps.append(comp)
+    return comps
+
+def _summarize(labels, comp, ecc, dist_sum):
+    # вершины компоненты — в порядке графа (как в networkx)
+    by_id = np.argsort(comp)
+    comp, ecc = comp[by_id], ecc[by_id]
+    n = len(comp)
+    radius = int(ecc.min())
+    ids = comp.tolist()
+    return {
+        "nodes": [labels[v] for v in ids],
+        "eccentricity": dict(zip((labels[v] for v in ids), ecc.tolist())),
+        "radius": radius,
+        "diameter": int(ecc.max()),
+        "center": [labels[v] for v in comp[ecc == radius].tolist()],
+        "avg_shortest_path": dist_sum / (n * (n - 1)) if n > 1 else 0.0,
+    }
+
+def component_metrics(graph, workers=1, components=None):
+    """
+    Метрики каждой компоненты связности за один проход BFS из каждой вершины:
+    эксцентриситеты, радиус, диаметр, центр и средняя длина кратчайшего пути.
+    Память — O(V): от каждого BFS остаются только эксцентриситет и сумма расстояний.
+    workers > 1 — источники всех компонент делятся между процессами (shared_graph),
+    частичные результаты затем собираются по компонентам.
+    components — уже найденные компоненты (connected_components_ids), чтобы не искать их снова.
+    Возвращает список словарей (nodes, eccentricity, radius, diameter, center,
+    avg_shortest_path) в порядке компонент.
+    """
+    csr = as_csr(graph)
+    comps = connected_components_ids(csr) if components is None else components
+    if workers > 1:
+        sources = np.concatenate(comps) if comps else np.zeros(0, dtype=np.int64)
+        ecc_all, sums_all = parallel_bfs_profiles(csr, sources, workers)
+        result = []
+        start = 0
+        for comp in comps:
+            end = start + len(comp)
+            result.append(_summarize(csr.labels, comp, ecc_all[start:end], int(sums_all[start:end].sum())))
+            start = end
+        return result
+    visited = np.zeros(csr.number_of_nodes(), dtype=bool)
+    result = []
+    for comp in comps:
+        # один BFS на источник: эксцентриситет и сумма расстояний, без матрицы V x V
+        ecc, dist_sum = bfs_profiles(csr, comp, visited)
+        result.append(_summarize(csr.labels, comp, ecc, dist_sum))
+    return result
+
+def _bounding_component(csr, comp, max_bfs, local, visited):
+    """
+    BoundingDiameters (Takes & Kosters, 2011) для одной компоненты.
+    Для каждой вершины держим границы эксцентриситета lo <= ecc <= hi; BFS из v с ecc(v) = e
+    даёт всем w: lo(w) >= max(d(v, w), e - d(v, w)), hi(w) <= e + d(v, w).
+    Вершина больше не нужна, когда её ecc известен точно или она не может ни поднять
+    диаметр (hi <= нижней границы диаметра), ни попасть в центр (lo > верхней границы радиуса).
+    Источники BFS чередуются: наибольшая hi, затем наименьшая lo (при равенстве — большая степень).
+    """
+    n = len(comp)
+    local[comp] = np.arange(n)
+    deg = csr.degree_array()[comp]
+    lo = np.zeros(n, dtype=np.int64)
+    hi = np.full(n, max(n - 1, 0), dtype=np.int64)
+    runs = 0
+    pick_high = True
+    while True:
+        active = np.flatnonzero((lo != hi) & ((hi > lo.max()) | (lo <= hi.min())))
+        exact = not active.size
+        if exact or (max_bfs is not None and runs >= max_bfs):
+            break
+        if pick_high:
+            best = np.lexsort((-deg[active], -hi[active]))[0]
+        else:
+            best = np.lexsort((-deg[active], lo[active]))[0]
+        pick_high = not pick_high
+        v = active[best]
+        e, _, order, sizes = bfs_profile(csr, comp[v], visited)
+        runs += 1
+        d = np.empty(n, dtype=np.int64)
+        d[local[order]] = np.repeat(np.arange(len(sizes)), sizes)
+        np.maximum(lo, np.maximum(d, e - d), out=lo)
+        np.minimum(hi, e + d, out=hi)
+        lo[v] = hi[v] = e
+    radius = int(hi.min())
+    # точный центр — вершины с известным ecc = radius; иначе — все, кто ещё может в него войти
+    center = comp[(hi == radius) & (lo == hi)] if exact else comp[lo <= radius]
+    return {
+        "diameter": int(lo.max()),
+        "radius": radius,
+        "center": center,
+        "exact": exact,
+        "diameter_bounds": (int(lo.max()), int(hi.max())),
+        "radius_bounds": (int(lo.min()), radius),
+        "bfs_runs": runs,
+    }
+
+def bounding_metrics(graph, max_bfs=None):
+    """
+    Радиус, диаметр и центр каждой компоненты по границам эксцентриситетов — обычно
+    хватает нескольких BFS вместо BFS из каждой вершины.
+    max_bfs ограничивает число BFS на компоненту (быстрый приближённый режим): тогда
+    exact=False, diameter/radius — лучшие найденные значения, а diameter_bounds и
+    radius_bounds — гарантированные границы; center — вершины-кандидаты.
+    bfs_runs — сколько BFS реально понадобилось.
+    """
+    csr = as_csr(graph)
+    n = csr.number_of_nodes()
+    local = np.zeros(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=bool)
+    labels = csr.labels
+    result = []
+    for comp in connected_components_ids(csr):
+        comp = np.sort(comp)
+        m = _bounding_component(csr, comp, max_bfs, local, visited)
+        m["nodes"] = [labels[v] for v in comp.tolist()]
+        m["center"] = [labels[v] for v in m["center"].tolist()]
+        result.append(m)
+    return result
+
+def graph_metrics(G, bounding=False):
     if G.number_of_nodes() == 0:
         print("Пустой граф.")
         return
-    if nx.is_connected(G):
-        ecc = nx.eccentricity(G)
-        radius = nx.radius(G)
-        diameter = nx.diameter(G)
-        centers = list(nx.center(G))
+    if bounding:
+        # только радиус/диаметр/центр — по границам эксцентриситетов, без BFS из каждой вершины
+        print("Lab4 — Метрики по границам эксцентриситетов:")
+        for i, m in enumerate(bounding_metrics(G), start=1):
+            print(f" Компонента {i}: n={len(m['nodes'])} radius={m['radius']}, diameter={m['diameter']}, "
+                  f"centers={m['center']}, BFS={m['bfs_runs']}")
+        return
+    comps = component_metrics(G)
+    if len(comps) == 1:
+        m = comps[0]
+        ecc = m["eccentricity"]
         print(f"Lab4 — Метрики (граф связный):")
-        print(f" Радиус = {radius}")
-        print(f" Диаметр = {diameter}")
-        print(f" Центр(ы) = {centers}")
+        print(f" Радиус = {m['radius']}")
+        print(f" Диаметр = {m['diameter']}")
+        print(f" Центр(ы) = {m['center']}")
         print(" Эксцентриситеты вершин:")
         for v in sorted(ecc.keys(), key=lambda x: (int(x[1:]) if isinstance(x, str) and x.startswith('v') else x)):
             print(f"  {v}: {ecc[v]}")
     else:
         print("Lab4 — Граф несвязный. Метрики по компонентам:")
-        for i, comp in enumerate(nx.connected_components(G), start=1):
-            sub = G.subgraph(comp)
-            ecc = nx.eccentricity(sub)
-            radius = nx.radius(sub)
-            diameter = nx.diameter(sub)
-            centers = list(nx.center(sub))
-            print(f" Компонента {i}: n={sub.number_of_nodes()} radius={radius}, diameter={diameter}, centers={centers}")
+        for i, m in enumerate(comps, start=1):
+            print(f" Компонента {i}: n={len(m['nodes'])} radius={m['radius']}, diameter={m['diameter']}, centers={m['center']}")
 
 def main():
     # Хардкод: цикл из 6 вершин (подходит для метрик — связный)
     G = nx.cycle_graph(6)  # вершины 0..5
     # при желании можно перекодировать в формат v1..v6, но networkx удобно с целыми
     graph_metrics(G)
+    graph_metrics(G, bounding=True)
 
 if __name__ == "__main__":
     main()
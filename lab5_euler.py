@@ -1,19 +1,98 @@
 # lab5_euler.py
-import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+from graph_csr import as_csr
+from graph_render import draw_graph
 
-def show_graph_with_path(G, path_edges=None, title="Graph"):
-    pos = nx.spring_layout(G)
-    plt.figure(figsize=(6,5))
-    nx.draw_networkx_nodes(G, pos, node_size=600)
-    nx.draw_networkx_labels(G, pos)
-    base_edges = [e for e in G.edges() if (path_edges is None) or (e not in path_edges and (e[1], e[0]) not in path_edges)]
-    nx.draw_networkx_edges(G, pos, edgelist=base_edges)
-    if path_edges:
-        nx.draw_networkx_edges(G, pos, edgelist=path_edges, width=3, edge_color='r')
-    plt.title(title)
-    plt.axis('off')
-    plt.show()
+def show_graph_with_path(G, path_edges=None, title="Graph", out=None):
+    # рисунок — graph_render: без GUI пишется в out, большой граф сводится к уровню детализации
+    draw_graph(G, highlight_edges=path_edges, title=title, out=out)
+
+def _trail_start(csr, start_id):
+    """
+    Проверка степеней за один проход по массивам: ("circuit" | "trail", стартовая вершина)
+    или (None, None). Для неориентированного графа нужны 0 или 2 нечётные вершины,
+    для орграфа — баланс входа и выхода (или ровно по одной вершине с перекосом +1 / -1).
+    """
+    n = csr.number_of_nodes()
+    if csr.directed:
+        out_deg = np.diff(csr.offsets)
+        balance = out_deg - np.bincount(csr.targets, minlength=n)
+        plus = np.flatnonzero(balance == 1)
+        minus = np.flatnonzero(balance == -1)
+        if not balance.any():
+            kind, allowed = "circuit", np.flatnonzero(out_deg > 0)
+        elif len(plus) == 1 and len(minus) == 1 and np.count_nonzero(balance) == 2:
+            kind, allowed = "trail", plus
+        else:
+            return None, None
+    else:
+        deg = csr.degree_array()
+        odd = np.flatnonzero(deg % 2 == 1)
+        if len(odd) == 0:
+            kind, allowed = "circuit", np.flatnonzero(deg > 0)
+        elif len(odd) == 2:
+            kind, allowed = "trail", odd
+        else:
+            return None, None
+    if start_id is not None and start_id in allowed:
+        return kind, start_id
+    return kind, int(allowed[0])
+
+def eulerian_path(graph, start=None):
+    """
+    Эйлеров цикл или путь алгоритмом Хирхольцера на массивах CSR: битовая карта
+    использованных рёбер (по edge_ids) и курсор по списку соседей у каждой вершины.
+    Работает с мультиграфами (кратные рёбра и петли) и орграфами.
+    Связность отдельно не проверяется: если обход из стартовой вершины не прошёл
+    все рёбра, граф не эйлеров.
+    start — желаемая стартовая вершина (используется, если она допустима).
+    Возвращает (kind, edges): kind — "circuit", "trail" или None, edges — последовательность
+    рёбер (u, v). Граф без рёбер считается эйлеровым с пустым циклом.
+    """
+    csr = as_csr(graph)
+    if csr.number_of_nodes() == 0:
+        return None, []
+    m = csr.num_edges
+    if m == 0:
+        return "circuit", []
+    kind, s = _trail_start(csr, csr.index.get(start) if start is not None else None)
+    if kind is None:
+        return None, []
+
+    off = csr.offsets.tolist()
+    tgt = csr.targets.tolist()
+    eid = csr.edge_ids.tolist()
+    cursor = off[:-1]
+    used = bytearray(m)
+    stack = [s]
+    push = stack.append
+    pop = stack.pop
+    # вершины в порядке снятия со стека — это маршрут задом наперёд
+    order = []
+    record = order.append
+    while stack:
+        u = stack[-1]
+        # идём по свободным рёбрам, пока не упрёмся
+        while True:
+            p = cursor[u]
+            end = off[u + 1]
+            while p < end and used[eid[p]]:
+                p += 1
+            if p == end:
+                cursor[u] = p
+                break
+            cursor[u] = p + 1
+            used[eid[p]] = 1
+            u = tgt[p]
+            push(u)
+        record(pop())
+    if len(order) - 1 < m:
+        # часть рёбер недостижима из старта — рёбра лежат в разных компонентах
+        return None, []
+    labels = csr.labels
+    walk = [labels[v] for v in reversed(order)]
+    return kind, list(zip(walk, walk[1:]))
 
 def main():
     # Хардкод: простой эйлеров граф — цикл 4 вершин
@@ -22,22 +101,22 @@ def main():
     G.add_edges_from(edges)
 
     print("Lab5 — Euler check:")
-    if nx.is_eulerian(G):
+    kind, path_edges = eulerian_path(G)
+    if kind == "circuit":
         print(" Граф эйлеров — существует эйлеров цикл.")
-        circuit = list(nx.eulerian_circuit(G))
         print(" Эйлеров цикл (последовательность ребер):")
-        print("  " + " -> ".join([f"{u}-{v}" for u,v in circuit]))
-        # выделим цикл (в undirected представим как упорядоченные пары)
-        path_edges = [(u,v) for u,v in circuit]
+        print("  " + " -> ".join([f"{u}-{v}" for u,v in path_edges]))
         show_graph_with_path(G, path_edges, title="Eulerian circuit (red)")
+    elif kind == "trail":
+        odd = [v for v,d in G.degree() if d%2==1]
+        print(" Граф имеет эйлеров путь (но не цикл). Нечетные вершины:", odd)
+        print(" Эйлеров путь (последовательность ребер):")
+        print("  " + " -> ".join([f"{u}-{v}" for u,v in path_edges]))
+        show_graph_with_path(G, path_edges, title="Eulerian trail (red)")
     else:
         odd = [v for v,d in G.degree() if d%2==1]
-        if len(odd) == 2:
-            print(" Граф имеет эйлеров путь (но не цикл). Нечетные вершины:", odd)
-            show_graph_with_path(G, None, title="Eulerian trail (no circuit)")
-        else:
-            print(" Не Эйлеров. Нечетные вершины:", odd)
-            show_graph_with_path(G, None, title="Not Eulerian")
+        print(" Не Эйлеров. Нечетные вершины:", odd)
+        show_graph_with_path(G, None, title="Not Eulerian")
 
 if __name__ == "__main__":
     main()
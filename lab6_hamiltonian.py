@@ -1,38 +1,369 @@
 # lab6_hamiltonian.py
-import matplotlib.pyplot as plt
 import networkx as nx
-import itertools
+import numpy as np
+import time
+from graph_csr import as_csr
+from lab2_bfs import bfs_levels
+from lab3_dfs import dfs_events
+from graph_render import draw_graph
 
-def find_hamiltonian_cycle(G, time_limit_nodes=16):
-    n = G.number_of_nodes()
+# выше этого числа вершин таблица 2^n динамики слишком велика — работает перебор с возвратом;
+# до него динамика — запасной вариант, если короткий перебор не дал ответа (см. hamiltonian)
+DP_MAX_NODES = 25
+# бюджет перебора по умолчанию, секунды
+SEARCH_TIME_LIMIT = 10.0
+
+def _lowest_bit(x):
+    x = int(x)
+    return (x & -x).bit_length() - 1
+
+def hamiltonian_dp(graph, cycle=True, start=None):
+    """
+    Гамильтонов цикл (cycle=True) или путь динамикой по подмножествам (Held–Karp), O(2^n * n^2).
+    dp[mask] — битовая маска вершин, в которых может заканчиваться путь, проходящий ровно
+    по вершинам mask (для цикла путь начинается в start — цикл можно начинать с любой вершины).
+    Слои масок обрабатываются векторно (NumPy): для каждой вершины w сразу все маски фронтира,
+    из конца которых есть ребро в w. Хранятся только достижимые маски фронтира.
+    Возвращает список вершин (цикл замыкается повтором start) или None.
+    """
+    csr = as_csr(graph)
+    n = csr.number_of_nodes()
     if n == 0:
         return None
-    if n > time_limit_nodes:
-        print(f"Warning: n={n} > {time_limit_nodes}. Поиск может занять очень много времени.")
-    nodes = list(G.nodes())
-    # пробуем все перестановки (брутфорс). Для детерминированности сортируем узлы
-    for perm in itertools.permutations(sorted(nodes)):
-        ok = True
-        for i in range(len(perm)-1):
-            if not G.has_edge(perm[i], perm[i+1]):
-                ok = False
-                break
-        if ok and G.has_edge(perm[-1], perm[0]):
-            return list(perm) + [perm[0]]  # возвращаем цикл с возвращением в начальную
+    if n > 64:
+        raise ValueError(f"Динамика по подмножествам не применима при n={n} > 64")
+    labels = csr.labels
+    s = csr.index[start] if start is not None else 0
+    # перенумеровываем так, чтобы start получил бит 0
+    order = [s] + [v for v in range(n) if v != s]
+    pos = {v: k for k, v in enumerate(order)}
+    # adj[w] — маска вершин, из которых есть ребро в w
+    adj_int = [0] * n
+    for u, v, _ in csr.edge_list():
+        if u != v:
+            adj_int[pos[v]] |= 1 << pos[u]
+            if not csr.directed:
+                adj_int[pos[u]] |= 1 << pos[v]
+    if n == 1:
+        if not cycle:
+            return [labels[s]]
+        return [labels[s], labels[s]] if csr.has_edge(labels[s], labels[s]) else None
+
+    dtype = np.uint32 if n <= 32 else np.uint64
+    adj = np.array(adj_int, dtype=dtype)
+    dp = np.zeros(1 << n, dtype=dtype)
+    if cycle:
+        frontier = np.array([1], dtype=np.int64)
+        dp[1] = 1
+    else:
+        frontier = np.int64(1) << np.arange(n, dtype=np.int64)
+        dp[frontier] = frontier.astype(dtype)
+    # отметки масок следующего слоя (вместо сортировки при слиянии)
+    touched = np.zeros(1 << n, dtype=bool)
+    for _ in range(n - 1):
+        ends = dp[frontier]
+        for w in range(n):
+            bw = 1 << w
+            sel = frontier[((frontier & bw) == 0) & ((ends & adj[w]) != 0)]
+            if sel.size:
+                t = sel | bw
+                dp[t] |= dtype(bw)
+                touched[t] = True
+        frontier = np.flatnonzero(touched)
+        if not frontier.size:
+            return None
+        touched[frontier] = False
+
+    full = (1 << n) - 1
+    last = int(dp[full])
+    if cycle:
+        last &= int(adj[0])
+    if not last:
+        return None
+    # восстановление: идём от конца назад, каждый раз выбирая допустимого предшественника
+    v = _lowest_bit(last)
+    mask = full
+    path = [v]
+    while mask != (1 << v):
+        mask ^= 1 << v
+        v = _lowest_bit(int(dp[mask]) & int(adj[v]))
+        path.append(v)
+    path.reverse()
+    result = [labels[order[k]] for k in path]
+    if cycle:
+        result.append(result[0])
+    return result
+
+def _neighbor_masks(csr):
+    # различные соседи вершины (без петель и кратных рёбер) битовой маской
+    nbr = [0] * csr.number_of_nodes()
+    for u, v, _ in csr.edge_list():
+        if u != v:
+            nbr[u] |= 1 << v
+            nbr[v] |= 1 << u
+    return nbr
+
+def _reachable(seed, allowed, nbr):
+    # вершины из allowed, достижимые из маски seed (сами seed входят)
+    reach = seed
+    frontier = seed
+    while frontier:
+        grown = 0
+        while frontier:
+            low = frontier & -frontier
+            frontier ^= low
+            grown |= nbr[low.bit_length() - 1]
+        frontier = grown & allowed & ~reach
+        reach |= frontier
+    return reach
+
+def _cut_pieces(csr):
+    """На сколько частей распадается связный граф при удалении каждой вершины (low-link по DFS)."""
+    n = csr.number_of_nodes()
+    disc = [0] * n
+    low = [0] * n
+    parent = [-1] * n
+    children = [0] * n
+    split = [0] * n
+    for kind, a, b in dfs_events(csr, [0], sort_neighbors=False):
+        if kind == "pre":
+            disc[a] = low[a] = b
+        elif kind == "tree":
+            parent[b] = a
+            children[a] += 1
+        elif kind == "back":
+            low[a] = min(low[a], disc[b])
+        elif kind == "post":
+            p = parent[a]
+            if p >= 0:
+                low[p] = min(low[p], low[a])
+                if low[a] >= disc[p]:
+                    split[p] += 1
+    return [children[v] if parent[v] < 0 else 1 + split[v] for v in range(n)]
+
+def _impossibility(csr, nbr, cycle):
+    """Дешёвые доказательства отсутствия гамильтонова цикла/пути; возвращает причину или None."""
+    n = len(nbr)
+    labels = csr.labels
+    full = (1 << n) - 1
+    if _reachable(1, full, nbr) != full:
+        return "граф несвязен"
+    deg = [m.bit_count() for m in nbr]
+    if cycle and n >= 3 and min(deg) < 2:
+        return f"вершина {labels[deg.index(min(deg))]} степени {min(deg)}"
+    if not cycle and sum(1 for d in deg if d == 1) > 2:
+        return "больше двух вершин степени 1"
+    # двудольный граф: цикл чередует доли, поэтому они должны быть равны (для пути — отличаться на 1)
+    _, dist, _ = bfs_levels(csr, [0])
+    rows = csr.slot_rows()
+    side = dist % 2
+    loops = rows == csr.targets
+    if not (side[rows] == side[csr.targets])[~loops].any():
+        part = int((side == 0).sum())
+        if (cycle and n >= 3 and part != n - part) or (not cycle and abs(2 * part - n) > 1):
+            return f"двудольный граф с долями {part} и {n - part}"
+    # точка сочленения (а значит и мост) исключает цикл; путь проходит вершину не более
+    # чем через две стороны, поэтому разрезающая граф на 3+ части вершина исключает и путь
+    pieces = _cut_pieces(csr)
+    worst = max(range(n), key=pieces.__getitem__)
+    if cycle and n >= 3 and pieces[worst] >= 2:
+        return f"точка сочленения {labels[worst]}"
+    if not cycle and pieces[worst] >= 3:
+        return f"вершина {labels[worst]} разрезает граф на {pieces[worst]} части"
     return None
 
-def show_graph_with_cycle(G, cycle):
-    pos = nx.spring_layout(G)
-    plt.figure(figsize=(6,5))
-    nx.draw_networkx_nodes(G, pos, node_size=600)
-    nx.draw_networkx_labels(G, pos)
-    nx.draw_networkx_edges(G, pos, edgelist=G.edges())
+def _candidates(end, start, U, nbr, cycle):
+    """
+    Допустимые следующие вершины после end (U — ещё не посещённые) или None, если ветку
+    можно отсечь: остаток несвязен, у какой-то вершины не хватает свободных соседей,
+    либо два соседа end одновременно требуют прийти в них следующим ходом.
+    Порядок — по правилу Варнсдорфа (сначала вершины с наименьшим числом свободных соседей).
+    """
+    nexts = nbr[end] & U
+    if not nexts:
+        return None
+    if cycle and not nbr[start] & U:
+        return None
+    if _reachable(nexts, U, nbr) != U:
+        return None
+    avail = U | (1 << end) | ((1 << start) if cycle else 0)
+    forced = []
+    dead_ends = 0
+    rest = U
+    while rest:
+        low = rest & -rest
+        rest ^= low
+        w = low.bit_length() - 1
+        a = (nbr[w] & avail).bit_count()
+        if cycle:
+            if a < 2:
+                return None
+            # у вершины осталось ровно два ребра, и одно из них ведёт в end — идти надо в неё
+            if a == 2 and nexts & low and end != start:
+                forced.append(w)
+        elif a == 0:
+            return None
+        elif a == 1:
+            # такая вершина может быть только концом пути — а он один
+            dead_ends += 1
+            if dead_ends > 1 or (nexts & low and U != low):
+                return None
+    if len(forced) > 1:
+        return None
+    if forced:
+        return forced
+    cands = []
+    while nexts:
+        low = nexts & -nexts
+        nexts ^= low
+        cands.append(low.bit_length() - 1)
+    cands.sort(key=lambda w: (nbr[w] & U).bit_count())
+    return cands
+
+def hamiltonian_search(graph, cycle=True, max_steps=None, time_limit=None, stats=None):
+    """
+    Перебор с возвратом с отсечениями для неориентированных графов, на которые не помещается
+    динамика. До поиска — доказательства невозможности (несвязность, степени, доли двудольного
+    графа, точки сочленения и мосты), во время поиска — связность остатка, вынужденные ходы
+    через вершины степени 2 и порядок Варнсдорфа. Стек явный, глубина не ограничена.
+    max_steps (число попыток продлить путь) и time_limit (секунды) задают бюджет.
+    Возвращает (status, path): status — "found", "none" (доказано, что нет) или
+    "unknown" (бюджет исчерпан); path — список вершин (цикл замкнут повтором старта).
+    Если передан словарь stats, в него пишутся steps и reason (причина "none").
+    """
+    csr = as_csr(graph)
+    if csr.directed:
+        raise ValueError("hamiltonian_search работает с неориентированными графами; для орграфов — hamiltonian_dp")
+    info = stats if stats is not None else {}
+    info["steps"] = 0
+    info["reason"] = None
+    n = csr.number_of_nodes()
+    labels = csr.labels
+    if n == 0:
+        info["reason"] = "пустой граф"
+        return "none", None
+    if n == 1:
+        if not cycle:
+            return "found", [labels[0]]
+        if csr.has_edge(labels[0], labels[0]):
+            return "found", [labels[0], labels[0]]
+        info["reason"] = "нет петли"
+        return "none", None
+    nbr = _neighbor_masks(csr)
+    reason = _impossibility(csr, nbr, cycle)
+    if reason:
+        info["reason"] = reason
+        return "none", None
+    if n == 2:
+        # связный граф из двух вершин: путь — ребро, «цикл» — проход по нему туда и обратно
+        return "found", [labels[0], labels[1]] + ([labels[0]] if cycle else [])
+
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    full = (1 << n) - 1
+    deg = [m.bit_count() for m in nbr]
     if cycle:
-        cycle_edges = [(cycle[i], cycle[i+1]) for i in range(len(cycle)-1)]
-        nx.draw_networkx_edges(G, pos, edgelist=cycle_edges, width=3, edge_color='r')
-    plt.title("Hamiltonian cycle (red) if found")
-    plt.axis('off')
-    plt.show()
+        # цикл проходит через все вершины — достаточно одного старта
+        starts = [min(range(n), key=deg.__getitem__)]
+    else:
+        ends = [v for v in range(n) if deg[v] == 1]
+        # вершина степени 1 обязана быть концом пути, а путь можно развернуть
+        starts = ends[:1] if ends else sorted(range(n), key=deg.__getitem__)
+    steps = 0
+    for s in starts:
+        path = [s]
+        U = full ^ (1 << s)
+        cands = _candidates(s, s, U, nbr, cycle)
+        if cands is None:
+            continue
+        stack = [cands]
+        pos = [0]
+        while stack:
+            i = pos[-1]
+            if i == len(stack[-1]):
+                stack.pop()
+                pos.pop()
+                if stack:
+                    U |= 1 << path.pop()
+                continue
+            pos[-1] = i + 1
+            w = stack[-1][i]
+            steps += 1
+            if max_steps is not None and steps > max_steps or \
+                    deadline is not None and steps % 1024 == 0 and time.perf_counter() > deadline:
+                info["steps"] = steps
+                return "unknown", None
+            path.append(w)
+            U ^= 1 << w
+            if not U:
+                if not cycle or nbr[w] >> s & 1:
+                    info["steps"] = steps
+                    result = [labels[v] for v in path]
+                    if cycle:
+                        result.append(result[0])
+                    return "found", result
+                nxt = None
+            else:
+                nxt = _candidates(w, s, U, nbr, cycle)
+            if not nxt:
+                path.pop()
+                U |= 1 << w
+                continue
+            stack.append(nxt)
+            pos.append(0)
+    info["steps"] = steps
+    info["reason"] = "перебор завершён"
+    return "none", None
+
+def _probe_steps(n):
+    # бюджет короткого перебора — порядка нескольких процентов времени динамики O(2^n * n^2)
+    return max(256, 1 << max(n - 11, 0))
+
+def hamiltonian(graph, cycle=True, start=None, time_limit=SEARCH_TIME_LIMIT, dp_max_nodes=DP_MAX_NODES,
+                stats=None):
+    """
+    Гамильтонов цикл или путь с выбором метода. Неориентированный граф сначала проходит
+    перебор hamiltonian_search: до dp_max_nodes вершин — с коротким бюджетом шагов
+    (обычно ответ находится за десятки шагов, а динамика при n = 25 — секунды и сотни МБ),
+    и только при "unknown" — точная динамика hamiltonian_dp; больше — с бюджетом time_limit.
+    Ориентированный граф — только динамика (до dp_max_nodes вершин).
+    Цикл начинается со start (если задан). Возвращает (status, path), как hamiltonian_search;
+    stats — как у hamiltonian_search, плюс method ("search" или "dp").
+    """
+    csr = as_csr(graph)
+    n = csr.number_of_nodes()
+    info = stats if stats is not None else {}
+    small = n <= dp_max_nodes
+    if csr.directed and small:
+        status = None
+    else:
+        status, path = hamiltonian_search(csr, cycle=cycle, max_steps=_probe_steps(n) if small else None,
+                                          time_limit=None if small else time_limit, stats=info)
+        info["method"] = "search"
+    if small and status in (None, "unknown"):
+        path = hamiltonian_dp(csr, cycle=cycle, start=start if cycle else None)
+        status = "found" if path else "none"
+        info["method"] = "dp"
+    elif cycle and path and start is not None and path[0] != start:
+        # цикл из перебора начинается с вершины наименьшей степени — поворачиваем к start
+        ring = path[:-1]
+        k = ring.index(start)
+        path = ring[k:] + ring[:k] + [start]
+    return status, path
+
+def find_hamiltonian_cycle(G, dp_max_nodes=DP_MAX_NODES, time_limit=SEARCH_TIME_LIMIT):
+    n = G.number_of_nodes()
+    if n == 0:
+        return None
+    # для детерминированности цикл начинаем с наименьшей вершины
+    status, cycle = hamiltonian(G, cycle=True, start=min(G.nodes()), time_limit=time_limit,
+                                dp_max_nodes=dp_max_nodes)
+    if status == "unknown":
+        print(f"Warning: n={n}, поиск прерван через {time_limit} с — ответ неизвестен.")
+    return cycle
+
+def show_graph_with_cycle(G, cycle, out=None):
+    cycle_edges = [(cycle[i], cycle[i+1]) for i in range(len(cycle)-1)] if cycle else None
+    draw_graph(G, highlight_edges=cycle_edges, title="Hamiltonian cycle (red) if found", out=out)
 
 def main():
     # Хардкод: цикл из 5 вершин (гарантированно гамильтонов)
@@ -1,26 +1,252 @@
 # lab7_greedy_shortest_path.py
-import matplotlib.pyplot as plt
 import networkx as nx
-import heapq
-
-def dijkstra(G, source):
-    dist = {v: float('inf') for v in G.nodes()}
-    prev = {v: None for v in G.nodes()}
-    dist[source] = 0.0
-    pq = [(0.0, source)]
-    while pq:
-        d, u = heapq.heappop(pq)
-        if d > dist[u]:
-            continue
-        for v, data in G[u].items():
-            w = data.get('weight', 1.0)
-            nd = d + w
-            if nd < dist[v]:
-                dist[v] = nd
-                prev[v] = u
-                heapq.heappush(pq, (nd, v))
+import numpy as np
+from graph_csr import as_csr
+from graph_render import draw_graph
+from indexed_heap import IndexedDaryHeap
+
+INF = float('inf')
+
+class DijkstraEngine:
+    """
+    Дейкстра на CSR-графе для повторяющихся запросов (веса неотрицательные).
+    Массивы dist/prev и индексная d-арная куча (indexed_heap) выделяются один раз;
+    перед запросом сбрасываются только вершины, затронутые предыдущим, так что запрос
+    «точка — точка» с ранним выходом не платит O(V).
+    Все вершины — id CSR; settled — число вершин, извлечённых из кучи последним запросом.
+    """
+
+    def __init__(self, graph, arity=4):
+        self.csr = as_csr(graph)
+        n = self.csr.number_of_nodes()
+        self._fwd = (self.csr.offsets.tolist(), self.csr.targets, self.csr.weights)
+        rev = self.csr.reverse()
+        self._bwd = self._fwd if rev is self.csr else (rev.offsets.tolist(), rev.targets, rev.weights)
+        self.dist = [INF] * n
+        self.prev = [-1] * n
+        self._dist_b = [INF] * n
+        self._next_b = [-1] * n
+        self._heap = IndexedDaryHeap(n, arity)
+        self._heap_b = IndexedDaryHeap(n, arity)
+        self._touched = []
+        self._touched_b = []
+        self.settled = 0
+
+    def _reset(self):
+        for v in self._touched:
+            self.dist[v] = INF
+            self.prev[v] = -1
+        for v in self._touched_b:
+            self._dist_b[v] = INF
+            self._next_b[v] = -1
+        self._touched = []
+        self._touched_b = []
+        self._heap.clear()
+        self._heap_b.clear()
+        self.settled = 0
+
+    def run(self, source, target=None):
+        """
+        Дерево кратчайших путей из source; с target — остановка, как только target извлечён
+        из кучи. Возвращает dist[target] (или None без target); расстояния — в self.dist.
+        """
+        self._reset()
+        off, targets, weights = self._fwd
+        dist, prev, heap, touched = self.dist, self.prev, self._heap, self._touched
+        dist[source] = 0.0
+        touched.append(source)
+        heap.push(source, 0.0)
+        settled = 0
+        while heap:
+            u, d = heap.pop()
+            settled += 1
+            if u == target:
+                break
+            lo, hi = off[u], off[u + 1]
+            for v, w in zip(targets[lo:hi].tolist(), weights[lo:hi].tolist()):
+                nd = d + w
+                if nd < dist[v]:
+                    if dist[v] == INF:
+                        touched.append(v)
+                    dist[v] = nd
+                    prev[v] = u
+                    heap.push(v, nd)
+        self.settled = settled
+        return dist[target] if target is not None else None
+
+    def run_many(self, source, targets):
+        """
+        Дейкстра от source до множества targets: поиск останавливается, как только извлечены
+        все цели (остальные вершины могут остаться с неточными расстояниями).
+        Расстояния до целей — в self.dist, пути — path_to.
+        """
+        self._reset()
+        off, targets_arr, weights = self._fwd
+        dist, prev, heap, touched = self.dist, self.prev, self._heap, self._touched
+        goals = set(targets)
+        left = len(goals)
+        dist[source] = 0.0
+        touched.append(source)
+        heap.push(source, 0.0)
+        settled = 0
+        while heap and left:
+            u, d = heap.pop()
+            settled += 1
+            if u in goals:
+                left -= 1
+                if not left:
+                    break
+            lo, hi = off[u], off[u + 1]
+            for v, w in zip(targets_arr[lo:hi].tolist(), weights[lo:hi].tolist()):
+                nd = d + w
+                if nd < dist[v]:
+                    if dist[v] == INF:
+                        touched.append(v)
+                    dist[v] = nd
+                    prev[v] = u
+                    heap.push(v, nd)
+        self.settled = settled
+
+    def astar(self, source, target, potential):
+        """
+        A*: ключ вершины в куче — dist + potential(v), где potential — нижняя оценка
+        расстояния до target. potential получает массив id соседей и возвращает массив оценок
+        (inf — из вершины target недостижим, такие вершины в кучу не попадают).
+        При согласованной оценке (как у ALT или евклидовой) результат совпадает с Дейкстрой.
+        Возвращает dist[target]; путь — path_to(source, target).
+        """
+        self._reset()
+        off, targets, weights = self._fwd
+        dist, prev, heap, touched = self.dist, self.prev, self._heap, self._touched
+        dist[source] = 0.0
+        touched.append(source)
+        heap.push(source, float(potential(np.array([source]))[0]))
+        settled = 0
+        while heap:
+            u, _ = heap.pop()
+            settled += 1
+            if u == target:
+                break
+            lo, hi = off[u], off[u + 1]
+            if lo == hi:
+                continue
+            nbrs = targets[lo:hi]
+            d = dist[u]
+            # оценки для всех соседей — одной операцией над массивом
+            for v, w, h in zip(nbrs.tolist(), weights[lo:hi].tolist(), potential(nbrs).tolist()):
+                nd = d + w
+                if nd < dist[v] and h != INF:
+                    if dist[v] == INF:
+                        touched.append(v)
+                    dist[v] = nd
+                    prev[v] = u
+                    heap.push(v, nd + h)
+        self.settled = settled
+        return dist[target]
+
+    def path_to(self, source, target):
+        """Путь (id) из source в target по prev последнего run или None."""
+        if self.dist[target] == INF:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(self.prev[path[-1]])
+        path.reverse()
+        return path
+
+    def query(self, source, target):
+        """Расстояние и путь «точка — точка» с ранним выходом: (dist, path) или (inf, None)."""
+        d = self.run(source, target)
+        return d, self.path_to(source, target)
+
+    def bidirectional(self, source, target):
+        """
+        Двунаправленный Дейкстра: поиски от source по рёбрам и от target по обратным рёбрам
+        ведутся попеременно (шаг делает тот, у кого меньше ключ в куче) и останавливаются,
+        когда сумма минимальных ключей двух куч не меньше лучшего найденного пути mu.
+        Возвращает (dist, path) или (inf, None).
+        """
+        self._reset()
+        if source == target:
+            self.dist[source] = 0.0
+            self._touched.append(source)
+            return 0.0, [source]
+        sides = (
+            (self._fwd, self.dist, self.prev, self._heap, self._touched, self._dist_b),
+            (self._bwd, self._dist_b, self._next_b, self._heap_b, self._touched_b, self.dist),
+        )
+        for (_, dist, _, heap, touched, _), start in zip(sides, (source, target)):
+            dist[start] = 0.0
+            touched.append(start)
+            heap.push(start, 0.0)
+        mu = INF
+        meet = -1
+        settled = 0
+        heap_f, heap_b = self._heap, self._heap_b
+        while heap_f and heap_b:
+            if heap_f.peek_key() + heap_b.peek_key() >= mu:
+                break
+            side = 0 if heap_f.peek_key() <= heap_b.peek_key() else 1
+            (off, targets, weights), dist, prev, heap, touched, other = sides[side]
+            u, d = heap.pop()
+            settled += 1
+            lo, hi = off[u], off[u + 1]
+            for v, w in zip(targets[lo:hi].tolist(), weights[lo:hi].tolist()):
+                nd = d + w
+                if nd < dist[v]:
+                    if dist[v] == INF:
+                        touched.append(v)
+                    dist[v] = nd
+                    prev[v] = u
+                    heap.push(v, nd)
+                if other[v] != INF and nd + other[v] < mu:
+                    mu = nd + other[v]
+                    meet = v
+        self.settled = settled
+        if meet < 0:
+            return INF, None
+        # до точки встречи — по prev прямого поиска, дальше — по next обратного
+        path = [meet]
+        while path[-1] != source:
+            path.append(self.prev[path[-1]])
+        path.reverse()
+        while path[-1] != target:
+            path.append(self._next_b[path[-1]])
+        return mu, path
+
+def dijkstra(G, source, target=None):
+    """
+    Кратчайшие расстояния от source (словари dist/prev по меткам, как раньше).
+    С target поиск останавливается, как только target извлечён из кучи.
+    """
+    engine = DijkstraEngine(G)
+    csr = engine.csr
+    labels = csr.labels
+    engine.run(csr.index[source], csr.index[target] if target is not None else None)
+    dist = dict(zip(labels, engine.dist))
+    prev = {v: (labels[p] if p >= 0 else None) for v, p in zip(labels, engine.prev)}
     return dist, prev
 
+def shortest_path(G, source, target, method="bidirectional", engine=None):
+    """
+    Запрос «точка — точка»: (distance, path) по меткам или (inf, None), если пути нет.
+    method — "bidirectional" или "dijkstra" (однонаправленный с ранним выходом).
+    engine — заранее построенный DijkstraEngine (для серии запросов по одному графу).
+    """
+    if engine is None:
+        engine = DijkstraEngine(G)
+    csr = engine.csr
+    s, t = csr.index[source], csr.index[target]
+    if method == "bidirectional":
+        d, path = engine.bidirectional(s, t)
+    elif method == "dijkstra":
+        d, path = engine.query(s, t)
+    else:
+        raise ValueError(f"Неизвестный метод поиска: {method}")
+    if path is None:
+        return INF, None
+    return d, [csr.labels[v] for v in path]
+
 def reconstruct_path(prev, s, t):
     if t not in prev:
         return None
@@ -40,20 +266,9 @@ def reconstruct_path(prev, s, t):
         return None
     return path
 
-def show_graph_with_path(G, path, title="Shortest path"):
-    pos = nx.spring_layout(G)
-    plt.figure(figsize=(6,5))
-    nx.draw_networkx_nodes(G, pos, node_size=600)
-    nx.draw_networkx_labels(G, pos)
-    nx.draw_networkx_edges(G, pos, edgelist=G.edges())
-    if path and len(path) >= 2:
-        path_edges = [(path[i], path[i+1]) for i in range(len(path)-1)]
-        nx.draw_networkx_edges(G, pos, edgelist=path_edges, width=3, edge_color='r')
-    labels = nx.get_edge_attributes(G, 'weight')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=labels)
-    plt.title(title)
-    plt.axis('off')
-    plt.show()
+def show_graph_with_path(G, path, title="Shortest path", out=None):
+    path_edges = [(path[i], path[i+1]) for i in range(len(path)-1)] if path and len(path) >= 2 else None
+    draw_graph(G, highlight_edges=path_edges, title=title, out=out, edge_labels=True)
 
 def main():
     # Хардкод: взвешенный граф
@@ -63,14 +278,13 @@ def main():
 
     source = 1
     target = 5
-    dist, prev = dijkstra(G, source)
-    if dist[target] == float('inf'):
+    distance, path = shortest_path(G, source, target)
+    if path is None:
         print("Lab7 — Нет пути от", source, "до", target)
         return
-    path = reconstruct_path(prev, source, target)
     print(f"Lab7 — Dijkstra: shortest path {source} -> {target}:")
     print(" -> ".join(map(str, path)))
-    print(f"Distance: {dist[target]}")
+    print(f"Distance: {distance}")
 
     show_graph_with_path(G, path, title=f"Shortest path {source} -> {target}")
 
@@ -0,0 +1,167 @@
+# result_cache.py
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+import numpy as np
+from graph_csr import as_csr
+
+def _label_keys(labels):
+    # тип входит в ключ: вершина 1 и вершина "1" — разные графы
+    return [f"{'s' if isinstance(v, str) else 'i' if isinstance(v, (int, np.integer)) else 'r'}:"
+            f"{v if isinstance(v, (str, int, np.integer)) else repr(v)}" for v in labels]
+
+def graph_hash(graph):
+    """
+    Канонический хеш графа, не зависящий от порядка вершин и рёбер во вводе: метки
+    сортируются, рёбра переводятся в пары рангов (для неориентированного — (min, max))
+    и сортируются одним lexsort, результат — blake2b по массивам. Учитываются
+    ориентированность, кратные рёбра и веса (если граф взвешенный).
+    """
+    csr = as_csr(graph)
+    keys = _label_keys(csr.labels)
+    n = len(keys)
+    by_key = sorted(range(n), key=keys.__getitem__)
+    rank = np.empty(n, dtype=np.int64)
+    rank[by_key] = np.arange(n)
+    rows = csr.slot_rows().astype(np.int64)
+    cols = csr.targets.astype(np.int64)
+    weights = csr.weights
+    if not csr.directed:
+        # неориентированное ребро — два слота, петля — один: берём слот с row <= col
+        keep = rows <= cols
+        rows, cols, weights = rows[keep], cols[keep], weights[keep]
+    a, b = rank[rows], rank[cols]
+    if not csr.directed:
+        a, b = np.minimum(a, b), np.maximum(a, b)
+    order = np.lexsort((weights, b, a)) if csr.weighted else np.lexsort((b, a))
+    h = hashlib.blake2b(digest_size=20)
+    h.update(np.array([n, len(a), csr.directed, csr.multigraph, csr.weighted], dtype="<i8").tobytes())
+    h.update("\n".join(keys[i] for i in by_key).encode("utf-8"))
+    h.update(a[order].astype("<i8").tobytes())
+    h.update(b[order].astype("<i8").tobytes())
+    if csr.weighted:
+        h.update(weights[order].astype("<f8").tobytes())
+    return h.hexdigest()
+
+def order_hash(graph):
+    """
+    Хеш графа вместе с порядком вершин и соседей — для результатов, которые от него зависят
+    (порядок обхода BFS/DFS, стартовая вершина по умолчанию).
+    """
+    csr = as_csr(graph)
+    h = hashlib.blake2b(digest_size=20)
+    h.update("\n".join(_label_keys(csr.labels)).encode("utf-8"))
+    h.update(np.ascontiguousarray(csr.offsets, dtype="<i8").tobytes())
+    h.update(np.ascontiguousarray(csr.targets, dtype="<i8").tobytes())
+    return h.hexdigest()
+
+def result_key(graph_key, name, options):
+    """Ключ результата: хеш графа, имя анализа и параметры, влияющие на результат."""
+    text = "\0".join([graph_key, name] + [f"{k}={v!r}" for k, v in sorted(options.items())])
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=20).hexdigest()
+
+class ResultCache:
+    """
+    Кэш результатов анализов по ключу result_key. В памяти — LRU, ограниченный числом
+    записей max_entries и суммарным размером max_bytes; результаты хранятся сериализованными
+    (pickle), так что изменение возвращённого объекта не портит кэш. directory — необязательное
+    хранилище на диске (файл на ключ, запись через временный файл); при промахе в памяти
+    результат ищется там. stats — попадания и промахи: hits, disk_hits, misses, stores, evictions.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 << 20, directory=None):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Размер кэша должен быть положительным")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._items = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items or (self._path(key) is not None and os.path.exists(self._path(key)))
+
+    def _path(self, key):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def _remember(self, key, blob):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        if len(blob) > self.max_bytes:
+            return
+        self._items[key] = blob
+        self._bytes += len(blob)
+        while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+            _, dropped = self._items.popitem(last=False)
+            self._bytes -= len(dropped)
+            self.stats["evictions"] += 1
+
+    def get(self, key, default=None):
+        blob = self._items.get(key)
+        if blob is not None:
+            self._items.move_to_end(key)
+            self.stats["hits"] += 1
+            return pickle.loads(blob)
+        path = self._path(key)
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                blob = f.read()
+            self._remember(key, blob)
+            self.stats["disk_hits"] += 1
+            return pickle.loads(blob)
+        self.stats["misses"] += 1
+        return default
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, blob)
+        self.stats["stores"] += 1
+        path = self._path(key)
+        if path is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+
+    def get_or_compute(self, key, compute, keep=None):
+        """
+        Результат из кэша или compute() с сохранением; вторым значением — было ли попадание.
+        keep(value) ложно — результат не сохраняется (например, ответ «неизвестно» по
+        исчерпанному бюджету времени: на другой машине или с другим бюджетом он может быть найден).
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value, True
+        value = compute()
+        if keep is None or keep(value):
+            self.put(key, value)
+        return value, False
+
+    def clear(self, disk=False):
+        """Очищает память (и каталог на диске при disk=True); статистика сохраняется."""
+        self._items.clear()
+        self._bytes = 0
+        if disk and self.directory and os.path.isdir(self.directory):
+            for sub in os.listdir(self.directory):
+                folder = os.path.join(self.directory, sub)
+                if os.path.isdir(folder):
+                    for name in os.listdir(folder):
+                        if name.endswith(".pkl"):
+                            os.remove(os.path.join(folder, name))
+
+    def info(self):
+        """Статистика вместе с текущим размером и долей попаданий."""
+        s = self.stats
+        lookups = s["hits"] + s["disk_hits"] + s["misses"]
+        return dict(s, entries=len(self._items), bytes=self._bytes,
+                    hit_rate=(s["hits"] + s["disk_hits"]) / lookups if lookups else 0.0)
@@ -0,0 +1,132 @@
+# shared_graph.py
+from multiprocessing import Pool, shared_memory
+import os
+import numpy as np
+from graph_csr import CSRGraph
+from lab2_bfs import bfs_profile, bfs_levels
+
+# массивы CSR, которые нужны рабочим процессам для обходов
+_FIELDS = ("offsets", "targets", "weights", "edge_ids")
+
+class SharedCSR:
+    """
+    Копия CSR-массивов графа в разделяемой памяти (multiprocessing.shared_memory).
+    Рабочие процессы подключаются к ним по имени (attach_csr) и читают граф без
+    копирования и pickle. Используется как контекстный менеджер: при выходе память
+    освобождается.
+    """
+
+    def __init__(self, csr):
+        self.spec = {"n": csr.number_of_nodes(), "num_edges": csr.num_edges, "directed": csr.directed}
+        self._blocks = []
+        for field in _FIELDS:
+            arr = getattr(csr, field)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+            self._blocks.append(shm)
+            self.spec[field] = (shm.name, arr.shape, arr.dtype.str)
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _attach_block(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # до Python 3.13 нет track; рабочие процессы пула делят resource_tracker
+        # с родителем, так что повторная регистрация безвредна
+        return shared_memory.SharedMemory(name=name)
+
+def attach_csr(spec):
+    """
+    Граф поверх разделяемой памяти (без меток — рабочим процессам нужны только id).
+    Возвращает (csr, blocks); blocks нужно держать живыми, пока используется csr.
+    """
+    blocks = []
+    arrays = {}
+    for field in _FIELDS:
+        name, shape, dtype = spec[field]
+        shm = _attach_block(name)
+        blocks.append(shm)
+        arrays[field] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    n = spec["n"]
+    csr = CSRGraph(range(n), arrays["offsets"], arrays["targets"], arrays["weights"],
+                   arrays["edge_ids"], spec["num_edges"], directed=spec["directed"], index={})
+    return csr, blocks
+
+# состояние рабочего процесса: граф подключается один раз в инициализаторе пула
+_worker = {}
+
+def _init_worker(spec):
+    csr, blocks = attach_csr(spec)
+    _worker["csr"] = csr
+    _worker["blocks"] = blocks
+    _worker["visited"] = np.zeros(csr.number_of_nodes(), dtype=bool)
+
+def _profiles_task(sources):
+    csr = _worker["csr"]
+    visited = _worker["visited"]
+    ecc = np.empty(len(sources), dtype=np.int64)
+    dist_sum = np.empty(len(sources), dtype=np.int64)
+    for k, s in enumerate(sources.tolist()):
+        ecc[k], dist_sum[k], _, _ = bfs_profile(csr, s, visited)
+    return ecc, dist_sum
+
+def _distances_task(args):
+    sources, targets = args
+    csr = _worker["csr"]
+    rows = np.empty((len(sources), len(targets)), dtype=np.int64)
+    for k, s in enumerate(sources.tolist()):
+        _, dist, _ = bfs_levels(csr, [s])
+        rows[k] = dist[targets]
+    return rows
+
+def _chunks(ids, workers, chunk_size):
+    if chunk_size is None:
+        # несколько кусков на процесс — чтобы неравные по стоимости BFS выровнялись
+        chunk_size = max(1, -(-len(ids) // (workers * 4)))
+    return [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+def _pool(shared, workers):
+    return Pool(workers, initializer=_init_worker, initargs=(shared.spec,))
+
+def default_workers():
+    return os.cpu_count() or 1
+
+def parallel_bfs_profiles(csr, sources, workers=None, chunk_size=None):
+    """
+    BFS из каждого источника на пуле процессов; граф передаётся через разделяемую память.
+    Возвращает массивы (ecc, dist_sum), выровненные по sources (id вершин).
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    workers = workers or default_workers()
+    if not len(sources):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    with SharedCSR(csr) as shared, _pool(shared, workers) as pool:
+        parts = pool.map(_profiles_task, _chunks(sources, workers, chunk_size))
+    return (np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]))
+
+def parallel_distances(csr, sources, targets, workers=None, chunk_size=None):
+    """
+    Матрица расстояний в рёбрах (len(sources) x len(targets), -1 — нет пути),
+    строки считаются параллельно — по BFS на источник.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    workers = workers or default_workers()
+    if not len(sources):
+        return np.zeros((0, len(targets)), dtype=np.int64)
+    tasks = [(chunk, targets) for chunk in _chunks(sources, workers, chunk_size)]
+    with SharedCSR(csr) as shared, _pool(shared, workers) as pool:
+        parts = pool.map(_distances_task, tasks)
+    return np.vstack(parts)
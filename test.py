@@ -1,359 +1,244 @@
-import matplotlib.pyplot as plt
 import networkx as nx
-import re
-from collections import deque
-import itertools
+import argparse
 import sys
+from graph_csr import as_csr, raw_adjacency
+from lab2_bfs import bfs_order
+from lab3_dfs import dfs_adjacency, dfs_events, dfs_preorder
+from lab5_euler import eulerian_path
+from analysis_pipeline import STAGES, GraphFacts, metrics_stage, run_pipeline
+from graph_coloring import greedy_color
+from graph_render import add_plot_arguments, draw_graph
+from graph_stream import parse_text
+from tour_heuristics import nearest_neighbor_walk
+from lab1_graph_io import load_graph
+from lab6_hamiltonian import SEARCH_TIME_LIMIT, hamiltonian
+from result_cache import ResultCache
 
 def parse_input(raw: str):
     """
     Ожидается формат:
     {{v1, v2, v3},{(v1, v2), (v2, v3)}}
-    Возвращает (list_nodes, list_edges)
+    Возвращает (list_nodes, list_edges).
+    Разбор — graph_stream.parse_text: потоковый, с позицией ошибки (GraphSyntaxError — ValueError).
     """
-    # Разделяем по "},{", но сначала убираем начальные/концевые пробелы
-    formal_input = raw.strip().split("},{")
-    list_formal_input = [item.replace("{{", "").replace("}}", "").replace("{", "").replace("}", "") for item in formal_input]
-    if len(list_formal_input) != 2:
-        raise ValueError("Неверный формат ввода. Пример: {{v1, v2, v3},{(v1, v2), (v2, v3)}}")
+    return parse_text(raw.strip())
 
-    # Ноды — разделяем по запятой
-    list_node = [item.strip() for item in list_formal_input[0].split(",") if item.strip()]
-
-    # Парсинг рёбер. Поддерживаем формат (vX, vY) с возможными пробелами.
-    # Постарался сделать гибкий шаблон: захватывает слова/идентификаторы, не только v\d+
-    pair_tuples = re.findall(r'\(\s*([^\s,()]+)\s*,\s*([^\s,()]+)\s*\)', list_formal_input[1])
-    list_connection = [(a, b) for a, b in pair_tuples]
-
-    return list_node, list_connection
-
-def show_graph(list_node, list_connection):
+def show_graph(list_node, list_connection, out=None, plot=True):
     G = nx.Graph()
     G.add_nodes_from(list_node)
     G.add_edges_from(list_connection)
 
-    pos = nx.spring_layout(G)
-    nx.draw(G, pos, with_labels=True, font_weight='bold', node_size=600)
-    plt.show()
+    if plot:
+        # без GUI рисунок пишется в out; большой граф — уровень детализации (graph_render)
+        draw_graph(G, out=out)
     return G
 
 # ------------- Traversals -------------
-def bfs(G, start):
-    """Возвращает порядок обхода в ширину от start (если start нет — берём любую вершину)."""
+def bfs(G, start, direction="top-down"):
+    """
+    Возвращает порядок обхода в ширину от start (если start нет — берём любую вершину).
+    По умолчанию — в точности порядок очереди FIFO; direction="auto" (по запросу) — обход
+    с переходом к шагам снизу вверх, уровни которых перечисляются в порядке вершин графа.
+    """
     if start not in G:
         # попробуем взять первую вершину
-        start = next(iter(G.nodes), None)
+        start = next(iter(G.nodes()), None)
         if start is None:
             return []
-    visited = set()
-    q = deque([start])
-    order = []
-    visited.add(start)
-    while q:
-        v = q.popleft()
-        order.append(v)
-        for nbr in G.neighbors(v):
-            if nbr not in visited:
-                visited.add(nbr)
-                q.append(nbr)
-    return order
+    # lab2_bfs.bfs_order: граф networkx — очередью по его словарям соседей, CSRGraph —
+    # поуровневым BFS на массивах; соседи — в порядке G.neighbors
+    return bfs_order(G, start, direction=direction)
 
 def dfs_iterative(G, start):
-    """Итеративный DFS (стек)."""
+    """Итеративный DFS (явный стек с курсорами соседей, порядок — как у рекурсивного)."""
     if start not in G:
-        start = next(iter(G.nodes), None)
+        start = next(iter(G.nodes()), None)
         if start is None:
             return []
-    visited = set()
-    stack = [start]
-    order = []
-    while stack:
-        v = stack.pop()
-        if v in visited:
-            continue
-        visited.add(v)
-        order.append(v)
-        # добавляем соседей в порядке, обратном желаемому (чтобы левый обход шел как рекурсивный)
-        for nbr in reversed(list(G.neighbors(v))):
-            if nbr not in visited:
-                stack.append(nbr)
-    return order
+    return dfs_preorder(G, start, sort_neighbors=False)
 
 def dfs_recursive(G, start, visited=None, order=None):
+    """Тот же порядок, что у рекурсивного DFS, но без рекурсии (глубина не ограничена)."""
     if visited is None:
         visited = set()
     if order is None:
         order = []
     if start not in G:
         return order
-    visited.add(start)
-    order.append(start)
-    for nbr in G.neighbors(start):
-        if nbr not in visited:
-            dfs_recursive(G, nbr, visited, order)
+    adj = raw_adjacency(G)
+    if adj is not None:
+        order.extend(dfs_adjacency(adj, start, visited))
+        return order
+    csr = as_csr(G)
+    blocked = [csr.index[v] for v in visited if v != start]
+    for kind, v, _ in dfs_events(csr, [csr.index[start]], sort_neighbors=False, visited=blocked):
+        if kind == "pre":
+            label = csr.labels[v]
+            visited.add(label)
+            order.append(label)
     return order
 
 # ------------- Metrics -------------
-def graph_metrics(G):
-    metrics = {}
-    metrics['num_nodes'] = G.number_of_nodes()
-    metrics['num_edges'] = G.number_of_edges()
-    metrics['degrees'] = dict(G.degree())
-    # Компоненты связности
-    comps = list(nx.connected_components(G))
-    metrics['num_components'] = len(comps)
-    metrics['components'] = comps
-    # Эксцентриситет / диаметр / радиус — только для каждой связной компоненты отдельно
-    ecc = {}
-    diam = {}
-    rad = {}
-    avg_shortest = {}
-    for i, comp in enumerate(comps, start=1):
-        sub = G.subgraph(comp)
-        if sub.number_of_nodes() == 1:
-            ecc[i] = {next(iter(sub.nodes())): 0}
-            diam[i] = 0
-            rad[i] = 0
-            avg_shortest[i] = 0.0
-        else:
-            try:
-                ecc_map = nx.eccentricity(sub)
-                ecc[i] = ecc_map
-                diam[i] = nx.diameter(sub)
-                rad[i] = nx.radius(sub)
-                # средняя длина кратчайшего пути в компоненте
-                avg_shortest[i] = nx.average_shortest_path_length(sub)
-            except nx.NetworkXError as e:
-                ecc[i] = {}
-                diam[i] = None
-                rad[i] = None
-                avg_shortest[i] = None
-    metrics['eccentricity_by_component'] = ecc
-    metrics['diameter_by_component'] = diam
-    metrics['radius_by_component'] = rad
-    metrics['avg_shortest_path_by_component'] = avg_shortest
-    # Кластер коэффициент (локальный и средний)
-    metrics['clustering'] = nx.clustering(G)
-    metrics['average_clustering'] = nx.average_clustering(G) if G.number_of_nodes() > 0 else 0.0
-    return metrics
+def graph_metrics(G, workers=1):
+    # компоненты и метрики по ним — один BFS из каждой вершины (этап metrics в analysis_pipeline)
+    return metrics_stage(GraphFacts(G), {"workers": workers})
 
 # ------------- Eulerian check -------------
 def is_eulerian_manual(G):
-    """Проверка эйлеровости для неориентированного графа: связен (с учётом только вершин с degree>0) и все степени чётные."""
+    """
+    Проверка эйлеровости для неориентированного графа: связен (с учётом только вершин с degree>0)
+    и все степени чётные. Чётность и связность проверяются одним проходом Хирхольцера
+    (lab5_euler.eulerian_path): цикл существует, если он прошёл все рёбра.
+    """
     if G.number_of_nodes() == 0:
         return False
-    # Берём вершины с положительной степенью
-    non_zero_nodes = [n for n, d in G.degree() if d > 0]
-    if not non_zero_nodes:
-        # пустой граф — условно эйлеров (нет ребер)
-        return True
-    sub = G.subgraph(non_zero_nodes)
-    if not nx.is_connected(sub):
-        return False
-    for _, d in sub.degree():
-        if d % 2 != 0:
-            return False
-    return True
+    kind, _ = eulerian_path(G)
+    return kind == "circuit"
 
 # ------------- Hamiltonian search (backtracking) -------------
 def find_hamiltonian_cycle_backtracking(G, time_limit_nodes=17):
     """
     Ищет гамильтонов цикл (если найдёт — возвращает список вершин в цикле, иначе None).
-    Ограничение: комбинаторно сложно; ставим мягкое предупреждение по размеру N.
+    Перебор с отсечениями (lab6_hamiltonian.hamiltonian_search); до DP_MAX_NODES вершин
+    короткий, а если он не дал ответа — динамика по подмножествам (lab6_hamiltonian.hamiltonian).
     """
     n = G.number_of_nodes()
     if n == 0:
         return None
-    if n > 20:
-        # предупреждение: слишком много вершин, взрывной поиск
-        print("Внимание: поиск гамильтонова цикла экспоненциален. N >", 20, " — может работать очень долго.")
-    nodes = list(G.nodes())
-
-    def backtrack(path, used):
-        if len(path) == n:
-            # проверим, есть ли ребро от последней к первой (цикл)
-            if path[0] in G[path[-1]]:
-                return path[:]
-            else:
-                return None
-        for nbr in G.neighbors(path[-1]):
-            if nbr not in used:
-                used.add(nbr)
-                path.append(nbr)
-                res = backtrack(path, used)
-                if res:
-                    return res
-                path.pop()
-                used.remove(nbr)
-        return None
-
-    for start in nodes:
-        res = backtrack([start], {start})
-        if res:
-            res.append(res[0])  # замкнём цикл для наглядности
-            return res
-    return None
+    status, cycle = hamiltonian(G, cycle=True, start=next(iter(G.nodes())), time_limit=SEARCH_TIME_LIMIT)
+    if status == "unknown":
+        print("Внимание: поиск гамильтонова цикла прерван через", SEARCH_TIME_LIMIT, "с — ответ неизвестен.")
+    return cycle
 
 def find_hamiltonian_path_backtracking(G):
     """Ищет гамильтонов путь (не обязательно цикл)."""
     n = G.number_of_nodes()
     if n == 0:
         return None
-    nodes = list(G.nodes())
-
-    def backtrack(path, used):
-        if len(path) == n:
-            return path[:]
-        for nbr in G.neighbors(path[-1]):
-            if nbr not in used:
-                used.add(nbr)
-                path.append(nbr)
-                res = backtrack(path, used)
-                if res:
-                    return res
-                path.pop()
-                used.remove(nbr)
-        return None
-
-    for start in nodes:
-        res = backtrack([start], {start})
-        if res:
-            return res
-    return None
+    status, path = hamiltonian(G, cycle=False, time_limit=SEARCH_TIME_LIMIT)
+    if status == "unknown":
+        print("Внимание: поиск гамильтонова пути прерван через", SEARCH_TIME_LIMIT, "с — ответ неизвестен.")
+    return path
 
 # ------------- Greedy algorithms -------------
-def greedy_coloring(G):
-    """Жадная раскраска вершин (networkx реализует уже greedy_color)"""
-    coloring = nx.coloring.greedy_color(G, strategy='largest_first')
+def greedy_coloring(G, strategy='largest_first', time_limit=None):
+    """
+    Жадная раскраска вершин (graph_coloring: largest_first как в networkx, smallest_last, dsatur;
+    time_limit — время на уменьшение числа цветов)
+    """
+    coloring = greedy_color(G, strategy=strategy, time_limit=time_limit)
     # Вернуть как список (vertex -> color)
     return coloring
 
 def greedy_nearest_neighbor_path(G, start=None):
     """
-    Жадный nearest-neighbor для получения пути (эвристика TSP-like).
-    Работает для взвешенных/невзвешенных: если веса есть, берёт наименьший вес; иначе — просто первый сосед.
-    Возвращает порядок посещения всех вершин (если граф несвязен — посетит компоненту start).
+    Жадный nearest-neighbor для получения пути (эвристика TSP-like):
+    tour_heuristics.nearest_neighbor_walk. Замкнутый маршрут с улучшением 2-opt/Or-opt —
+    tour_heuristics.graph_tour.
     """
-    if G.number_of_nodes() == 0:
-        return []
-    if start is None or start not in G:
-        start = next(iter(G.nodes()))
-    visited = {start}
-    path = [start]
-    cur = start
-    while len(visited) < G.number_of_nodes():
-        # выбираем ближайшего соседа, который ещё не посещён
-        candidates = [v for v in G.nodes() if v not in visited and G.has_edge(cur, v)]
-        if not candidates:
-            # если нет непросмотренных соседей — пробуем найти ближайшую непросмотренную вершину через кратчайший путь
-            # найдём непросмотренную вершину с минимальным расстоянием (в смысле числа ребер)
-            min_dist = None
-            next_node = None
-            for v in G.nodes():
-                if v in visited:
-                    continue
-                try:
-                    d = nx.shortest_path_length(G, source=cur, target=v)
-                except nx.NetworkXNoPath:
-                    d = None
-                if d is not None and (min_dist is None or d < min_dist):
-                    min_dist = d
-                    next_node = v
-            if next_node is None:
-                # не сможем достигнуть оставшиеся вершины из текущей компоненты
-                break
-            # достроим кратчайший путь до next_node и пометим вершины посещёнными по пути
-            sp = nx.shortest_path(G, source=cur, target=next_node)
-            # первый в sp = cur, пропускаем его
-            for node in sp[1:]:
-                if node not in visited:
-                    visited.add(node)
-                    path.append(node)
-            cur = path[-1]
-        else:
-            # если граф взвешенный, используем вес; иначе — берем любую (deterministic: min by name)
-            best = None
-            best_w = None
-            for c in candidates:
-                if 'weight' in G[cur][c]:
-                    w = G[cur][c]['weight']
-                else:
-                    w = 1
-                if best is None or w < best_w or (w == best_w and str(c) < str(best)):
-                    best = c
-                    best_w = w
-            visited.add(best)
-            path.append(best)
-            cur = best
-    return path
+    return nearest_neighbor_walk(G, start)
 
 # ------------- CLI и запуск -------------
 def main():
+    parser = argparse.ArgumentParser(description="Алгоритмы на графе из ввода или файла")
+    parser.add_argument("path", nargs="?",
+                        help="файл графа: текст {{...},{...}}, .csv, .mtx или снимок graph_snapshot (без него — ввод с клавиатуры)")
+    parser.add_argument("--stages", type=lambda s: [x.strip() for x in s.split(",") if x.strip()],
+                        help="этапы через запятую: " + ", ".join(STAGES) + " (по умолчанию — все)")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="каталог кэша результатов: повторный запуск на том же графе берёт их оттуда")
+    add_plot_arguments(parser)
+    args = parser.parse_args()
+    unknown = [s for s in args.stages or () if s not in STAGES]
+    if unknown:
+        parser.error(f"неизвестные этапы: {', '.join(unknown)}")
+    # граф рисуется после вычислений, чтобы раскладка не задерживала их
     try:
-        raw = input("Введите данные графа (пример: {{v1, v2, v3},{(v1, v2), (v2, v3)}}):\n")
-        nodes, edges = parse_input(raw)
+        if args.path:
+            # CSRGraph из файла идёт в этапы и рисунок как есть: веса, ориентация
+            # и кратные рёбра снимков и CSV не теряются
+            G = load_graph(args.path)
+        else:
+            raw = input("Введите данные графа (пример: {{v1, v2, v3},{(v1, v2), (v2, v3)}}):\n")
+            nodes, edges = parse_input(raw)
+            G = show_graph(nodes, edges, plot=False)
     except Exception as e:
         print("Ошибка разбора ввода:", e)
         sys.exit(1)
 
-    G = show_graph(nodes, edges)
-
-    # Меню операций (быстро и прямо)
+    # все этапы — над одним набором фактов о графе (степени, компоненты, двудольность ...)
     print("\nВыполняю вычисления...")
+    stats = {}
+    cache = ResultCache(directory=args.cache_dir) if args.cache_dir else None
+    results = run_pipeline(G, stages=args.stages, stats=stats, cache=cache,
+                           start=next(iter(G), None))
 
     # Traversals
-    start = nodes[0] if nodes else None
-    print("BFS from", start, ":", bfs(G, start))
-    print("DFS iterative from", start, ":", dfs_iterative(G, start))
-    print("DFS recursive from", start, ":", dfs_recursive(G, start))
+    if "traversals" in results:
+        r = results["traversals"]
+        start = r["start"]
+        print("BFS from", start, ":", r["bfs"])
+        # итеративный и рекурсивный DFS дают один порядок — этап считает его один раз
+        print("DFS (iterative = recursive) from", start, ":", r["dfs"])
 
     # Metrics
-    metrics = graph_metrics(G)
-    print("\n--- Метрические характеристики ---")
-    print("Число вершин:", metrics['num_nodes'])
-    print("Число ребер:", metrics['num_edges'])
-    print("Степени вершин:", metrics['degrees'])
-    print("Число компонент связности:", metrics['num_components'])
-    for i, comp in enumerate(metrics['components'], start=1):
-        print(f" Компонента {i}: {len(comp)} вершин")
-    print("Средняя кластеризация:", metrics['average_clustering'])
-    print("Коэффициент кластеризации по вершинам:", metrics['clustering'])
-    print("Эксцентриситет по компонентам:", metrics['eccentricity_by_component'])
-    print("Диаметры по компонентам:", metrics['diameter_by_component'])
-    print("Радиусы по компонентам:", metrics['radius_by_component'])
-    print("Средняя длина кратчайшего пути по компонентам:", metrics['avg_shortest_path_by_component'])
+    if "metrics" in results:
+        metrics = results["metrics"]
+        print("\n--- Метрические характеристики ---")
+        print("Число вершин:", metrics['num_nodes'])
+        print("Число ребер:", metrics['num_edges'])
+        print("Степени вершин:", metrics['degrees'])
+        print("Число компонент связности:", metrics['num_components'])
+        for i, comp in enumerate(metrics['components'], start=1):
+            print(f" Компонента {i}: {len(comp)} вершин")
+        print("Средняя кластеризация:", metrics['average_clustering'])
+        print("Коэффициент кластеризации по вершинам:", metrics['clustering'])
+        print("Эксцентриситет по компонентам:", metrics['eccentricity_by_component'])
+        print("Диаметры по компонентам:", metrics['diameter_by_component'])
+        print("Радиусы по компонентам:", metrics['radius_by_component'])
+        print("Средняя длина кратчайшего пути по компонентам:", metrics['avg_shortest_path_by_component'])
 
     # Eulerian
-    print("\n--- Эйлеровость ---")
-    manual_euler = is_eulerian_manual(G)
-    nx_euler = nx.is_eulerian(G)
-    print("Проверка (manual):", manual_euler)
-    print("Проверка networkx.is_eulerian():", nx_euler)
-    if manual_euler:
-        try:
-            euler_circuit = list(nx.eulerian_circuit(G)) if nx.is_eulerian(G) else None
-            print("Эйлеров цикл (edge sequence):", euler_circuit)
-        except Exception:
-            print("Не удалось получить эйлеров цикл через networkx.")
-
-    # Hamiltonian (backtracking — может быть медленно)
-    print("\n--- Гамильтонов поиск (backtracking) ---")
-    ham_cycle = find_hamiltonian_cycle_backtracking(G)
-    if ham_cycle:
-        print("Найден гамильтонов цикл:", ham_cycle)
-    else:
-        ham_path = find_hamiltonian_path_backtracking(G)
-        if ham_path:
-            print("Найден гамильтонов путь (но не цикл):", ham_path)
+    if "euler" in results:
+        r = results["euler"]
+        print("\n--- Эйлеровость ---")
+        print("Проверка (manual):", r["eulerian"])
+        if r["kind"] == "circuit":
+            print("Эйлеров цикл (edge sequence):", r["edges"])
+        elif r["kind"] == "trail":
+            print("Эйлеров путь (edge sequence):", r["edges"])
+
+    # Hamiltonian: дешёвые проверки (связность, степени, двудольность) до перебора
+    if "hamiltonian" in results:
+        r = results["hamiltonian"]
+        print("\n--- Гамильтонов поиск (backtracking) ---")
+        for kind in ("cycle", "path"):
+            if r.get(f"{kind}_status") == "unknown":
+                print(f"Внимание: поиск гамильтонова {'цикла' if kind == 'cycle' else 'пути'} прерван через",
+                      SEARCH_TIME_LIMIT, "с — ответ неизвестен.")
+        if r["cycle"]:
+            print("Найден гамильтонов цикл:", r["cycle"])
+        elif r["path"]:
+            print("Найден гамильтонов путь (но не цикл):", r["path"])
         else:
-            print("Гамильтонова пути/цикла не найдено (или поиск слишком дорог).")
+            reason = r.get("path_reason") or r.get("cycle_reason")
+            print("Гамильтонова пути/цикла не найдено (или поиск слишком дорог)."
+                  + (f" Причина: {reason}." if reason else ""))
 
     # Greedy algorithms
-    print("\n--- Жадные алгоритмы ---")
-    coloring = greedy_coloring(G)
-    print("Жадная раскраска (вершина -> цвет):", coloring)
-    nn_path = greedy_nearest_neighbor_path(G, start)
-    print("Жадный nearest-neighbor путь (эвристика):", nn_path)
+    if "coloring" in results or "nearest_neighbor" in results:
+        print("\n--- Жадные алгоритмы ---")
+    if "coloring" in results:
+        print("Жадная раскраска (вершина -> цвет):", results["coloring"]["coloring"])
+    if "nearest_neighbor" in results:
+        print("Жадный nearest-neighbor путь (эвристика):", results["nearest_neighbor"]["path"])
+
+    print("\nВремя этапов (с):", {k: round(v, 4) for k, v in stats["timings"].items()})
+    if stats["cached"]:
+        print("Из кэша:", ", ".join(stats["cached"]))
+
+    if not args.no_plot:
+        draw_graph(G, out=args.plot)
 
     print("\nГотово.")
 
@@ -0,0 +1,28 @@
+# tests/test_alt_landmarks.py
+import networkx as nx
+import pytest
+from alt_landmarks import LandmarkIndex
+
+def _graph(weight_of_first=1.0):
+    G = nx.cycle_graph(12)
+    for u, v in G.edges():
+        G[u][v]["weight"] = 1.0 + (u * 7 + v) % 5
+    G[0][1]["weight"] = weight_of_first
+    return G
+
+def test_load_same_graph(tmp_path):
+    G = _graph()
+    LandmarkIndex.build(G, k=3).save(str(tmp_path))
+    index = LandmarkIndex.load(str(tmp_path), G)
+    assert index.query(0, 6) == LandmarkIndex.build(G, k=3).query(0, 6)
+
+def test_load_rejects_other_graph(tmp_path):
+    # те же n, m и ориентированность, но другие рёбра или веса — таблицы к графу не подходят
+    G = _graph()
+    LandmarkIndex.build(G, k=3).save(str(tmp_path))
+    rewired = _graph()
+    rewired.remove_edge(3, 4)
+    rewired.add_edge(3, 5, weight=1.0)
+    for other in (rewired, _graph(weight_of_first=9.0)):
+        with pytest.raises(ValueError):
+            LandmarkIndex.load(str(tmp_path), other)
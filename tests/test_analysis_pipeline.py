@@ -0,0 +1,24 @@
+# tests/test_analysis_pipeline.py
+import networkx as nx
+from analysis_pipeline import GraphFacts, run_pipeline
+from graph_csr import CSRGraph
+
+def test_directed_graph_has_weak_components():
+    # 2 -> 1 -> 0: одна слабая компонента, гамильтонов путь есть, цикла нет
+    g = CSRGraph.from_arrays([0, 1, 2], [1, 2], [0, 1], directed=True)
+    facts = GraphFacts(g)
+    assert [c.tolist() for c in facts.components()] == [[0, 1, 2]]
+    assert facts.hamiltonian_obstacle(cycle=False) is None
+    result = run_pipeline(g, stages=["metrics", "hamiltonian"], facts=facts)
+    assert result["metrics"]["components"] == [{0, 1, 2}]
+    assert result["hamiltonian"]["path"] == [2, 1, 0]
+    assert result["hamiltonian"]["cycle_status"] == "none"
+
+def test_directed_components_match_networkx():
+    for seed in range(20):
+        G = nx.gnm_random_graph(25, 15 + seed, seed=seed, directed=True)
+        facts = GraphFacts(G)
+        labels = facts.csr.labels
+        ours = sorted(sorted(labels[v] for v in c.tolist()) for c in facts.components())
+        ref = sorted(sorted(c) for c in nx.weakly_connected_components(G))
+        assert ours == ref
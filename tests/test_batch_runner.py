@@ -0,0 +1,73 @@
+# tests/test_batch_runner.py
+import io
+import json
+import math
+import networkx as nx
+import numpy as np
+import pytest
+from batch_runner import analyze_task, iter_tasks, run_batch, to_json
+from graph_formats import write_edge_csv
+
+def _text(edges):
+    nodes = sorted({v for e in edges for v in e})
+    return "{{%s},{%s}}" % (", ".join(nodes), ", ".join(f"({u}, {v})" for u, v in edges))
+
+def _big_line(n):
+    # граф, на котором метрики по всем парам заведомо дольше лимита
+    G = nx.gnm_random_graph(n, 4 * n, seed=1)
+    return _text([(f"v{u}", f"v{v}") for u, v in G.edges()])
+
+def test_records_keep_order_and_statuses(tmp_path):
+    source = tmp_path / "graphs.txt"
+    source.write_text("\n".join([
+        "# комментарий",
+        _text([("a", "b"), ("b", "c"), ("c", "a")]),
+        "",
+        "{{a, b},{(a, b), (a}}",
+        _text([("x", "y")]),
+    ]), encoding="utf-8")
+    tasks = list(iter_tasks(str(source)))
+    assert [t[0] for t in tasks] == ["line 2", "line 4", "line 5"]
+    for workers in (1, 2):
+        out = io.StringIO()
+        counts = run_batch(tasks, out, workers=workers)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert counts == {"ok": 2, "timeout": 0, "error": 1}
+        assert [r["id"] for r in records] == ["line 2", "line 4", "line 5"]
+        ok, bad, edge = records
+        assert ok["status"] == "ok" and ok["nodes"] == 3 and ok["edges"] == 3
+        assert ok["results"]["euler"]["kind"] == "circuit"
+        assert bad["status"] == "error" and bad["stage"] == "load" and bad["results"] == {}
+        assert edge["status"] == "ok" and edge["edges"] == 1
+
+def test_timeout_keeps_finished_stages():
+    if not hasattr(__import__("signal"), "setitimer"):
+        pytest.skip("нет SIGALRM")
+    record = analyze_task(("big", "text", _big_line(3000)), stages=("traversals", "metrics"),
+                          timeout=0.3)
+    assert record["status"] == "timeout"
+    assert "metrics" in record["error"]
+    assert "traversals" in record["results"] and "metrics" not in record["results"]
+
+def test_stage_error_is_recorded():
+    record = analyze_task(("t", "text", _text([("a", "b")])), stages=("traversals", "coloring"),
+                          options={"strategy": "nope"})
+    assert record["status"] == "error" and record["stage"] == "coloring"
+    assert record["error"].startswith("ValueError") and "traversals" in record["results"]
+
+def test_directory_source(tmp_path):
+    write_edge_csv(nx.path_graph(4), tmp_path / "path.csv")
+    (tmp_path / ".hidden").write_text("x")
+    (tmp_path / "broken.mtx").write_text("not a matrix")
+    tasks = list(iter_tasks(str(tmp_path)))
+    assert [t[0] for t in tasks] == ["broken.mtx", "path.csv"]
+    out = io.StringIO()
+    assert run_batch(tasks, out, workers=1) == {"ok": 1, "timeout": 0, "error": 1}
+
+def test_unknown_stage():
+    with pytest.raises(ValueError):
+        run_batch([], io.StringIO(), stages=["nope"])
+
+def test_to_json():
+    value = {1: {2, 3}, "t": (np.int64(4), np.array([1.5])), "inf": math.inf}
+    assert to_json(value) == {"1": [2, 3], "t": [4, [1.5]], "inf": None}
@@ -0,0 +1,57 @@
+# tests/test_benchmark.py
+import networkx as nx
+import pytest
+from benchmark import compare, run_benchmarks
+from graph_generators import GENERATORS, generate
+
+@pytest.mark.parametrize("kind", GENERATORS)
+def test_generators_are_seeded_simple_graphs(kind):
+    for n in (0, 1, 2, 57):
+        g = generate(kind, n, seed=3, weighted=True)
+        assert g.number_of_nodes() == n and g.labels == list(range(n))
+        assert not g.directed and not g.multigraph
+        assert g.edge_list() == generate(kind, n, seed=3, weighted=True).edge_list()
+        assert all(u != v and 1.0 <= w < 10.0 for u, v, w in g.edge_list())
+    G = generate(kind, 200, seed=1).to_networkx()
+    assert nx.number_of_selfloops(G) == 0
+    if kind == "chain":
+        assert nx.is_isomorphic(G, nx.path_graph(200))
+    elif kind == "clique":
+        assert G.number_of_edges() == 200 * 199 // 2
+    elif kind == "grid":
+        assert max(d for _, d in G.degree()) <= 4
+    elif kind == "power_law":
+        assert nx.is_connected(G) and max(d for _, d in G.degree()) > 10
+
+def test_unknown_generator():
+    with pytest.raises(ValueError):
+        generate("tree", 10)
+
+def test_run_benchmarks_records_and_limits():
+    records = run_benchmarks(["bfs", "dijkstra", "graph_metrics"], ["chain", "grid"],
+                             sizes=(30, 600), repeat=2)
+    assert len(records) == 3 * 2 * 2
+    by_key = {(r["algorithm"], r["generator"], r["n"]): r for r in records}
+    # у цепочки свой предел для метрик: n + m = 1199 > 1000
+    assert by_key[("graph_metrics", "chain", 600)]["status"] == "skipped"
+    ok = by_key[("dijkstra", "grid", 600)]
+    assert ok["status"] == "ok" and 1 <= ok["runs"] <= 2
+    assert ok["seconds_min"] <= ok["seconds_median"] and ok["peak_bytes"] > 0
+    assert by_key[("bfs", "chain", 30)]["m"] == 29
+    with pytest.raises(ValueError):
+        run_benchmarks(["nope"], sizes=(10,))
+
+def test_csr_input_matches_networkx_sizes():
+    a = run_benchmarks(["euler", "coloring"], ["erdos_renyi"], sizes=(100,), repeat=1)
+    b = run_benchmarks(["euler", "coloring"], ["erdos_renyi"], sizes=(100,), repeat=1, as_networkx=False)
+    assert [(r["algorithm"], r["m"], r["status"]) for r in a] == \
+        [(r["algorithm"], r["m"], r["status"]) for r in b]
+
+def test_compare_flags_only_real_regressions():
+    def rec(name, seconds, status="ok"):
+        return {"algorithm": name, "generator": "chain", "n": 10, "status": status, "seconds_min": seconds}
+    baseline = [rec("a", 1.0), rec("b", 1.0), rec("c", 0.0001), rec("d", 1.0, "skipped")]
+    records = [rec("a", 1.5), rec("b", 1.1), rec("c", 0.0005), rec("d", 3.0), rec("e", 9.0)]
+    regressions = compare(baseline, records)
+    assert [(r["algorithm"], before, after) for r, before, after, _ in regressions] == [("a", 1.0, 1.5)]
+    assert regressions[0][3] == pytest.approx(1.5)
@@ -0,0 +1,63 @@
+# tests/test_contraction_hierarchies.py
+import random
+import networkx as nx
+import numpy as np
+import pytest
+from contraction_hierarchies import ContractionHierarchy
+
+def _cycle(weight_of_first=1.0):
+    G = nx.cycle_graph(12)
+    nx.set_edge_attributes(G, 1.0, "weight")
+    G[0][1]["weight"] = weight_of_first
+    return G
+
+def _weighted(seed, directed):
+    G = nx.gnm_random_graph(60, 180, seed=seed, directed=directed)
+    rng = random.Random(seed)
+    for u, v in G.edges():
+        G[u][v]["weight"] = float(rng.randint(1, 20))
+    return G
+
+def _path_length(G, path):
+    return sum(G[u][v]["weight"] for u, v in zip(path, path[1:]))
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_queries_match_dijkstra(directed):
+    for seed in range(4):
+        G = _weighted(seed, directed)
+        ch = ContractionHierarchy.build(G)
+        for s in range(0, 60, 7):
+            expected = nx.single_source_dijkstra_path_length(G, s)
+            for t in range(60):
+                d, path = ch.query(s, t)
+                if t not in expected:
+                    assert d == float("inf") and path is None
+                    continue
+                assert d == expected[t]
+                assert path[0] == s and path[-1] == t
+                assert _path_length(G, path) == d
+
+def test_many_to_many_matches_dijkstra():
+    G = _weighted(5, True)
+    ch = ContractionHierarchy.build(G)
+    sources, targets = list(range(0, 60, 5)), list(range(1, 60, 3))
+    matrix = ch.many_to_many(sources, targets)
+    for i, s in enumerate(sources):
+        expected = nx.single_source_dijkstra_path_length(G, s)
+        assert matrix[i].tolist() == [expected.get(t, np.inf) for t in targets]
+
+def test_load_same_graph(tmp_path):
+    G = _weighted(1, False)
+    ch = ContractionHierarchy.build(G)
+    ch.save(str(tmp_path))
+    loaded = ContractionHierarchy.load(str(tmp_path), G)
+    assert loaded.query(0, 30) == ch.query(0, 30)
+    assert ContractionHierarchy.load(str(tmp_path)).distance_ids(0, 30) == ch.distance_ids(0, 30)
+
+def test_load_rejects_other_weights(tmp_path):
+    # те же n, m и ориентированность, но другой вес ребра — ярлыки иерархии неверны
+    ContractionHierarchy.build(_cycle()).save(str(tmp_path))
+    changed = _cycle(weight_of_first=50.0)
+    with pytest.raises(ValueError):
+        ContractionHierarchy.load(str(tmp_path), changed)
+    assert ContractionHierarchy.build(changed).query(0, 1) == (11.0, [0] + list(range(11, 0, -1)))
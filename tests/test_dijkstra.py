@@ -0,0 +1,72 @@
+# tests/test_dijkstra.py
+import random
+import networkx as nx
+import pytest
+from indexed_heap import IndexedDaryHeap
+from lab7_greedy_shortest_path import INF, DijkstraEngine, dijkstra, shortest_path
+
+def _weighted(seed, directed):
+    G = nx.gnm_random_graph(80, 200, seed=seed, directed=directed)
+    rng = random.Random(seed)
+    for u, v in G.edges():
+        G[u][v]["weight"] = float(rng.randint(0, 9))
+    return G
+
+def _length(G, path):
+    return sum(G[u][v]["weight"] for u, v in zip(path, path[1:]))
+
+@pytest.mark.parametrize("arity", [2, 3, 4, 8])
+def test_indexed_heap_orders_keys(arity):
+    rng = random.Random(arity)
+    heap = IndexedDaryHeap(200, arity)
+    keys = {}
+    for _ in range(600):
+        v, k = rng.randrange(200), rng.random()
+        changed = heap.push(v, k)
+        # decrease-key: ключ меняется, только если новый меньше
+        assert changed == (k < keys.get(v, INF))
+        keys[v] = min(k, keys.get(v, INF))
+    assert len(heap) == len(keys) and all(v in heap for v in keys)
+    popped = [heap.pop() for _ in range(len(keys))]
+    assert popped == sorted(keys.items(), key=lambda item: item[1])
+    assert not heap and 0 not in heap
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_distances_match_networkx(directed):
+    for seed in range(5):
+        G = _weighted(seed, directed)
+        for s in (0, 17, 42):
+            dist, prev = dijkstra(G, s)
+            expected = nx.single_source_dijkstra_path_length(G, s)
+            assert {v: d for v, d in dist.items() if d != INF} == expected
+            assert prev[s] is None
+
+@pytest.mark.parametrize("method", ["bidirectional", "dijkstra"])
+@pytest.mark.parametrize("directed", [False, True])
+def test_point_queries_match_networkx(method, directed):
+    G = _weighted(11, directed)
+    engine = DijkstraEngine(G)
+    # один движок на все запросы — сброс затронутых вершин между ними
+    for s in range(0, 80, 9):
+        expected = nx.single_source_dijkstra_path_length(G, s)
+        for t in range(0, 80, 7):
+            d, path = shortest_path(G, s, t, method=method, engine=engine)
+            if t not in expected:
+                assert (d, path) == (INF, None)
+                continue
+            assert d == expected[t]
+            assert path[0] == s and path[-1] == t and _length(G, path) == d
+
+def test_run_many_settles_targets():
+    G = _weighted(3, True)
+    engine = DijkstraEngine(G)
+    expected = nx.single_source_dijkstra_path_length(G, 0)
+    targets = [t for t in expected if t % 5 == 0]
+    engine.run_many(0, targets)
+    for t in targets:
+        assert engine.dist[t] == expected[t]
+        assert _length(G, engine.path_to(0, t)) == expected[t]
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        shortest_path(nx.path_graph(3), 0, 2, method="bfs")
@@ -0,0 +1,17 @@
+# tests/test_distance_matrix.py
+import networkx as nx
+import numpy as np
+import pytest
+from distance_matrix import many_to_many
+
+def test_unweighted_counts_edges():
+    G = nx.path_graph(5)
+    nx.set_edge_attributes(G, 3.0, "weight")
+    assert np.array_equal(many_to_many(G, [0, 4], [2], weighted=False), [[2.0], [2.0]])
+    assert np.array_equal(many_to_many(G, [0, 4], [2]), [[6.0], [6.0]])
+
+@pytest.mark.parametrize("method", ["dijkstra", "ch"])
+def test_unweighted_rejects_explicit_method(method):
+    # BFS не выполняет выбранный метод — молча его игнорировать нельзя
+    with pytest.raises(ValueError):
+        many_to_many(nx.path_graph(5), [0], [4], method=method, weighted=False)
@@ -0,0 +1,70 @@
+# tests/test_dynamic_graph.py
+import random
+import networkx as nx
+import pytest
+from dynamic_graph import DynamicGraph
+from lab5_euler import eulerian_path
+
+def _check(g, G, sources):
+    assert g.number_of_nodes() == G.number_of_nodes()
+    assert g.number_of_edges() == G.number_of_edges()
+    assert sorted(map(sorted, g.components())) == sorted(map(sorted, nx.connected_components(G)))
+    assert sorted(g.odd_vertices()) == sorted(v for v, d in G.degree() if d % 2)
+    assert g.euler_status() == eulerian_path(G)[0]
+    for s in sources:
+        expected = nx.single_source_dijkstra_path_length(G, s)
+        assert g.distances(s) == expected
+        for t in list(G)[::5]:
+            path = g.path(s, t)
+            if t not in expected:
+                assert path is None
+            else:
+                assert path[0] == s and path[-1] == t
+                assert sum(G[a][b]["weight"] for a, b in zip(path, path[1:])) == expected[t]
+
+@pytest.mark.parametrize("seed", range(6))
+def test_edits_match_recomputation(seed):
+    rng = random.Random(seed)
+    G = nx.gnm_random_graph(30, 35, seed=seed)
+    for u, v in G.edges():
+        G[u][v]["weight"] = float(rng.randint(1, 9))
+    g = DynamicGraph.from_graph(G)
+    sources = [0, 7]
+    for s in sources:
+        g.add_source(s)
+    _check(g, G, sources)
+    for step in range(150):
+        edges = list(G.edges())
+        if edges and rng.random() < 0.45:
+            u, v = rng.choice(edges)
+            g.remove_edge(u, v)
+            G.remove_edge(u, v)
+        else:
+            # новое ребро, петля, новая вершина или смена веса существующего ребра
+            u, v = rng.randrange(33), rng.randrange(33)
+            w = float(rng.randint(0, 9))
+            g.add_edge(u, v, w)
+            G.add_edge(u, v, weight=w)
+        if step % 10 == 0 or step > 140:
+            _check(g, G, sources)
+
+def test_apply_and_snapshot():
+    g = DynamicGraph()
+    g.apply([("add", "a", "b"), ("add", "b", "c", 2.5), ("add", "c", "a"), ("remove", "a", "b")])
+    assert g.euler_status() == "trail" and g.odd_vertices() == ["a", "b"]
+    csr = g.to_csr()
+    assert csr.weighted and csr.labels == ["a", "b", "c"]
+    assert sorted(csr.edge_list()) == [(0, 2, 1.0), (1, 2, 2.5)]
+    g.add_source("a")
+    assert g.path("a", "b") == ["a", "c", "b"] and g.distance("a", "b") == 3.5
+
+def test_invalid_edits():
+    g = DynamicGraph.from_graph(nx.path_graph(3))
+    with pytest.raises(ValueError):
+        g.remove_edge(0, 2)
+    with pytest.raises(ValueError):
+        g.add_edge(0, 2, -1.0)
+    with pytest.raises(ValueError):
+        g.apply([("flip", 0, 1)])
+    with pytest.raises(ValueError):
+        DynamicGraph.from_graph(nx.DiGraph([(0, 1)]))
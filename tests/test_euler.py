@@ -0,0 +1,58 @@
+# tests/test_euler.py
+import random
+from collections import Counter
+import networkx as nx
+import pytest
+from lab5_euler import eulerian_path
+
+def _multigraph(seed, directed):
+    rng = random.Random(seed)
+    G = nx.MultiDiGraph() if directed else nx.MultiGraph()
+    n = rng.randint(2, 8)
+    # замкнутый обход по случайным вершинам (эйлеров) плюс немного случайных рёбер
+    walk = [rng.randrange(n) for _ in range(rng.randint(2, 14))]
+    G.add_edges_from(zip(walk, walk[1:] + walk[:1]))
+    for _ in range(rng.randint(0, 2)):
+        G.add_edge(rng.randrange(n), rng.randrange(n))
+    G.remove_nodes_from(list(nx.isolates(G)))
+    return G
+
+def _key(u, v, directed):
+    return (u, v) if directed else frozenset((u, v))
+
+def _check_walk(G, edges):
+    directed = G.is_directed()
+    assert all(a[1] == b[0] for a, b in zip(edges, edges[1:]))
+    assert Counter(_key(u, v, directed) for u, v in edges) == \
+        Counter(_key(u, v, directed) for u, v in G.edges())
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_matches_networkx(directed):
+    for seed in range(300):
+        G = _multigraph(seed, directed)
+        kind, edges = eulerian_path(G)
+        if nx.is_eulerian(G):
+            assert kind == "circuit"
+            assert edges[0][0] == edges[-1][1]
+        elif nx.has_eulerian_path(G):
+            assert kind == "trail"
+        else:
+            assert kind is None and edges == []
+            continue
+        _check_walk(G, edges)
+
+def test_start_vertex():
+    G = nx.MultiGraph([(0, 1), (1, 2), (2, 0), (2, 3), (3, 2)])
+    kind, edges = eulerian_path(G, start=3)
+    assert kind == "circuit" and edges[0][0] == 3
+    _check_walk(G, edges)
+    # у пути старт — одна из нечётных вершин, недопустимый start игнорируется
+    kind, edges = eulerian_path(nx.path_graph(4), start=1)
+    assert kind == "trail" and edges[0][0] in (0, 3)
+
+def test_disconnected_edges_and_empty_graph():
+    G = nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)])
+    assert eulerian_path(G) == (None, [])
+    G = nx.Graph()
+    G.add_nodes_from([0, 1])
+    assert eulerian_path(G) == ("circuit", [])
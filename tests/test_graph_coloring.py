@@ -0,0 +1,47 @@
+# tests/test_graph_coloring.py
+import networkx as nx
+import pytest
+from graph_coloring import STRATEGIES, _adjacency, _conflict_graph, greedy_color, smallest_last_order
+
+def _graphs():
+    for seed in range(40):
+        yield nx.gnm_random_graph(60, 60 + 6 * seed, seed=seed)
+    yield nx.random_labeled_tree(80, seed=1)
+    yield nx.grid_2d_graph(9, 9)
+
+def test_smallest_last_removes_minimum_degree():
+    # каждая снимаемая вершина — минимальной степени среди оставшихся (в разложении
+    # на k-ядра это не так: там степень не опускается ниже текущего ядра)
+    for G in _graphs():
+        adj = _adjacency(_conflict_graph(G))
+        deg = [len(a) for a in adj]
+        alive = set(range(len(adj)))
+        for v in reversed(smallest_last_order(adj)):
+            assert deg[v] == min(deg[u] for u in alive)
+            alive.remove(v)
+            for u in adj[v]:
+                if u in alive:
+                    deg[u] -= 1
+
+def test_smallest_last_colors_like_networkx():
+    # порядки при равных степенях различаются, число цветов — в среднем то же
+    ours = theirs = 0
+    for G in _graphs():
+        k = len(set(greedy_color(G, strategy="smallest_last").values()))
+        ref = len(set(nx.greedy_color(G, strategy="smallest_last").values()))
+        assert k <= max(nx.core_number(G).values()) + 1
+        ours += k
+        theirs += ref
+    assert abs(ours - theirs) <= theirs * 0.05
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_multigraph_colors_like_simple_graph(strategy):
+    # кратные рёбра и направление не влияют на раскраску
+    dense = nx.MultiGraph(nx.gnm_random_graph(40, 120, seed=4))
+    dense.add_edges_from(list(dense.edges())[:30])
+    for G in (nx.MultiGraph([(0, 1), (0, 1), (1, 2)]),
+              nx.MultiDiGraph([(0, 1), (1, 0), (1, 2), (1, 2), (2, 3)]),
+              dense):
+        colors = greedy_color(G, strategy=strategy)
+        assert all(colors[u] != colors[v] for u, v in G.edges() if u != v)
+        assert colors == greedy_color(nx.Graph(G.to_undirected()), strategy=strategy)
@@ -0,0 +1,58 @@
+# tests/test_graph_formats.py
+import io
+from graph_csr import CSRGraph
+from graph_formats import read_edge_csv, write_edge_csv
+
+def test_csv_round_trip_quoted_labels(tmp_path):
+    # метки с разделителем, кавычками и пробелами внутри
+    nodes = ["a,1", 'say "hi"', "plain", "x;y", "с пробелом"]
+    edges = [("a,1", 'say "hi"'), ('say "hi"', "plain"), ("plain", "a,1"), ("x;y", "с пробелом")]
+    g = CSRGraph.from_edges(nodes, edges)
+    for delimiter in (",", ";"):
+        path = tmp_path / f"graph{ord(delimiter)}.csv"
+        write_edge_csv(g, path, delimiter=delimiter)
+        back = read_edge_csv(path, delimiter=delimiter)
+        assert back.labels == g.labels
+        assert back.edge_list() == g.edge_list()
+
+def test_csv_round_trip_weights():
+    g = CSRGraph.from_arrays(["a,b", "c"], [0], [1], weights=[2.5])
+    buf = io.StringIO()
+    write_edge_csv(g, buf)
+    back = read_edge_csv(io.StringIO(buf.getvalue()))
+    assert back.weighted and back.labels == ["a,b", "c"]
+    assert back.edge_list() == [(0, 1, 2.5)]
+
+def test_csv_quoted_first_row():
+    # разделитель в кавычках в первой строке данных не меняет число столбцов
+    text = 'source,target\n"a,1",b\nb,c\n'
+    g = read_edge_csv(io.StringIO(text))
+    assert g.labels == ["a,1", "b", "c"]
+    assert g.number_of_edges() == 2
+
+def test_csv_round_trip_line_breaks_and_padding(tmp_path):
+    # переводы строк внутри метки, разрывы строк str.splitlines и пробелы по краям
+    nodes = ["a\nb", "c\r\nd", "e f", "g\x1ch", " padded ", "\x1c", "last\r"]
+    g = CSRGraph.from_arrays(nodes, [0, 1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5, 6, 0],
+                             weights=[1.5, 2, 3, 4, 5, 6, 7], directed=True)
+    path = tmp_path / "graph.csv"
+    write_edge_csv(g, path)
+    for chunk_bytes in (1 << 22, 7, 1):
+        back = read_edge_csv(path, directed=True, chunk_bytes=chunk_bytes)
+        assert back.labels == nodes
+        assert back.edge_list() == g.edge_list()
+
+def test_csv_strips_only_unquoted_fields():
+    text = 'source,target\n a , " b "\n\n"c\nd",\ta\n'
+    g = read_edge_csv(io.StringIO(text))
+    assert g.labels == ["a", " b ", "c\nd"]
+    assert g.number_of_edges() == 2
+
+def test_csv_error_line_counts_quoted_line_breaks():
+    text = 'source,target\n"a\nb",c\nd\n'
+    try:
+        read_edge_csv(io.StringIO(text))
+    except ValueError as e:
+        assert str(e).startswith("Строка 4:")
+    else:
+        raise AssertionError("нет ошибки")
@@ -0,0 +1,26 @@
+# tests/test_graph_render.py
+import networkx as nx
+import numpy as np
+import graph_render
+from graph_csr import as_csr
+from graph_render import cached_layout, level_of_detail
+
+def test_highlighted_vertices_survive_level_of_detail():
+    # выделенный путь длиннее max_nodes — его вершины всё равно рисуются
+    G = nx.path_graph(100)
+    keep = np.arange(20, 60)
+    ids, rows, cols = level_of_detail(G, max_nodes=10, keep=keep)
+    assert np.isin(keep, ids).all()
+    assert np.isin(rows, ids).all() and np.isin(cols, ids).all()
+
+def test_layout_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(graph_render, "LAYOUT_CACHE_SIZE", 2)
+    monkeypatch.setattr(graph_render, "_positions", graph_render.OrderedDict())
+    graphs = [as_csr(nx.path_graph(n)) for n in (3, 4, 5)]
+    for g in graphs:
+        cached_layout(g, iterations=2)
+    assert len(graph_render._positions) == 2
+    # последняя использованная раскладка вытесняется последней
+    cached_layout(graphs[1], iterations=2)
+    cached_layout(graphs[0], iterations=2)
+    assert graph_render.fingerprint(graphs[1]) in graph_render._positions
@@ -0,0 +1,51 @@
+# tests/test_graph_snapshot.py
+import networkx as nx
+import pytest
+from graph_csr import CSRGraph, as_csr
+from graph_snapshot import is_snapshot, load_snapshot, save_snapshot
+from lab2_bfs import bfs_order
+from result_cache import graph_hash
+
+def _graphs():
+    G = nx.gnm_random_graph(50, 120, seed=2)
+    yield nx.relabel_nodes(G, {v: f"v{v}" for v in G})
+    yield nx.gnm_random_graph(40, 90, seed=3, directed=True)
+    M = nx.MultiDiGraph([("α", "β"), ("α", "β"), ("β", "β"), ("β", "γ")])
+    for u, v, k in M.edges(keys=True):
+        M[u][v][k]["weight"] = 0.5 + k
+    yield M
+    yield CSRGraph.from_edges(["a", "isolated"], [])
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, mmap):
+    for i, G in enumerate(_graphs()):
+        path = tmp_path / f"g{i}.csr"
+        save_snapshot(G, path)
+        assert is_snapshot(path)
+        csr, back = as_csr(G), load_snapshot(path, mmap=mmap)
+        assert list(back.labels) == list(csr.labels)
+        assert (back.directed, back.multigraph, back.weighted) == (csr.directed, csr.multigraph, csr.weighted)
+        assert back.edge_list() == csr.edge_list()
+        assert graph_hash(back) == graph_hash(csr)
+        start = csr.labels[0]
+        assert bfs_order(back, start) == bfs_order(csr, start)
+        assert all(back.index[v] == k for k, v in enumerate(csr.labels))
+
+def test_truncated_and_foreign_files(tmp_path):
+    path = tmp_path / "g.csr"
+    save_snapshot(nx.path_graph(1000), path)
+    data = path.read_bytes()
+    cut = tmp_path / "cut.csr"
+    cut.write_bytes(data[:len(data) // 2])
+    for mmap in (True, False):
+        with pytest.raises(ValueError, match="обрезан"):
+            load_snapshot(cut, mmap=mmap)
+    other = tmp_path / "other.csr"
+    other.write_bytes(b"source,target\n" * 20)
+    assert not is_snapshot(other)
+    with pytest.raises(ValueError):
+        load_snapshot(other)
+
+def test_mixed_labels_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        save_snapshot(nx.Graph([(1, "a")]), tmp_path / "g.csr")
@@ -0,0 +1,21 @@
+# tests/test_graph_stream.py
+import io
+import numpy as np
+from graph_stream import GraphStreamReader
+
+def _text(n):
+    nodes = ", ".join(f"v{i}" for i in range(n))
+    edges = ", ".join(f"(v{i}, v{(i * 7 + 1) % n})" for i in range(n))
+    return f"{{{{{nodes}}},{{{edges}}}}}".encode("utf-8")
+
+def test_chunks_do_not_exceed_chunk_size():
+    # весь буфер разбирается быстрым путём за раз, но куски — не длиннее chunk_size
+    data = _text(20000)
+    small = list(GraphStreamReader(io.BytesIO(data), chunk_size=1000))
+    assert all(len(part[1]) <= 1000 for part in small)
+    whole = list(GraphStreamReader(io.BytesIO(data)))
+    for kind in ("nodes", "edges"):
+        got = [p[1:] for p in small if p[0] == kind]
+        want = [p[1:] for p in whole if p[0] == kind]
+        for k in range(len(want[0])):
+            assert np.array_equal(np.concatenate([g[k] for g in got]), np.concatenate([w[k] for w in want]))
@@ -0,0 +1,37 @@
+# tests/test_hamiltonian.py
+import networkx as nx
+import lab6_hamiltonian
+from lab6_hamiltonian import hamiltonian, hamiltonian_dp
+
+def _is_cycle(G, cycle):
+    return cycle[0] == cycle[-1] and sorted(cycle[:-1]) == sorted(G) and \
+        all(G.has_edge(u, v) for u, v in zip(cycle, cycle[1:]))
+
+def test_hamiltonian_agrees_with_dp():
+    # короткий перебор, а при "unknown" — динамика: ответ тот же, что у одной динамики
+    for seed in range(60):
+        G = nx.gnm_random_graph(3 + seed % 12, 2 + seed, seed=seed)
+        for cycle in (True, False):
+            status, path = hamiltonian(G, cycle=cycle, start=0)
+            assert status == ("found" if hamiltonian_dp(G, cycle=cycle, start=0) else "none")
+            if status == "found" and cycle:
+                assert path[0] == 0 and _is_cycle(G, path)
+
+def test_small_graph_found_by_search():
+    stats = {}
+    status, path = hamiltonian(nx.cycle_graph(24), cycle=True, start=5, stats=stats)
+    assert status == "found" and stats["method"] == "search"
+    assert path[0] == path[-1] == 5 and _is_cycle(nx.cycle_graph(24), path)
+
+def test_unknown_search_falls_back_to_dp(monkeypatch):
+    # перебор без бюджета сразу даёт "unknown" — ответ (граф Петерсена не гамильтонов) даёт динамика
+    monkeypatch.setattr(lab6_hamiltonian, "_probe_steps", lambda n: 0)
+    stats = {}
+    assert hamiltonian(nx.petersen_graph(), cycle=True, stats=stats) == ("none", None)
+    assert stats["method"] == "dp"
+
+def test_directed_uses_dp():
+    G = nx.DiGraph([(0, 1), (1, 2), (2, 0)])
+    stats = {}
+    assert hamiltonian(G, cycle=True, start=1, stats=stats) == ("found", [1, 2, 0, 1])
+    assert stats["method"] == "dp"
@@ -0,0 +1,46 @@
+# tests/test_metrics.py
+import networkx as nx
+import pytest
+from lab4_metrics import bounding_metrics, component_metrics
+
+@pytest.mark.parametrize("G", [
+    nx.path_graph(60),
+    nx.grid_2d_graph(8, 9),
+    nx.gnm_random_graph(80, 120, seed=1),
+    nx.complete_graph(40),
+    nx.barabasi_albert_graph(100, 2, seed=2),
+], ids=["path", "grid", "gnm", "clique", "power_law"])
+def test_component_metrics_match_networkx(G):
+    # на цепочке и решётке обходы идут очередью Python, на полном графе — шагами на массивах
+    comps = sorted(nx.connected_components(G), key=min)
+    for m, nodes in zip(component_metrics(G), comps):
+        H = G.subgraph(nodes)
+        assert m["eccentricity"] == nx.eccentricity(H)
+        assert m["avg_shortest_path"] == pytest.approx(nx.average_shortest_path_length(H) if len(nodes) > 1 else 0.0)
+
+@pytest.mark.parametrize("seed", range(8))
+def test_bounding_metrics_match_eccentricities(seed):
+    # несколько компонент, изолированные вершины и хвосты-цепочки
+    G = nx.gnm_random_graph(120, 130 + 10 * seed, seed=seed)
+    nx.add_path(G, [0] + list(range(120, 135)))
+    exact = component_metrics(G)
+    bounds = bounding_metrics(G)
+    assert len(bounds) == len(exact)
+    for b, m in zip(bounds, exact):
+        assert sorted(b["nodes"]) == sorted(m["nodes"])
+        assert b["exact"]
+        assert (b["radius"], b["diameter"]) == (m["radius"], m["diameter"])
+        assert sorted(b["center"]) == sorted(m["center"])
+        assert b["bfs_runs"] <= len(b["nodes"])
+
+def test_bounding_metrics_limited_bfs_bounds():
+    # при max_bfs границы гарантированные, а центр — надмножество настоящего
+    G = nx.barabasi_albert_graph(400, 2, seed=5)
+    m = component_metrics(G)[0]
+    b = bounding_metrics(G, max_bfs=2)[0]
+    assert b["bfs_runs"] <= 2
+    lo, hi = b["diameter_bounds"]
+    assert lo <= m["diameter"] <= hi
+    lo, hi = b["radius_bounds"]
+    assert lo <= m["radius"] <= hi
+    assert set(m["center"]) <= set(b["center"])
@@ -0,0 +1,24 @@
+# tests/test_result_cache.py
+import networkx as nx
+import analysis_pipeline
+from analysis_pipeline import run_pipeline
+from result_cache import ResultCache
+
+def test_keep_false_is_not_stored(tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+    assert cache.get_or_compute("k", lambda: 1, keep=lambda v: v > 1) == (1, False)
+    assert "k" not in cache and not any(tmp_path.iterdir())
+    assert cache.get_or_compute("k", lambda: 2, keep=lambda v: v > 1) == (2, False)
+    assert cache.get_or_compute("k", lambda: 3) == (2, True)
+
+def test_unknown_hamiltonian_is_not_cached(tmp_path, monkeypatch):
+    # исчерпанный бюджет перебора — не ответ: ни в памяти, ни на диске его нет
+    monkeypatch.setattr(analysis_pipeline, "hamiltonian", lambda *args, **kwargs: ("unknown", None))
+    G = nx.cycle_graph(30)
+    cache = ResultCache(directory=str(tmp_path))
+    for _ in range(2):
+        stats = {}
+        result = run_pipeline(G, stages=["hamiltonian", "euler"], stats=stats, cache=cache)
+        assert result["hamiltonian"]["cycle_status"] == "unknown"
+    assert stats["cached"] == ["euler"]
+    assert len(cache) == 1
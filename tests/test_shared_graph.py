@@ -0,0 +1,42 @@
+# tests/test_shared_graph.py
+import networkx as nx
+import numpy as np
+from graph_csr import as_csr
+from lab2_bfs import bfs_profile
+from lab4_metrics import component_metrics
+from shared_graph import SharedCSR, attach_csr, parallel_bfs_profiles, parallel_distances
+
+def _graph():
+    G = nx.gnm_random_graph(150, 200, seed=7)
+    nx.add_path(G, range(150, 170))
+    return G
+
+def test_attach_sees_same_arrays():
+    csr = as_csr(_graph())
+    with SharedCSR(csr) as shared:
+        view, blocks = attach_csr(shared.spec)
+        for field in ("offsets", "targets", "weights", "edge_ids"):
+            assert np.array_equal(getattr(view, field), getattr(csr, field))
+        for shm in blocks:
+            shm.close()
+
+def test_parallel_profiles_match_serial():
+    csr = as_csr(_graph())
+    n = csr.number_of_nodes()
+    visited = np.zeros(n, dtype=bool)
+    serial = [bfs_profile(csr, s, visited)[:2] for s in range(n)]
+    ecc, sums = parallel_bfs_profiles(csr, np.arange(n), workers=2, chunk_size=16)
+    assert list(zip(ecc.tolist(), sums.tolist())) == [(int(e), int(d)) for e, d in serial]
+
+def test_parallel_component_metrics_match_serial():
+    G = _graph()
+    assert component_metrics(G, workers=2) == component_metrics(G)
+
+def test_parallel_distances_match_networkx():
+    G = _graph()
+    csr = as_csr(G)
+    sources, targets = np.arange(0, 170, 9), np.arange(0, 170, 4)
+    rows = parallel_distances(csr, sources, targets, workers=2)
+    for i, s in enumerate(sources.tolist()):
+        lengths = nx.single_source_shortest_path_length(G, csr.labels[s])
+        assert rows[i].tolist() == [lengths.get(csr.labels[t], -1) for t in targets.tolist()]
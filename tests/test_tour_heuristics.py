@@ -0,0 +1,53 @@
+# tests/test_tour_heuristics.py
+import networkx as nx
+import numpy as np
+import pytest
+from tour_heuristics import (TourMetric, graph_tour, improve_tour, nearest_neighbor_tour,
+                             solve_tour, tour_length)
+
+def _points(n, seed):
+    return np.random.default_rng(seed).random((n, 2))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_local_search_keeps_valid_tour_and_never_worsens(seed):
+    coords = _points(200, seed)
+    metric = TourMetric(coords=coords)
+    start = nearest_neighbor_tour(metric, start=3)
+    assert sorted(start) == list(range(200)) and start[0] == 3
+    stats = {}
+    improved = improve_tour(metric, start, time_limit=10.0, stats=stats)
+    assert sorted(improved) == list(range(200))
+    assert stats["converged"]
+    assert tour_length(metric, improved) <= tour_length(metric, start) + 1e-9
+
+def test_matrix_and_coords_agree():
+    coords = _points(60, 9)
+    D = np.sqrt(((coords[:, None] - coords[None]) ** 2).sum(axis=2))
+    a = TourMetric(D=D)
+    b = TourMetric(coords=coords)
+    assert np.array_equal(a.neighbor_lists(5), b.neighbor_lists(5))
+    tour, length = solve_tour(D=D, start=7)
+    assert tour[0] == 7 and sorted(tour) == list(range(60))
+    assert length == pytest.approx(tour_length(b, tour))
+
+def test_convex_polygon_is_solved_exactly():
+    # точки на окружности: оптимальный обход — по кругу
+    angles = np.random.default_rng(1).permutation(40) * (2 * np.pi / 40)
+    coords = np.column_stack([np.cos(angles), np.sin(angles)])
+    _, length = solve_tour(coords=coords, time_limit=10.0)
+    assert length == pytest.approx(40 * 2 * np.sin(np.pi / 40))
+
+def test_graph_tour_visits_component_of_start():
+    G = nx.grid_2d_graph(5, 6)
+    G.add_edge("a", "b")
+    tour, length = graph_tour(G, start=(0, 0))
+    assert sorted(tour) == sorted(n for n in G if n not in ("a", "b"))
+    lengths = dict(nx.all_pairs_shortest_path_length(G))
+    assert length == sum(lengths[u][v] for u, v in zip(tour, tour[1:] + tour[:1]))
+    assert length >= len(tour)
+
+def test_metric_needs_exactly_one_source():
+    with pytest.raises(ValueError):
+        TourMetric()
+    with pytest.raises(ValueError):
+        TourMetric(D=np.zeros((2, 2)), coords=np.zeros((2, 2)))
@@ -0,0 +1,77 @@
+# tests/test_traversals.py
+from collections import deque
+import networkx as nx
+from analysis_pipeline import run_pipeline
+from graph_csr import as_csr
+from lab2_bfs import bfs_multi, bfs_order
+from lab3_dfs import dfs_adjacency, dfs_preorder
+
+def _queue_bfs(G, start):
+    seen, order, queue = {start}, [], deque([start])
+    while queue:
+        v = queue.popleft()
+        order.append(v)
+        for u in G.neighbors(v):
+            if u not in seen:
+                seen.add(u)
+                queue.append(u)
+    return order
+
+def _recursive_dfs(G, v, seen, order):
+    seen.add(v)
+    order.append(v)
+    for u in G.neighbors(v):
+        if u not in seen:
+            _recursive_dfs(G, u, seen, order)
+    return order
+
+def _directions(G, start):
+    stats = {}
+    bfs_multi(G, [start], direction="auto", stats=stats)
+    return stats["directions"]
+
+def _graphs():
+    for seed in range(40):
+        yield nx.gnm_random_graph(30, 20 + 5 * seed, seed=seed, directed=seed % 2 == 1)
+    yield nx.path_graph(200)
+    yield nx.grid_2d_graph(15, 15)
+
+def test_bfs_order_matches_queue():
+    # очередь по словарям networkx, поуровневый обход CSR и эталонная очередь совпадают
+    for G in _graphs():
+        start = next(iter(G))
+        expected = _queue_bfs(G, start)
+        assert bfs_order(G, start) == expected
+        assert bfs_order(as_csr(G), start) == expected
+        assert bfs_multi(G, [start], direction="top-down")[0] == expected
+
+def test_dfs_preorder_matches_recursion():
+    for G in _graphs():
+        start = next(iter(G))
+        expected = _recursive_dfs(G, start, set(), [])
+        assert dfs_preorder(G, start, sort_neighbors=False) == expected
+        assert dfs_preorder(as_csr(G), start, sort_neighbors=False) == expected
+
+def test_dfs_adjacency_visited_and_depth():
+    # уже пройденные вершины пропускаются, открытые добавляются в visited; глубина не ограничена
+    G = nx.path_graph(100000)
+    visited = {3}
+    assert dfs_adjacency(G._adj, 0, visited) == [0, 1, 2]
+    assert visited == {0, 1, 2, 3}
+    assert dfs_adjacency(G._adj, 99999) == list(range(99999, -1, -1))
+
+def test_as_csr_cache_follows_mutation():
+    G = nx.path_graph(5)
+    first = as_csr(G)
+    assert as_csr(G) is first
+    G.add_edge(4, 5)
+    assert as_csr(G).number_of_nodes() == 6
+
+def test_pipeline_bfs_is_fifo_on_small_diameter():
+    # на плотном графе direction="auto" переходит к шагам снизу вверх и меняет порядок,
+    # этап traversals по умолчанию даёт порядок очереди
+    G = nx.gnm_random_graph(2000, 40000, seed=3)
+    start = next(iter(G))
+    expected = _queue_bfs(G, start)
+    assert "bottom-up" in _directions(G, start)
+    assert run_pipeline(G, stages=["traversals"])["traversals"]["bfs"] == expected
@@ -0,0 +1,336 @@
+# tour_heuristics.py
+import math
+import time
+from collections import deque
+import numpy as np
+from graph_csr import as_csr
+from lab2_bfs import bfs_levels
+from distance_matrix import many_to_many, one_to_many
+
+# улучшение меньше EPS считаем нулевым (защита от зацикливания на ошибках округления)
+EPS = 1e-9
+
+class TourMetric:
+    """
+    Симметричная метрика для задачи коммивояжёра: матрица расстояний D (n x n)
+    или координаты точек coords (n x dim, евклидово расстояние — без матрицы,
+    так что годится и для 10^4 точек и больше).
+    """
+
+    def __init__(self, D=None, coords=None):
+        if (D is None) == (coords is None):
+            raise ValueError("Нужно задать ровно одно из D и coords")
+        if D is not None:
+            self.D = np.asarray(D, dtype=np.float64)
+            self.n = len(self.D)
+            self._rows = self.D.tolist()
+            self.coords = None
+        else:
+            self.coords = np.asarray(coords, dtype=np.float64).reshape(len(coords), -1)
+            self.n = len(self.coords)
+            self.D = None
+            self._pts = [tuple(p) for p in self.coords.tolist()]
+
+    def dist(self, i, j):
+        if self.D is not None:
+            return self._rows[i][j]
+        return math.dist(self._pts[i], self._pts[j])
+
+    def row(self, i):
+        """Расстояния от i до всех точек (массив)."""
+        if self.D is not None:
+            return self.D[i]
+        return np.sqrt(((self.coords - self.coords[i]) ** 2).sum(axis=1))
+
+    def neighbor_lists(self, k, block=1024):
+        """
+        k ближайших соседей каждой точки (n x k, по возрастанию расстояния).
+        Строки считаются блоками по block точек, чтобы не держать n x n в памяти.
+        """
+        n = self.n
+        k = min(k, n - 1)
+        result = np.empty((n, max(k, 0)), dtype=np.int64)
+        if k <= 0:
+            return result
+        if self.D is None:
+            c = self.coords
+            sq = (c ** 2).sum(axis=1)
+        for lo in range(0, n, block):
+            hi = min(n, lo + block)
+            if self.D is not None:
+                rows = self.D[lo:hi].copy()
+            else:
+                # квадраты расстояний |a|^2 + |b|^2 - 2ab — через умножение матриц
+                rows = sq[lo:hi, None] + sq[None, :] - 2.0 * (c[lo:hi] @ c.T)
+            rows[np.arange(hi - lo), np.arange(lo, hi)] = np.inf
+            part = np.argpartition(rows, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(rows, part, axis=1), axis=1, kind="stable")
+            result[lo:hi] = np.take_along_axis(part, order, axis=1)
+        return result
+
+def tour_length(metric, tour):
+    """Длина замкнутого обхода."""
+    tour = list(tour)
+    return sum(metric.dist(a, b) for a, b in zip(tour, tour[1:] + tour[:1]))
+
+def nearest_neighbor_tour(metric, start=0, neighbors=None):
+    """
+    Обход «ближайший сосед». Кандидаты берутся из списков соседей (O(k) на шаг);
+    только если все k соседей уже посещены — поиск ближайшей непосещённой по строке
+    расстояний (одна операция над массивом).
+    """
+    n = metric.n
+    if not n:
+        return []
+    if neighbors is None:
+        neighbors = metric.neighbor_lists(8)
+    nbrs = neighbors.tolist()
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    tour = [start]
+    cur = start
+    for _ in range(n - 1):
+        nxt = -1
+        for c in nbrs[cur]:
+            if not visited[c]:
+                nxt = c
+                break
+        if nxt < 0:
+            row = np.where(visited, np.inf, metric.row(cur))
+            nxt = int(np.argmin(row))
+        visited[nxt] = True
+        tour.append(nxt)
+        cur = nxt
+    return tour
+
+class _LocalSearch:
+    """
+    2-opt и Or-opt по спискам соседей с битами «не смотреть» (don't-look bits).
+    Обход хранится массивом tour и обратным массивом pos (позиция города);
+    в очереди — города, у которых бит снят; улучшение возвращает в очередь концы изменённых рёбер.
+    """
+
+    def __init__(self, metric, tour, neighbors):
+        self.metric = metric
+        self.n = len(tour)
+        self.tour = np.array(tour, dtype=np.int64)
+        self.pos = np.empty(self.n, dtype=np.int64)
+        self.pos[self.tour] = np.arange(self.n)
+        self.nbrs = neighbors.tolist()
+        self.queue = deque(self.tour.tolist())
+        self.active = np.ones(self.n, dtype=bool)
+        self.moves_2opt = 0
+        self.moves_or = 0
+
+    def _succ(self, c):
+        return int(self.tour[(self.pos[c] + 1) % self.n])
+
+    def _pred(self, c):
+        return int(self.tour[self.pos[c] - 1])
+
+    def _wake(self, *cities):
+        for c in cities:
+            if not self.active[c]:
+                self.active[c] = True
+                self.queue.append(c)
+
+    def _reverse(self, i, j):
+        # разворот участка позиций i..j; если он «переходит через конец», разворачиваем
+        # дополнение j+1..i-1 — получается тот же цикл, пройденный в обратную сторону
+        if i > j:
+            i, j = j + 1, i - 1
+            if i > j:
+                return
+        seg = self.tour[i:j + 1][::-1].copy()
+        self.tour[i:j + 1] = seg
+        self.pos[seg] = np.arange(i, j + 1)
+
+    def _two_opt(self, a):
+        dist = self.metric.dist
+        for forward in (True, False):
+            b = self._succ(a) if forward else self._pred(a)
+            d_ab = dist(a, b)
+            for c in self.nbrs[a]:
+                d_ac = dist(a, c)
+                if d_ac >= d_ab - EPS:
+                    break
+                d = self._succ(c) if forward else self._pred(c)
+                if c == b or d == a:
+                    continue
+                delta = d_ac + dist(b, d) - d_ab - dist(c, d)
+                if delta < -EPS:
+                    if forward:
+                        # a [b ... c] d -> a [c ... b] d
+                        self._reverse(int(self.pos[b]), int(self.pos[c]))
+                    else:
+                        # b [a ... d] c -> b [d ... a] c
+                        self._reverse(int(self.pos[a]), int(self.pos[d]))
+                    self.moves_2opt += 1
+                    self._wake(a, b, c, d)
+                    return True
+        return False
+
+    def _or_opt(self, s):
+        dist = self.metric.dist
+        n = self.n
+        tour, pos = self.tour, self.pos
+        i = int(pos[s])
+        for length in (1, 2, 3):
+            if n < length + 3:
+                break
+            last = int(tour[(i + length - 1) % n])
+            p = int(tour[i - 1])
+            e = int(tour[(i + length) % n])
+            gain = dist(p, s) + dist(last, e) - dist(p, e)
+            if gain <= EPS:
+                continue
+            best = None
+            for c in set(self.nbrs[s]) | set(self.nbrs[last]):
+                off = (int(pos[c]) - i) % n
+                if off < length or c == p:
+                    continue
+                c2 = int(tour[(pos[c] + 1) % n])
+                base = dist(c, c2)
+                fwd = dist(c, s) + dist(last, c2) - base
+                rev = dist(c, last) + dist(s, c2) - base
+                cost, flip = (fwd, False) if fwd <= rev else (rev, True)
+                if cost < gain - EPS and (best is None or cost < best[0]):
+                    best = (cost, c, off, flip)
+            if best is not None:
+                _, c, off, flip = best
+                # сдвигаем обход так, чтобы отрезок стоял в начале, и вставляем его после c
+                rolled = np.roll(tour, -i)
+                seg = rolled[:length]
+                rest = rolled[length:]
+                q = off - length + 1
+                new = np.concatenate((rest[:q], seg[::-1] if flip else seg, rest[q:]))
+                tour[:] = new
+                pos[new] = np.arange(n)
+                self.moves_or += 1
+                self._wake(s, last, p, e, c, int(tour[(pos[c] + length + 1) % n]))
+                return True
+        return False
+
+    def run(self, deadline):
+        """Улучшает обход, пока очередь не пуста или не истекло время; True — локальный минимум."""
+        check = 0
+        while self.queue:
+            check += 1
+            if not check & 63 and time.perf_counter() > deadline:
+                return False
+            a = self.queue.popleft()
+            self.active[a] = False
+            if self._two_opt(a) or self._or_opt(a):
+                self._wake(a)
+        return True
+
+def improve_tour(metric, tour, neighbors=None, k=8, time_limit=1.0, stats=None):
+    """
+    Локальный поиск 2-opt + Or-opt (перенос отрезков из 1–3 городов, в том числе с разворотом).
+    Кандидаты — k ближайших соседей; время ограничено time_limit секунд.
+    В stats (если передан) пишутся moves_2opt, moves_or и converged (достигнут локальный минимум).
+    """
+    if len(tour) < 4:
+        return list(tour)
+    if neighbors is None:
+        neighbors = metric.neighbor_lists(k)
+    search = _LocalSearch(metric, tour, neighbors)
+    converged = search.run(time.perf_counter() + time_limit)
+    if stats is not None:
+        stats["moves_2opt"] = search.moves_2opt
+        stats["moves_or"] = search.moves_or
+        stats["converged"] = converged
+    return search.tour.tolist()
+
+def solve_tour(D=None, coords=None, start=0, k=8, time_limit=1.0, stats=None):
+    """Ближайший сосед + локальный поиск: (tour, length); tour начинается со start."""
+    metric = TourMetric(D, coords)
+    if not metric.n:
+        return [], 0.0
+    neighbors = metric.neighbor_lists(k)
+    tour = nearest_neighbor_tour(metric, start, neighbors)
+    tour = improve_tour(metric, tour, neighbors, time_limit=time_limit, stats=stats)
+    i = tour.index(start)
+    tour = tour[i:] + tour[:i]
+    return tour, tour_length(metric, tour)
+
+def graph_tour(graph, start=None, k=8, time_limit=1.0, hierarchy=None, stats=None):
+    """
+    Порядок объезда вершин графа по метрике кратчайших путей (неориентированный граф):
+    матрица расстояний — many_to_many (на иерархии сжатий, если она передана),
+    затем solve_tour. Обходятся вершины компоненты start.
+    Возвращает (порядок меток, длина замкнутого маршрута).
+    """
+    csr = as_csr(graph)
+    if not csr.number_of_nodes():
+        return [], 0.0
+    s = csr.index[start] if start is not None else 0
+    order, _, _ = bfs_levels(csr, [s])
+    nodes = [csr.labels[v] for v in sorted(order.tolist())]
+    D = many_to_many(csr, nodes, nodes, hierarchy=hierarchy)
+    tour, length = solve_tour(D=D, start=nodes.index(csr.labels[s]), k=k,
+                              time_limit=time_limit, stats=stats)
+    return [nodes[i] for i in tour], length
+
+def nearest_neighbor_walk(G, start=None):
+    """
+    Жадный nearest-neighbor по рёбрам графа (эвристика TSP-like, без возврата в начало).
+    Работает для взвешенных/невзвешенных: если веса есть, берёт наименьший вес; иначе — просто первый сосед.
+    Замкнутый маршрут с улучшением 2-opt/Or-opt — graph_tour.
+    Возвращает порядок посещения всех вершин (если граф несвязен — посетит компоненту start).
+    """
+    if G.number_of_nodes() == 0:
+        return []
+    if start is None or start not in G:
+        start = next(iter(G.nodes()))
+    csr = as_csr(G)
+    index, labels = csr.index, csr.labels
+    offsets = csr.offsets.tolist()
+    targets = csr.targets.tolist()
+    weights = csr.weights.tolist()
+    seen = bytearray(len(labels))
+    seen[index[start]] = 1
+    visited = {start}
+    path = [start]
+    cur = start
+    while len(visited) < G.number_of_nodes():
+        # ближайший непосещённый сосед — просмотр только списка смежности cur (O(deg));
+        # веса есть — по весу (отсутствующий вес = 1), при равенстве — по имени вершины
+        i = index[cur]
+        best = None
+        best_w = None
+        for k in range(offsets[i], offsets[i + 1]):
+            j = targets[k]
+            if seen[j]:
+                continue
+            c = labels[j]
+            w = weights[k]
+            if best is None or w < best_w or (w == best_w and str(c) < str(best)):
+                best = c
+                best_w = w
+        if best is None:
+            # если нет непросмотренных соседей — ближайшая непросмотренная вершина (в смысле числа рёбер):
+            # расстояния до всех непросмотренных и дерево путей — одним BFS от cur
+            rest = [v for v in G.nodes() if v not in visited]
+            dist, parent = one_to_many(csr, cur, rest, weighted=False, parents=True)
+            k = int(np.argmin(dist))
+            if dist[k] == float('inf'):
+                # не сможем достигнуть оставшиеся вершины из текущей компоненты
+                break
+            # достроим кратчайший путь до ближайшей и пометим вершины посещёнными по пути
+            sp = [index[rest[k]]]
+            while sp[-1] != index[cur]:
+                sp.append(int(parent[sp[-1]]))
+            # последний в sp = cur, пропускаем его
+            for j in reversed(sp[:-1]):
+                if not seen[j]:
+                    seen[j] = 1
+                    visited.add(labels[j])
+                    path.append(labels[j])
+            cur = path[-1]
+        else:
+            seen[index[best]] = 1
+            visited.add(best)
+            path.append(best)
+            cur = best
+    return path